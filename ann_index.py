@@ -0,0 +1,104 @@
+"""Approximate nearest-neighbour retrieval over the job-title TF-IDF matrix.
+
+JobIndex.category_scores is a sparse scan of every posting. This module
+reduces the TF-IDF rows to dense SVD embeddings, clusters them with k-means
+and keeps an inverted file (IVF): a query is embedded the same way, only the
+nprobe clusters with the closest centroids are scanned, and the best hits go
+back to JobIndex for exact TF-IDF re-scoring. Plain numpy + scikit-learn, so
+no extra dependency; scikit-learn is only imported to build the index, so
+loading and searching it in the API needs numpy alone.
+
+Built and checked with job_index.py (`build-ann` and `recall`).
+"""
+
+import time
+
+import numpy as np
+
+
+def l2_normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class IVFIndex:
+    """SVD projection + k-means inverted lists over L2-normalized embeddings"""
+
+    def __init__(self, components, centroids, embeddings, list_ids, list_offsets):
+        self.components = components      # (dims, n_features), projects TF-IDF rows
+        self.centroids = centroids        # (nlist, dims), normalized
+        self.embeddings = embeddings      # (n_jobs, dims), normalized, in list order
+        self.list_ids = list_ids          # job row of each embedding
+        self.list_offsets = list_offsets  # list i is [list_offsets[i], list_offsets[i + 1])
+
+    @classmethod
+    def build(cls, matrix, dims=64, nlist=None, sample_size=200000, seed=42, chunk_size=100000):
+        """Fit the projection and the clusters on matrix (a sparse TF-IDF matrix)"""
+        from sklearn.cluster import MiniBatchKMeans
+        from sklearn.decomposition import TruncatedSVD
+
+        n_jobs = matrix.shape[0]
+        nlist = nlist or max(1, min(4096, int(4 * np.sqrt(n_jobs))))
+        started = time.perf_counter()
+
+        svd = TruncatedSVD(n_components=dims, random_state=seed)
+        rng = np.random.default_rng(seed)
+        sample = rng.choice(n_jobs, size=min(sample_size, n_jobs), replace=False)
+        svd.fit(matrix[np.sort(sample)])
+        components = svd.components_.astype(np.float32)
+
+        embeddings = np.empty((n_jobs, dims), dtype=np.float32)
+        for start in range(0, n_jobs, chunk_size):
+            chunk = matrix[start:start + chunk_size]
+            embeddings[start:start + chunk_size] = l2_normalize(np.asarray(chunk @ components.T))
+
+        kmeans = MiniBatchKMeans(n_clusters=nlist, random_state=seed, batch_size=4096, n_init=3)
+        kmeans.fit(embeddings[sample])
+        centroids = l2_normalize(kmeans.cluster_centers_.astype(np.float32))
+
+        assignments = np.empty(n_jobs, dtype=np.int32)
+        for start in range(0, n_jobs, chunk_size):
+            assignments[start:start + chunk_size] = np.argmax(
+                embeddings[start:start + chunk_size] @ centroids.T, axis=1
+            )
+
+        # Store the embeddings grouped by list so each probe is one contiguous slice
+        order = np.argsort(assignments, kind="stable")
+        counts = np.bincount(assignments, minlength=nlist)
+        list_offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+        print(f"IVF index: {n_jobs:,} jobs, {dims} dims, {nlist} lists in {time.perf_counter() - started:.1f}s")
+        return cls(components, centroids, embeddings[order], order.astype(np.int64), list_offsets)
+
+    def save(self, path):
+        np.savez(path, components=self.components, centroids=self.centroids, embeddings=self.embeddings,
+                 list_ids=self.list_ids, list_offsets=self.list_offsets)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(**{name: data[name] for name in data.files})
+
+    @property
+    def nlist(self):
+        return len(self.centroids)
+
+    def embed(self, query):
+        """Normalized embedding of a (1, n_features) sparse TF-IDF row"""
+        return l2_normalize(np.asarray(query @ self.components.T, dtype=np.float32))[0]
+
+    def search(self, query, k, nprobe=64):
+        """Job rows of the (about) k embeddings closest to query, from the nprobe nearest lists"""
+        vector = self.embed(query)
+        nprobe = min(nprobe, self.nlist)
+        probes = np.argpartition(-(self.centroids @ vector), nprobe - 1)[:nprobe]
+
+        slices = [slice(self.list_offsets[p], self.list_offsets[p + 1]) for p in probes]
+        positions = np.concatenate([np.arange(s.start, s.stop) for s in slices])
+        if len(positions) == 0:
+            return positions
+        scores = self.embeddings[positions] @ vector
+        if k < len(positions):
+            best = np.argpartition(-scores, k - 1)[:k]
+            positions = positions[best]
+        return self.list_ids[positions]
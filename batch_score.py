@@ -0,0 +1,118 @@
+"""Offline bulk scoring of resumes.
+
+Reads a CSV or JSONL file shaped like the output of
+``load_preprocessed_data`` (Category, Resume, Resume_POS_text columns) and
+writes one NDJSON line per resume as each batch finishes:
+
+    python batch_score.py preprocessed_resumes.csv -o predictions.ndjson --batch-size 512
+"""
+
+import argparse
+import collections
+import json
+import sys
+import time
+
+import config
+import cv_inference as cvf
+
+
+def iter_records(path, chunksize=10000):
+    """Yield one dict per row of a CSV or JSONL file without loading it all at once"""
+    if path.endswith((".jsonl", ".ndjson", ".json")):
+        with open(path, encoding="utf-8") as handle:
+            for line in handle:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+    else:
+        import pandas as pd
+
+        for chunk in pd.read_csv(path, chunksize=chunksize):
+            yield from chunk.to_dict(orient="records")
+
+
+def pick_text_column(path, requested):
+    """Default to the spaCy lemma_POS column the model was trained on, else raw Resume"""
+    if requested:
+        return requested
+    first = next(iter_records(path), {})
+    return "Resume_POS_text" if "Resume_POS_text" in first else "Resume"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score resumes in bulk with the LSTM classifier")
+    parser.add_argument("input", help="CSV or JSONL file")
+    parser.add_argument("-o", "--output", help="NDJSON output file (default: stdout)")
+    parser.add_argument("--text-column", help="column holding the text (default: Resume_POS_text, else Resume)")
+    parser.add_argument("--label-column", default="Category", help="optional column with the true category")
+    parser.add_argument("--batch-size", type=int, default=config.PREDICT_BATCH_SIZE)
+    parser.add_argument("--model", default=config.MODEL_PATH)
+    parser.add_argument("--tokenizer", default=config.TOKENIZER_PATH)
+    parser.add_argument("--vocab", default=config.TOKENIZER_VOCAB_PATH,
+                        help="frozen vocabulary from fast_tokenizer.py (used instead of --tokenizer if it exists)")
+    parser.add_argument("--encoder", default=config.ENCODER_PATH)
+    parser.add_argument("--max-length", type=int, default=config.MAX_LENGTH)
+    parser.add_argument("--preprocess", choices=["auto", "yes", "no"], default="auto",
+                        help="run clean_resume_text + spaCy lemma_POS first (auto: unless the column is Resume_POS_text)")
+    args = parser.parse_args(argv)
+
+    model, tokenizer, encoder = cvf.load_model_artifacts(
+        model_path=args.model,
+        tokenizer_path=args.tokenizer,
+        encoder_path=args.encoder,
+        vocab_path=args.vocab,
+    )
+
+    text_column = pick_text_column(args.input, args.text_column)
+    print(f"Scoring '{text_column}' from {args.input} in batches of {args.batch_size}", file=sys.stderr)
+
+    preprocess_fn = None
+    if args.preprocess == "yes" or (args.preprocess == "auto" and text_column != "Resume_POS_text"):
+        nlp = cvf.load_inference_spacy_model(config.SPACY_MODEL)
+        preprocess_fn = lambda batch: cvf.preprocess_resume_texts(batch, nlp, batch_size=config.SPACY_BATCH_SIZE)
+
+    # Labels ride along in a queue so the text stream can go straight into the batcher
+    labels = collections.deque()
+
+    def texts():
+        for record in iter_records(args.input):
+            labels.append(record.get(args.label_column))
+            yield record.get(text_column)
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    started = time.perf_counter()
+    scored = 0
+    correct = 0
+    labelled = 0
+
+    try:
+        for start, results in cvf.iter_resume_category_batches(
+            texts(), model, tokenizer, encoder,
+            max_length=args.max_length, batch_size=args.batch_size,
+            preprocess_fn=preprocess_fn
+        ):
+            lines = []
+            for offset, (category, conf) in enumerate(results):
+                record = {"index": start + offset, "predicted_category": str(category), "confidence": conf}
+                label = labels.popleft()
+                if isinstance(label, str):
+                    record["true_category"] = label
+                    labelled += 1
+                    correct += int(label == str(category))
+                lines.append(json.dumps(record) + "\n")
+            out.write("".join(lines))
+            out.flush()
+            scored += len(results)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"Scored {scored} resumes in {elapsed:.1f}s ({scored / elapsed if elapsed else 0:.1f}/s)", file=sys.stderr)
+    if labelled:
+        print(f"Accuracy against '{args.label_column}': {correct / labelled * 100:.2f}%", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
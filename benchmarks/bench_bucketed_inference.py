@@ -0,0 +1,120 @@
+"""Benchmark length-bucketed inference against the full max_length padded run.
+
+Token lengths come from real resumes (tokenized with the serving tokenizer)
+when --input is given, otherwise from a synthetic long-tailed distribution.
+Reports per-batch latency, throughput and parity with the padded run.
+
+    python benchmarks/bench_bucketed_inference.py --input preprocessed_resumes.csv
+    python benchmarks/bench_bucketed_inference.py --synthetic-model   # masked model with random weights
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+from bucketed_inference import BucketedModel, model_masks_padding, parse_buckets, variable_length_model  # noqa: E402
+
+
+def real_lengths(path, column, limit, max_length):
+    import pandas as pd
+    from fast_tokenizer import load_tokenizer
+
+    vocab = config.TOKENIZER_VOCAB_PATH
+    tokenizer = load_tokenizer(vocab if os.path.exists(vocab) else config.TOKENIZER_PATH)
+    texts = pd.read_csv(path, usecols=[column], nrows=limit)[column].fillna("").astype(str).tolist()
+    return np.array([min(len(seq), max_length) for seq in tokenizer.texts_to_sequences(texts)])
+
+
+def synthetic_lengths(n, max_length, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.clip(rng.lognormal(mean=4.8, sigma=0.7, size=n).astype(int), 1, max_length)
+
+
+def make_inputs(lengths, max_length, vocab_size, seed=0):
+    rng = np.random.default_rng(seed)
+    padded = np.zeros((len(lengths), max_length), dtype=np.int32)
+    for row, length in enumerate(lengths):
+        padded[row, :length] = rng.integers(2, vocab_size, size=length)
+    return padded
+
+
+def run(model, padded, batch_size):
+    latencies = []
+    outputs = []
+    started = time.perf_counter()
+    for i in range(0, len(padded), batch_size):
+        batch_started = time.perf_counter()
+        outputs.append(np.asarray(model.predict_on_batch(padded[i:i + batch_size])))
+        latencies.append((time.perf_counter() - batch_started) * 1000.0)
+    return np.concatenate(outputs), time.perf_counter() - started, latencies
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", help="CSV with texts to take token lengths from")
+    parser.add_argument("--column", default="Resume_POS_text")
+    parser.add_argument("--limit", type=int, default=2000)
+    parser.add_argument("--synthetic-model", action="store_true",
+                        help="use a randomly initialised masked LSTM instead of MODEL_PATH")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--buckets", default=config.INFERENCE_BUCKETS)
+    parser.add_argument("--max-length", type=int, default=config.MAX_LENGTH)
+    args = parser.parse_args()
+
+    max_length = args.max_length
+    if args.synthetic_model:
+        from cv_lstm_functions import build_lstm_model
+        model = build_lstm_model(10000, 128, max_length, 25, mask_zero=True)
+    else:
+        from tensorflow.keras.models import load_model
+        model = load_model(config.MODEL_PATH)
+    vocab_size = int(model.layers[0].input_dim) if hasattr(model.layers[0], "input_dim") else 10000
+
+    if args.input:
+        lengths = real_lengths(args.input, args.column, args.limit, max_length)
+    else:
+        lengths = synthetic_lengths(args.limit, max_length)
+    padded = make_inputs(lengths, max_length, vocab_size)
+
+    buckets = parse_buckets(args.buckets, max_length)
+    bucket_ids = np.searchsorted(buckets, lengths)
+    print(f"{len(lengths)} inputs, median length {int(np.median(lengths))}, p95 {int(np.percentile(lengths, 95))}")
+    for bucket_id, width in enumerate(buckets):
+        print(f"  bucket {width:>4}: {np.count_nonzero(bucket_ids == bucket_id) / len(lengths) * 100:5.1f}%")
+    print(f"model masks padding: {model_masks_padding(model)}\n")
+
+    bucketed = BucketedModel(variable_length_model(model), buckets=buckets, max_length=max_length)
+
+    # Warm up both graphs (and every bucket width) before timing
+    model.predict_on_batch(padded[:args.batch_size])
+    for width in buckets:
+        bucketed.model.predict_on_batch(padded[:2, :width])
+
+    expected, padded_s, padded_lat = run(model, padded, args.batch_size)
+    actual, bucketed_s, bucketed_lat = run(bucketed, padded, args.batch_size)
+
+    print(f"{'mode':<10}{'seconds':>10}{'rows/s':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, seconds, latencies in (("padded", padded_s, padded_lat), ("bucketed", bucketed_s, bucketed_lat)):
+        print(f"{name:<10}{seconds:>10.2f}{len(padded) / seconds:>10.1f}"
+              f"{statistics.median(latencies):>10.2f}{percentile(latencies, 0.95):>10.2f}")
+    print(f"\nspeedup: {padded_s / bucketed_s:.2f}x")
+
+    max_diff = float(np.abs(expected - actual).max())
+    agreement = float((expected.argmax(axis=1) == actual.argmax(axis=1)).mean())
+    print(f"parity: max |dp| = {max_diff:.2e}, argmax agreement = {agreement * 100:.2f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Peak memory of streaming ingestion versus loading every CSV and merging.
+
+Each mode runs in its own subprocess so ru_maxrss is that mode's peak RSS:
+
+    legacy   read every source whole (cvs.csv twice, like df4), concat,
+             drop_duplicates, dropna, as load_*_datasets + merge_datasets do
+    stream   streaming_ingest.ingest: chunked reads, hash-set dedup, one
+             DataFrame of the unique rows at the end
+    iterate  streaming_ingest.iter_unique_chunks consumed chunk by chunk,
+             never materializing the corpus (e.g. feeding preprocessing)
+
+Without --kaggle a synthetic corpus is generated (--rows per source, a third
+of them duplicates across sources).
+
+    python benchmarks/bench_ingest_memory.py --kaggle RESUME_DATASET CVSCSV CURRICULUM_VITAE RESUME_ANALYSIS
+    python benchmarks/bench_ingest_memory.py --sources 8 --rows 20000
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import streaming_ingest  # noqa: E402
+
+WORDS = ("python java sql engineer developer manager data analyst cloud aws docker kubernetes sales marketing "
+         "finance accounting nurse teacher design research leadership communication project agile").split()
+
+
+def make_corpus(directory, sources, rows, text_words, seed=42):
+    """Synthetic sources; about a third of the rows repeat rows of earlier sources"""
+    import pandas as pd
+
+    rng = random.Random(seed)
+    pool = []
+    paths = []
+    for index in range(sources):
+        records = []
+        for _ in range(rows):
+            if pool and rng.random() < 0.33:
+                records.append(rng.choice(pool))
+            else:
+                text = " ".join(rng.choice(WORDS) for _ in range(text_words))
+                records.append((rng.choice(WORDS[:12]), text))
+                if len(pool) < 50000:
+                    pool.append(records[-1])
+        path = os.path.join(directory, f"source_{index}.csv")
+        pd.DataFrame(records, columns=["Category", "Resume"]).to_csv(path, index=False)
+        paths.append(path)
+    return [streaming_ingest.Source(os.path.basename(path), path) for path in paths]
+
+
+def run_legacy(sources, kaggle):
+    import pandas as pd
+
+    if kaggle:
+        import cv_lstm_functions as cvf
+        frames = cvf.standardize_column_names(cvf.load_kaggle_datasets(*kaggle) + cvf.load_huggingface_datasets())
+    else:
+        # second read of the first source stands in for df4 re-reading cvs.csv
+        frames = [pd.read_csv(source.path).rename(columns=source.rename) for source in sources + sources[:1]]
+    df = pd.concat(frames, ignore_index=True)
+    df.drop_duplicates(inplace=True)
+    df.dropna(inplace=True)
+    df.reset_index(drop=True, inplace=True)
+    return len(df)
+
+
+def run_mode(mode, sources, kaggle, chunksize):
+    started = time.perf_counter()
+    if mode == "legacy":
+        rows = run_legacy(sources, kaggle)
+    elif mode == "stream":
+        rows = len(streaming_ingest.ingest(sources, chunksize, normalize=False))
+    else:
+        rows = sum(len(chunk) for chunk in streaming_ingest.iter_unique_chunks(sources, chunksize, normalize=False))
+    return {
+        "mode": mode,
+        "rows": rows,
+        "seconds": round(time.perf_counter() - started, 2),
+        # ru_maxrss is in kB on Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--kaggle", nargs=4, metavar=("RESUME_DATASET", "CVSCSV", "CURRICULUM_VITAE", "RESUME_ANALYSIS"))
+    parser.add_argument("--sources", type=int, default=8)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--text-words", type=int, default=400)
+    parser.add_argument("--chunksize", type=int, default=1000)
+    parser.add_argument("--modes", nargs="*", default=["legacy", "stream", "iterate"])
+    parser.add_argument("--run-mode", help=argparse.SUPPRESS)
+    parser.add_argument("--corpus-dir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_mode:
+        if args.kaggle:
+            sources = streaming_ingest.kaggle_sources(*args.kaggle) + streaming_ingest.huggingface_sources()
+        else:
+            sources = [streaming_ingest.Source(name, os.path.join(args.corpus_dir, name))
+                       for name in sorted(os.listdir(args.corpus_dir))]
+        print(json.dumps(run_mode(args.run_mode, sources, args.kaggle, args.chunksize)))
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        command = [sys.executable, os.path.abspath(__file__), "--chunksize", str(args.chunksize)]
+        if args.kaggle:
+            command += ["--kaggle", *args.kaggle]
+        else:
+            make_corpus(directory, args.sources, args.rows, args.text_words)
+            size_mb = sum(os.path.getsize(os.path.join(directory, n)) for n in os.listdir(directory)) / 2 ** 20
+            print(f"Synthetic corpus: {args.sources} sources x {args.rows:,} rows, {size_mb:.0f} MB of CSV")
+            command += ["--corpus-dir", directory]
+
+        print(f"{'mode':<10}{'rows':>10}{'seconds':>10}{'peak RSS MB':>14}")
+        for mode in args.modes:
+            output = subprocess.run(command + ["--run-mode", mode], capture_output=True, text=True, check=True).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f"{result['mode']:<10}{result['rows']:>10,}{result['seconds']:>10}{result['peak_rss_mb']:>14}")
+
+
+if __name__ == "__main__":
+    main()
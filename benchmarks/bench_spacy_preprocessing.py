@@ -0,0 +1,112 @@
+"""Benchmark the serving-side spaCy lemma_POS preprocessing.
+
+Compares the full en_core_web_sm pipeline (parser/ner disabled per call, as in
+training) with the lightweight pipeline used by the API (parser/ner/senter
+excluded at load), checks that both produce identical lemma_POS strings, and
+reports load time, single-request latency and batched throughput. Exits
+non-zero if the lightweight p95 latency is over budget.
+
+    python benchmarks/bench_spacy_preprocessing.py --input preprocessed_resumes.csv --budget-ms 50
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv_inference as cvf  # noqa: E402
+
+SAMPLE_RESUME = """Senior Data Scientist with 7+ years of experience in machine learning,
+statistical modelling and Python. Built churn prediction models with scikit-learn
+and TensorFlow, deployed REST APIs with FastAPI and Docker on AWS, and led a team
+of four analysts. Skills: Python, SQL, Spark, pandas, NLP, A/B testing, Tableau.
+Contact: jane.doe@email.com | https://linkedin.com/in/janedoe"""
+
+
+def load_texts(path, column, limit):
+    if not path:
+        return [SAMPLE_RESUME] * limit
+    import pandas as pd
+
+    df = pd.read_csv(path, usecols=[column], nrows=limit)
+    return df[column].fillna("").astype(str).tolist()
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def time_single_requests(texts, nlp):
+    latencies = []
+    for text in texts:
+        started = time.perf_counter()
+        cvf.preprocess_resume_texts([text], nlp)
+        latencies.append((time.perf_counter() - started) * 1000.0)
+    return latencies
+
+
+def time_batched(texts, nlp, batch_size):
+    started = time.perf_counter()
+    for i in range(0, len(texts), batch_size):
+        cvf.preprocess_resume_texts(texts[i:i + batch_size], nlp, batch_size=batch_size)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", help="CSV with raw resumes (default: a built-in sample)")
+    parser.add_argument("--column", default="Resume")
+    parser.add_argument("--limit", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--model", default="en_core_web_sm")
+    parser.add_argument("--budget-ms", type=float, default=50.0, help="p95 single-request latency budget")
+    args = parser.parse_args()
+
+    texts = load_texts(args.input, args.column, args.limit)
+    print(f"{len(texts)} texts, mean length {statistics.mean(len(t) for t in texts):.0f} chars\n")
+
+    started = time.perf_counter()
+    full_nlp = cvf.load_spacy_model(args.model)
+    full_load = time.perf_counter() - started
+
+    started = time.perf_counter()
+    light_nlp = cvf.load_inference_spacy_model(args.model)
+    light_load = time.perf_counter() - started
+
+    print(f"full pipeline:  {full_nlp.pipe_names}")
+    print(f"light pipeline: {light_nlp.pipe_names}\n")
+
+    # Training ran the full model with parser/ner disabled per call
+    cleaned = [cvf.clean_resume_text(t) for t in texts]
+    expected = [cvf.lemma_pos_string(doc) for doc in full_nlp.pipe(cleaned, disable=["parser", "ner"])]
+    actual = cvf.preprocess_resume_texts(texts, light_nlp)
+    mismatches = sum(1 for a, b in zip(expected, actual) if a != b)
+    print(f"lemma_POS mismatches vs training preprocessing: {mismatches}/{len(texts)}\n")
+
+    # Warm both pipelines before timing
+    cvf.preprocess_resume_texts(texts[:4], full_nlp)
+    cvf.preprocess_resume_texts(texts[:4], light_nlp)
+
+    rows = []
+    for name, nlp, load in (("full", full_nlp, full_load), ("light", light_nlp, light_load)):
+        latencies = time_single_requests(texts, nlp)
+        batched = time_batched(texts, nlp, args.batch_size)
+        rows.append((name, load, statistics.median(latencies), percentile(latencies, 0.95), len(texts) / batched))
+
+    print(f"{'pipeline':<10}{'load s':>10}{'p50 ms':>10}{'p95 ms':>10}{'batched docs/s':>18}")
+    for name, load, p50, p95, throughput in rows:
+        print(f"{name:<10}{load:>10.2f}{p50:>10.2f}{p95:>10.2f}{throughput:>18.1f}")
+
+    light_p95 = rows[1][3]
+    if mismatches or light_p95 > args.budget_ms:
+        print(f"\nFAIL: mismatches={mismatches}, light p95 {light_p95:.2f} ms vs budget {args.budget_ms} ms")
+        sys.exit(1)
+    print(f"\nOK: light p95 {light_p95:.2f} ms within {args.budget_ms} ms budget")
+
+
+if __name__ == "__main__":
+    main()
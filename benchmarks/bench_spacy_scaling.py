@@ -0,0 +1,110 @@
+"""Benchmark multi-core lemma_POS preprocessing from 1 to N workers.
+
+Times the current training path (nlp.pipe with n_process=-1, lemma_POS strings
+built in the parent) and ParallelLemmatizer with 1, 2, 4, ... workers, and
+checks that every run gives the lemma_POS strings of the single-process run.
+Worker pools are started and warmed up before timing, so the numbers are
+steady-state docs/sec, not model load time.
+
+    python benchmarks/bench_spacy_scaling.py --input preprocessed_resumes.csv --limit 5000 --max-workers 8
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv_inference as cvf  # noqa: E402
+from spacy_parallel import ParallelLemmatizer  # noqa: E402
+
+SAMPLE_WORDS = ("senior data scientist python machine learning models deployed rest apis docker aws "
+                "led team analysts sql spark pandas nlp testing built pipelines customer churn "
+                "experience developed managed designed java web backend services").split()
+
+
+def load_texts(path, column, limit):
+    """Cleaned resumes from a CSV, or synthetic ones of mixed length"""
+    if not path:
+        import random
+
+        rng = random.Random(42)
+        # Mostly short resumes with a long tail, like the merged corpus
+        lengths = [int(rng.lognormvariate(5, 0.8)) + 20 for _ in range(limit)]
+        return [" ".join(rng.choice(SAMPLE_WORDS) for _ in range(n)) for n in lengths]
+    import pandas as pd
+
+    df = pd.read_csv(path, usecols=[column], nrows=limit)
+    return [cvf.clean_resume_text(text) for text in df[column].fillna("").astype(str)]
+
+
+def worker_counts(max_workers):
+    counts, n = [], 1
+    while n < max_workers:
+        counts.append(n)
+        n *= 2
+    return counts + [max_workers]
+
+
+def time_baseline(texts, model, batch_size):
+    """process_with_spacy: n_process=-1, strings built from the Docs in the parent"""
+    nlp = cvf.load_spacy_model(model, download=False)
+    started = time.perf_counter()
+    docs = nlp.pipe(texts, disable=["parser", "ner"], batch_size=batch_size, n_process=-1)
+    results = [cvf.lemma_pos_string(doc) for doc in docs]
+    return time.perf_counter() - started, results
+
+
+def time_parallel(texts, model, n_workers, batch_size):
+    with ParallelLemmatizer(model, n_workers=n_workers, batch_size=batch_size) as engine:
+        # One small run so every worker has loaded the model before timing
+        engine.process(texts[:n_workers * 2], progress=False)
+        started = time.perf_counter()
+        results = engine.process(texts, progress=False)
+        return time.perf_counter() - started, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", help="CSV with raw resumes (default: synthetic texts)")
+    parser.add_argument("--column", default="Resume")
+    parser.add_argument("--limit", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--model", default="en_core_web_sm", help="spaCy package name or model path")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--skip-baseline", action="store_true", help="don't time nlp.pipe(n_process=-1)")
+    args = parser.parse_args()
+
+    texts = load_texts(args.input, args.column, args.limit)
+    print(f"{len(texts)} texts, mean length {statistics.mean(len(t) for t in texts):.0f} chars, "
+          f"{os.cpu_count()} cores\n")
+
+    rows = []
+    reference = None
+    for n_workers in worker_counts(args.max_workers):
+        elapsed, results = time_parallel(texts, args.model, n_workers, args.batch_size)
+        if reference is None:
+            reference = results
+        mismatches = sum(1 for a, b in zip(reference, results) if a != b)
+        rows.append((f"parallel x{n_workers}", elapsed, mismatches))
+
+    if not args.skip_baseline:
+        elapsed, results = time_baseline(texts, args.model, args.batch_size)
+        mismatches = sum(1 for a, b in zip(reference, results) if a != b)
+        rows.insert(0, ("n_process=-1", elapsed, mismatches))
+
+    single = next(elapsed for name, elapsed, _ in rows if name == "parallel x1")
+    print(f"{'run':<16}{'seconds':>10}{'docs/s':>12}{'speedup':>10}{'mismatches':>12}")
+    for name, elapsed, mismatches in rows:
+        print(f"{name:<16}{elapsed:>10.2f}{len(texts) / elapsed:>12.1f}{single / elapsed:>9.2f}x{mismatches:>12}")
+
+    if any(mismatches for _, _, mismatches in rows):
+        print("\nFAIL: lemma_POS strings differ from the single-process run")
+        sys.exit(1)
+    print("\nOK: identical lemma_POS strings for every worker count")
+
+
+if __name__ == "__main__":
+    main()
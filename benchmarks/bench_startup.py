@@ -0,0 +1,92 @@
+"""Measure API worker startup cost, per component.
+
+Each import is timed in a fresh interpreter so that modules already pulled in
+by an earlier import don't hide their cost. Artifact loading is then timed in
+this process using the paths from config.py.
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --skip-artifacts
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+IMPORTS = [
+    "numpy",
+    "fitz",
+    "fastapi",
+    "spacy",
+    "tensorflow",
+    "pandas",
+    "sklearn",
+    "matplotlib.pyplot",
+    "seaborn",
+    "pandarallel",
+    "cv_inference",
+    "cv_lstm_functions",
+]
+
+
+def time_import(module):
+    """Seconds to import module in a clean interpreter, or None if it fails"""
+    code = (
+        "import time; started = time.perf_counter(); "
+        f"import {module}; "
+        "print(time.perf_counter() - started)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True,
+        env={**os.environ, "TF_CPP_MIN_LOG_LEVEL": "3"}
+    )
+    if result.returncode != 0:
+        return None
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def timed(label, fn, rows):
+    started = time.perf_counter()
+    value = fn()
+    rows.append((label, time.perf_counter() - started))
+    return value
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--skip-artifacts", action="store_true", help="only time imports")
+    args = parser.parse_args()
+
+    print(f"{'import':<24}{'seconds':>10}")
+    for module in IMPORTS:
+        seconds = time_import(module)
+        print(f"{module:<24}{'n/a' if seconds is None else f'{seconds:.3f}':>10}")
+
+    if args.skip_artifacts:
+        return
+
+    import config
+    import cv_inference as cvf
+
+    rows = []
+    resume_model, tokenizer, encoder = timed(
+        "resume model + tokenizer + encoder",
+        lambda: cvf.load_model_artifacts(config.MODEL_PATH, config.TOKENIZER_PATH, config.ENCODER_PATH),
+        rows
+    )
+    job_model = timed("job model", lambda: cvf.load_job_model(config.JOB_MODEL_PATH), rows)
+    timed("fused model", lambda: cvf.build_fused_model(resume_model, job_model, config.MAX_LENGTH), rows)
+    timed("spaCy (inference pipeline)", lambda: cvf.load_inference_spacy_model(config.SPACY_MODEL), rows)
+
+    print(f"\n{'artifact':<36}{'seconds':>10}")
+    for label, seconds in rows:
+        print(f"{label:<36}{seconds:>10.3f}")
+    print(f"{'total':<36}{sum(s for _, s in rows):>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Compare memory of prefork serving (serve.py) with `uvicorn --workers N`.
+
+Starts each server in turn, waits until /health/workers reports ready (plus a
+settle delay, since under uvicorn each worker only knows about itself), then
+sums RSS and PSS over the whole process tree from /proc. RSS counts shared
+pages once per process; PSS splits them, so the PSS total is the real cost.
+
+    python benchmarks/bench_worker_memory.py --workers 4
+"""
+
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from worker_registry import process_memory  # noqa: E402
+
+
+def descendants(pid):
+    """pid and every process below it, from the ppid field of /proc/*/stat"""
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as handle:
+                # comm may contain spaces, so split after its closing paren
+                ppid = int(handle.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+
+    tree, stack = [], [pid]
+    while stack:
+        current = stack.pop()
+        tree.append(current)
+        stack.extend(children.get(current, []))
+    return tree
+
+
+def wait_ready(port, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/health/workers", timeout=2) as response:
+                if json.load(response).get("ready"):
+                    return True
+        except OSError:
+            pass
+        time.sleep(0.5)
+    return False
+
+
+def measure(name, command, port, timeout, settle):
+    process = subprocess.Popen(command, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        if not wait_ready(port, timeout):
+            print(f"{name}: not ready after {timeout}s")
+            return None
+        time.sleep(settle)
+        rows = [(pid, process_memory(pid)) for pid in descendants(process.pid)]
+        return [(pid, mem) for pid, mem in rows if mem["rss_mb"]]
+    finally:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--settle", type=float, default=5.0)
+    args = parser.parse_args()
+
+    commands = {
+        "uvicorn --workers": [sys.executable, "-m", "uvicorn", "main:app", "--port", str(args.port),
+                              "--workers", str(args.workers), "--log-level", "warning"],
+        "serve.py (prefork)": [sys.executable, "serve.py", "--port", str(args.port),
+                               "--workers", str(args.workers), "--log-level", "warning"],
+    }
+
+    for name, command in commands.items():
+        rows = measure(name, command, args.port, args.timeout, args.settle)
+        if rows is None:
+            continue
+        print(f"\n{name}")
+        print(f"{'pid':>8}{'rss MB':>10}{'pss MB':>10}{'shared MB':>11}{'private MB':>12}")
+        for pid, mem in rows:
+            print(f"{pid:>8}{mem['rss_mb']:>10}{mem['pss_mb'] or 'n/a':>10}"
+                  f"{mem['shared_mb'] or 'n/a':>11}{mem['private_mb'] or 'n/a':>12}")
+        total_rss = sum(mem["rss_mb"] for _, mem in rows)
+        total_pss = sum(mem["pss_mb"] or 0 for _, mem in rows)
+        print(f"{'total':>8}{total_rss:>10.1f}{total_pss:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Length-bucketed inference for the post-padded LSTM models.
+
+Every input is padded to max_length (500), so a 60-token resume still runs
+500 LSTM timesteps. BucketedModel groups the rows of a padded batch by their
+real length, trims each group to the smallest bucket that holds it (e.g.
+64/128/256/500) and runs the groups separately on a variable-length copy of
+the model, then scatters the outputs back into input order.
+
+Trimming trailing padding only gives the same result as the full padded run
+when the model masks padding (Embedding(mask_zero=True) or a Masking layer).
+Without a mask the LSTM keeps updating its state over the padding steps and
+the outputs change, so bucketing is only switched on automatically for
+models that mask; mode="on" forces it for the rest (approximate results).
+"""
+
+import collections
+import threading
+
+import numpy as np
+
+DEFAULT_BUCKETS = (64, 128, 256, 500)
+
+
+def parse_buckets(value, max_length=500):
+    """Parse "64,128,256" into a sorted tuple that always ends with max_length"""
+    if isinstance(value, str):
+        value = [v for v in value.replace(" ", "").split(",") if v]
+    buckets = sorted({int(v) for v in value if 0 < int(v) < max_length})
+    return tuple(buckets) + (max_length,)
+
+
+def iter_layers(model):
+    """All layers of a model, descending into nested models"""
+    for layer in getattr(model, "layers", []):
+        yield layer
+        if hasattr(layer, "layers"):
+            yield from iter_layers(layer)
+
+
+def model_masks_padding(model):
+    """True if the model ignores 0 ids (mask_zero Embedding or a Masking layer)"""
+    for layer in iter_layers(model):
+        if getattr(layer, "mask_zero", False) or type(layer).__name__ == "Masking":
+            return True
+    return False
+
+
+def variable_length_model(model):
+    """
+    Copy of model (sharing its weights) that accepts any sequence length.
+    Returns None if the model can't be rebuilt that way.
+    """
+    from tensorflow.keras import Input
+    from tensorflow.keras.models import Model, Sequential
+
+    try:
+        inputs = Input(shape=(None,), dtype="int32", name="tokens")
+        if isinstance(model, Sequential):
+            outputs = inputs
+            for layer in model.layers:
+                outputs = layer(outputs)
+        else:
+            outputs = model(inputs)
+        return Model(inputs=inputs, outputs=outputs, name=f"{model.name}_variable_length")
+    except Exception as e:
+        print(f"Failed to build variable-length copy of {getattr(model, 'name', model)}: {e}")
+        return None
+
+
+class BucketedModel:
+    """
+    predict_on_batch-compatible wrapper that runs each length bucket at its
+    own sequence length. model must accept variable-length input (see
+    variable_length_model); inputs are post-padded int32 arrays of width
+    max_length, where real token ids are >= 1.
+    """
+
+    def __init__(self, model, buckets=DEFAULT_BUCKETS, max_length=500):
+        self.model = model
+        self.max_length = max_length
+        self.buckets = parse_buckets(buckets, max_length)
+        self.bucket_rows = collections.Counter()
+        # predict_on_batch runs on several executor threads at once
+        self._lock = threading.Lock()
+
+    def predict_on_batch(self, padded):
+        padded = np.asarray(padded)
+        if len(padded) == 0:
+            return self.model.predict_on_batch(padded)
+
+        lengths = np.count_nonzero(padded, axis=1)
+        bucket_ids = np.searchsorted(self.buckets, lengths)
+
+        outputs = None
+        multi_output = False
+        for bucket_id in np.unique(bucket_ids):
+            rows = np.flatnonzero(bucket_ids == bucket_id)
+            width = self.buckets[bucket_id]
+            result = self.model.predict_on_batch(padded[rows, :width])
+            with self._lock:
+                self.bucket_rows[width] += len(rows)
+
+            multi_output = isinstance(result, (list, tuple))
+            parts = [np.asarray(part) for part in (result if multi_output else [result])]
+            if outputs is None:
+                outputs = [np.empty((len(padded),) + part.shape[1:], dtype=part.dtype) for part in parts]
+            for out, part in zip(outputs, parts):
+                out[rows] = part
+
+        return outputs if multi_output else outputs[0]
+
+    def predict(self, padded, **kwargs):
+        return self.predict_on_batch(padded)
+
+    def stats(self):
+        with self._lock:
+            rows_per_bucket = dict(self.bucket_rows)
+        return {"buckets": list(self.buckets), "rows_per_bucket": rows_per_bucket}
+
+
+def bucketize(model, mode="auto", buckets=DEFAULT_BUCKETS, max_length=500):
+    """
+    Wrap model in a BucketedModel according to mode ("auto", "on" or "off").
+    "auto" only buckets models that mask padding, so results are unchanged.
+    Returns the original model whenever bucketing is off or not possible.
+    """
+    if model is None or mode == "off":
+        return model
+
+    name = getattr(model, "name", "model")
+    if not model_masks_padding(model):
+        if mode != "on":
+            print(f"Bucketed inference disabled for {name}: the model does not mask padding")
+            return model
+        print(f"Warning: bucketing {name}, which does not mask padding; outputs will differ from the padded run")
+
+    variable = variable_length_model(model)
+    if variable is None:
+        return model
+
+    bucketed = BucketedModel(variable, buckets=buckets, max_length=max_length)
+    print(f"Bucketed inference enabled for {name}: buckets {bucketed.buckets}")
+    return bucketed
@@ -0,0 +1,181 @@
+"""Category normalization for normalize_job_titles / consolidate_multi_labels.
+
+normalize_category used to fall back to `key in cat` for every title_map key,
+in order. Here the title_map keys are compiled once into an Aho-Corasick
+automaton that finds every key occurring in a string in one pass; the key that
+comes first in title_map wins, which is exactly what the ordered scan
+returned. It runs once per distinct title and the results are mapped back onto
+the rows, since job titles repeat heavily. pick_best_label stays a plain
+per-row function: most categories have no comma and return straight away,
+which is cheaper than factorizing the column.
+"""
+
+import re
+from collections import deque
+
+ROLE_VARIATIONS = {
+    'software_developer': ['software engineer', 'software dev', 'programmer',
+                           'application developer', 'software engineering', 'technology'],
+    'java_developer': ['java engineer', 'java programmer'],
+    'python_developer': ['python engineer', 'python programmer'],
+    'web_developer': ['web dev', 'website developer'],
+    'frontend_developer': ['front end', 'front-end', 'ui developer'],
+    'backend_developer': ['back end', 'back-end'],
+    'fullstack_developer': ['full stack', 'full-stack'],
+    'data_scientist': ['data science'],
+    'data_analyst': ['data analysis'],
+    'data_engineer': ['data engineering'],
+    'network_administrator': ['network admin', 'network engineer'],
+    'system_administrator': ['sysadmin', 'systems administrator'],
+    'devops_engineer': ['devops', 'dev ops'],
+    'project_manager': ['program manager', 'technical project manager'],
+    'qa_engineer': ['quality assurance', 'test engineer', 'tester'],
+    'mobile_developer': ['android developer', 'ios developer'],
+    'database_administrator': ['dba', 'database engineer'],
+    'security_engineer': ['cybersecurity', 'information security'],
+}
+
+PRIORITY_ROLES = [
+    'java_developer', 'python_developer', 'web_developer',
+    'frontend_developer', 'backend_developer', 'fullstack_developer',
+    'mobile_developer', 'data_scientist', 'data_engineer', 'data_analyst',
+    'devops_engineer', 'qa_engineer', 'security_engineer',
+    'database_administrator', 'network_administrator', 'system_administrator',
+    'project_manager', 'software_developer'
+]
+
+
+def build_title_map(role_variations=ROLE_VARIATIONS):
+    """Variation -> base role, in the order (and with the overwrites) of the original dict"""
+    title_map = {}
+    for base, variations in role_variations.items():
+        title_map[base.replace('_', ' ')] = base
+        for var in variations:
+            title_map[var] = base
+    return title_map
+
+
+class AhoCorasick:
+    """Multi-pattern substring matcher reporting the lowest-ranked pattern found"""
+
+    def __init__(self, patterns):
+        # patterns in rank order; node 0 is the root
+        self.goto = [{}]
+        self.fail = [0]
+        self.best = [None]
+
+        for rank, pattern in enumerate(patterns):
+            node = 0
+            for ch in pattern:
+                nxt = self.goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[node][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.best.append(None)
+                node = nxt
+            if self.best[node] is None:
+                self.best[node] = rank
+
+        # Breadth-first: fail links, and each node's best rank includes the
+        # patterns that end at its fail chain (suffixes of what matched)
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self.goto[node].items():
+                if node:
+                    fallback = self.fail[node]
+                    while fallback and ch not in self.goto[fallback]:
+                        fallback = self.fail[fallback]
+                    self.fail[child] = self.goto[fallback].get(ch, 0)
+                inherited = self.best[self.fail[child]]
+                if inherited is not None and (self.best[child] is None or inherited < self.best[child]):
+                    self.best[child] = inherited
+                queue.append(child)
+
+        # Fold the fail links into full transition tables (a DFA), so matching
+        # is one dict lookup per character; characters outside the patterns
+        # lead back to the root
+        alphabet = {ch for pattern in patterns for ch in pattern}
+        self.delta = [dict() for _ in self.goto]
+        queue = deque([0])
+        while queue:
+            node = queue.popleft()
+            for ch in alphabet:
+                child = self.goto[node].get(ch)
+                if child is not None:
+                    self.delta[node][ch] = child
+                    queue.append(child)
+                elif node:
+                    target = self.delta[self.fail[node]].get(ch, 0)
+                    if target:
+                        self.delta[node][ch] = target
+
+    def first_match(self, text):
+        """Rank of the lowest-ranked pattern occurring in text, or None"""
+        delta, best = self.delta, self.best
+        node = 0
+        found = None
+        for ch in text:
+            node = delta[node].get(ch, 0)
+            rank = best[node]
+            if rank is not None and (found is None or rank < found):
+                found = rank
+        return found
+
+
+class CategoryNormalizer:
+    """normalize_category with the title_map scan compiled into one automaton"""
+
+    def __init__(self, role_variations=ROLE_VARIATIONS):
+        self.title_map = build_title_map(role_variations)
+        self.keys = list(self.title_map)
+        self.matcher = AhoCorasick(self.keys)
+
+    def __call__(self, cat):
+        if not isinstance(cat, str):
+            return cat
+
+        cat = cat.lower().strip()
+        cat = re.sub(r'[_\-/]', ' ', cat)
+
+        if cat in self.title_map:
+            return self.title_map[cat]
+
+        rank = self.matcher.first_match(cat)
+        if rank is not None:
+            return self.title_map[self.keys[rank]]
+
+        return re.sub(r'\s+', '_', re.sub(r'[^a-z0-9\s]', '', cat).strip())
+
+
+def pick_best_label(cat):
+    """The highest-priority role among comma-separated labels, else the first"""
+    if not isinstance(cat, str) or ',' not in cat:
+        return cat
+
+    labels = [l.strip() for l in cat.split(',')]
+
+    for priority_role in PRIORITY_ROLES:
+        if priority_role in labels:
+            return priority_role
+
+    return labels[0]
+
+
+def map_unique(series, fn):
+    """series.apply(fn), but fn runs once per distinct value (missing values pass through)"""
+    import numpy as np
+    import pandas as pd
+
+    codes, uniques = pd.factorize(series)
+    mapped = np.array([fn(value) for value in uniques] + [None], dtype=object)
+    result = pd.Series(mapped[codes], index=series.index, name=series.name)
+    missing = codes == -1
+    if missing.any():
+        result[missing] = series[missing]
+    return result
+
+
+DEFAULT_NORMALIZER = CategoryNormalizer()
@@ -0,0 +1,168 @@
+"""Serving configuration for the Resume API.
+
+Every setting can be overridden with an environment variable of the same name,
+e.g. ``BATCH_MAX_SIZE=32 uvicorn main:app``.
+"""
+
+import os
+
+
+def env_int(name, default):
+    """Read an integer setting from the environment"""
+    value = os.environ.get(name)
+    return int(value) if value not in (None, "") else default
+
+
+def env_float(name, default):
+    """Read a float setting from the environment"""
+    value = os.environ.get(name)
+    return float(value) if value not in (None, "") else default
+
+
+def env_str(name, default):
+    """Read a string setting from the environment"""
+    value = os.environ.get(name)
+    return value if value not in (None, "") else default
+
+
+def env_bool(name, default):
+    """Read a boolean setting from the environment (1/true/yes/on)"""
+    value = os.environ.get(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# ===================== Model artifacts =====================
+
+MODEL_PATH = env_str("MODEL_PATH", "models/resume_classifier_model.h5")
+TOKENIZER_PATH = env_str("TOKENIZER_PATH", "models/tokenizer .pickle")
+# Frozen vocabulary exported with fast_tokenizer.py; used instead of the pickle when it exists
+TOKENIZER_VOCAB_PATH = env_str("TOKENIZER_VOCAB_PATH", "models/tokenizer_vocab.json")
+ENCODER_PATH = env_str("ENCODER_PATH", "models/label_encoder_corrected.pkl")
+JOB_MODEL_PATH = env_str("JOB_MODEL_PATH", "models/job_recommender.h5")
+MAX_LENGTH = env_int("MAX_LENGTH", 500)
+
+# "keras" serves the .h5 models; "tflite" serves the exports written by
+# model_export.py (TFLITE_NUM_THREADS=0 lets TFLite pick)
+MODEL_RUNTIME = env_str("MODEL_RUNTIME", "keras")
+TFLITE_MODEL_PATH = env_str("TFLITE_MODEL_PATH", "models/resume_classifier_model.tflite")
+TFLITE_JOB_MODEL_PATH = env_str("TFLITE_JOB_MODEL_PATH", "models/job_recommender.tflite")
+TFLITE_NUM_THREADS = env_int("TFLITE_NUM_THREADS", 0)
+
+# Length-bucketed inference (see bucketed_inference.py): "auto" buckets only
+# models that mask padding, so outputs are unchanged; "on" forces it.
+BUCKETED_INFERENCE = env_str("BUCKETED_INFERENCE", "auto")
+INFERENCE_BUCKETS = env_str("INFERENCE_BUCKETS", "64,128,256")
+
+# Job recommender index built offline with job_index.py (/recommend/jobs is
+# disabled when it doesn't exist or JOB_INDEX_DIR is empty; it is loaded per
+# worker at startup, never at import). The JOB_INDEX_CANDIDATES best title matches
+# for the category are re-ranked with the resume similarity; for encoder
+# classes they come precomputed from `job_index.py build-shards` (built with
+# --shard-size >= JOB_INDEX_CANDIDATES).
+JOB_INDEX_DIR = env_str("JOB_INDEX_DIR", "models/job_index")
+JOB_INDEX_CANDIDATES = env_int("JOB_INDEX_CANDIDATES", 1000)
+RECOMMEND_TOP_N = env_int("RECOMMEND_TOP_N", 20)
+
+# With an IVF index in JOB_INDEX_DIR (`job_index.py build-ann`) the category
+# stage probes JOB_ANN_NPROBE clusters and re-scores JOB_ANN_OVERSAMPLE x
+# candidates hits exactly; check the trade-off with `job_index.py recall`.
+JOB_ANN_ENABLED = env_bool("JOB_ANN_ENABLED", True)
+JOB_ANN_NPROBE = env_int("JOB_ANN_NPROBE", 64)
+JOB_ANN_OVERSAMPLE = env_int("JOB_ANN_OVERSAMPLE", 2)
+
+# ===================== Startup =====================
+
+# Each worker runs throwaway predictions at these batch sizes (and every length
+# bucket) before /health/ready turns green; empty means 1, BATCH_MAX_SIZE and
+# PREDICT_BATCH_SIZE.
+WARMUP_ENABLED = env_bool("WARMUP_ENABLED", True)
+WARMUP_BATCH_SIZES = env_str("WARMUP_BATCH_SIZES", "")
+
+# ===================== Micro-batching =====================
+
+# A batch is flushed as soon as it holds BATCH_MAX_SIZE texts or the oldest
+# queued text has waited BATCH_MAX_WAIT_MS milliseconds, whichever comes first.
+BATCH_MAX_SIZE = env_int("BATCH_MAX_SIZE", 64)
+BATCH_MAX_WAIT_MS = env_float("BATCH_MAX_WAIT_MS", 5.0)
+
+# ===================== PDF extraction =====================
+
+# Pages whose embedded text layer has fewer non-space characters than this, or
+# whose share of letters is below the ratio, are rasterized and OCR'd instead.
+TEXT_LAYER_MIN_CHARS = env_int("TEXT_LAYER_MIN_CHARS", 40)
+TEXT_LAYER_MIN_ALPHA_RATIO = env_float("TEXT_LAYER_MIN_ALPHA_RATIO", 0.5)
+OCR_DPI = env_int("OCR_DPI", 300)
+
+# OCR runs in a pool of OCR_WORKERS processes. At most OCR_MAX_PAGES pages of a
+# document are OCR'd, and pages not finished within OCR_TIMEOUT_S are dropped.
+OCR_WORKERS = env_int("OCR_WORKERS", min(4, os.cpu_count() or 1))
+OCR_GRAYSCALE = env_bool("OCR_GRAYSCALE", True)
+OCR_MAX_PAGES = env_int("OCR_MAX_PAGES", 20)
+OCR_TIMEOUT_S = env_float("OCR_TIMEOUT_S", 60.0)
+
+# ===================== Executors and backpressure =====================
+
+# PDF extraction and model inference run on separate bounded thread pools so a
+# slow OCR job can't starve predictions (and neither blocks the event loop).
+# Once an executor holds *_MAX_PENDING tasks, new requests get a 429 with a
+# Retry-After of RETRY_AFTER_S seconds.
+EXTRACTION_WORKERS = env_int("EXTRACTION_WORKERS", 4)
+EXTRACTION_MAX_PENDING = env_int("EXTRACTION_MAX_PENDING", 16)
+INFERENCE_WORKERS = env_int("INFERENCE_WORKERS", 2)
+INFERENCE_MAX_PENDING = env_int("INFERENCE_MAX_PENDING", 32)
+BATCH_MAX_QUEUE = env_int("BATCH_MAX_QUEUE", 1024)
+RETRY_AFTER_S = env_int("RETRY_AFTER_S", 1)
+
+# ===================== Result cache =====================
+
+# In-process LRU of CACHE_MAX_ENTRIES results, plus an optional SQLite file at
+# CACHE_DISK_PATH shared by all workers on the host (empty disables it).
+CACHE_ENABLED = env_bool("CACHE_ENABLED", True)
+CACHE_MAX_ENTRIES = env_int("CACHE_MAX_ENTRIES", 2048)
+CACHE_TTL_S = env_int("CACHE_TTL_S", 24 * 3600)
+CACHE_DISK_PATH = env_str("CACHE_DISK_PATH", "")
+CACHE_DISK_MAX_ENTRIES = env_int("CACHE_DISK_MAX_ENTRIES", 100000)
+
+# ===================== Bulk scoring =====================
+
+# /predict/resume_batch and batch_score.py push texts through the model
+# PREDICT_BATCH_SIZE at a time; one request may carry at most
+# BULK_MAX_ITEMS texts or files. Uploads to /predict/resume_batch/files may
+# total at most BULK_MAX_UPLOAD_MB, counting zip archives at their
+# uncompressed size.
+PREDICT_BATCH_SIZE = env_int("PREDICT_BATCH_SIZE", 256)
+BULK_MAX_ITEMS = env_int("BULK_MAX_ITEMS", 10000)
+BULK_MAX_UPLOAD_MB = env_int("BULK_MAX_UPLOAD_MB", 256)
+
+# ===================== Preprocessing =====================
+
+# The LSTM was trained on clean_resume_text + spaCy lemma_POS tokens, so the
+# same preprocessing runs before every prediction. Texts from concurrent
+# requests are grouped into one nlp.pipe call (up to SPACY_BATCH_SIZE texts,
+# waiting at most SPACY_MAX_WAIT_MS for the batch to fill).
+SPACY_MODEL = env_str("SPACY_MODEL", "en_core_web_sm")
+SPACY_BATCH_SIZE = env_int("SPACY_BATCH_SIZE", 64)
+SPACY_MAX_WAIT_MS = env_float("SPACY_MAX_WAIT_MS", 2.0)
+
+# ===================== Metrics =====================
+
+# /metrics serves Prometheus-format counters, gauges and per-stage latency
+# histograms; with METRICS_ENABLED=0 all instrumentation is a no-op.
+METRICS_ENABLED = env_bool("METRICS_ENABLED", True)
+
+# ===================== Prefork serving =====================
+
+# serve.py loads the tokenizer, encoder and spaCy once and forks SERVE_WORKERS
+# workers that share them copy-on-write
+SERVE_HOST = env_str("SERVE_HOST", "0.0.0.0")
+SERVE_PORT = env_int("SERVE_PORT", 8000)
+SERVE_WORKERS = env_int("SERVE_WORKERS", 2)
+SERVE_RESTART_DELAY_S = env_float("SERVE_RESTART_DELAY_S", 1.0)
+
+def warmup_batch_sizes():
+    """Batch sizes to warm up with (see WARMUP_BATCH_SIZES)"""
+    if WARMUP_BATCH_SIZES:
+        return [int(size) for size in WARMUP_BATCH_SIZES.split(",") if size.strip()]
+    return [1, BATCH_MAX_SIZE, PREDICT_BATCH_SIZE]
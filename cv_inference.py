@@ -0,0 +1,420 @@
+"""Inference-only surface of the resume classifier.
+
+Everything the API needs at serving time (artifact loading, preprocessing,
+prediction and PDF extraction) lives here, without pulling in pandas,
+pandarallel, scikit-learn, matplotlib/seaborn or the Keras training API.
+TensorFlow and spaCy are imported inside the functions that load models, so
+importing this module is cheap. cv_lstm_functions re-exports all of it for
+the notebooks and training code.
+"""
+
+import pickle
+import re
+import warnings
+
+import numpy as np
+
+warnings.filterwarnings('ignore')
+
+def pad_post(sequences, max_length):
+    """
+    Same as Keras pad_sequences(..., padding='post', truncating='post') with the
+    default int32 dtype and 0 padding value, without importing TensorFlow.
+    """
+    padded = np.zeros((len(sequences), max_length), dtype=np.int32)
+    for i, seq in enumerate(sequences):
+        seq = seq[:max_length]
+        padded[i, :len(seq)] = seq
+    return padded
+
+def load_spacy_model(model_name='en_core_web_sm', exclude=(), download=True):
+    """
+    Load spaCy model for NLP processing.
+    With download=False a missing model raises OSError instead of shelling out
+    to `spacy download` (serving must not install packages at runtime).
+    """
+    import spacy
+
+    try:
+        nlp = spacy.load(model_name, exclude=list(exclude))
+        print(f"spaCy model '{model_name}' loaded successfully")
+        return nlp
+    except OSError:
+        if not download:
+            raise OSError(
+                f"spaCy model '{model_name}' is not installed; "
+                f"install it at build time with: python -m spacy download {model_name}"
+            )
+        print(f"Downloading spaCy model '{model_name}'...")
+        import os
+        os.system(f"python -m spacy download {model_name}")
+        nlp = spacy.load(model_name, exclude=list(exclude))
+        return nlp
+
+# Components the lemma_POS preprocessing never reads. Excluding them at load
+# time (rather than disabling them per nlp.pipe call) means they are never
+# deserialized and cost neither memory nor per-document time.
+INFERENCE_EXCLUDED_PIPES = ("parser", "ner", "senter")
+
+def load_inference_spacy_model(model_name='en_core_web_sm', download=False):
+    """Load a lightweight spaCy pipeline with only what lemma_ and pos_ need (never downloads by default)"""
+    return load_spacy_model(model_name, exclude=INFERENCE_EXCLUDED_PIPES, download=download)
+
+URL_PATTERN = re.compile(r'http\S+|www\.\S+')
+EMAIL_PATTERN = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+
+class LetterFilter(dict):
+    """
+    str.translate table that keeps ASCII letters (lowercased) and whitespace
+    and drops every other character, i.e. re.sub(r'[^a-zA-Z\s]', '', text)
+    followed by .lower() in a single pass. Non-ASCII code points are resolved
+    on first sight and cached.
+    """
+
+    def __init__(self):
+        super().__init__()
+        for codepoint in range(128):
+            self[codepoint] = self.__missing__(codepoint)
+
+    def __missing__(self, codepoint):
+        ch = chr(codepoint)
+        if 'A' <= ch <= 'Z':
+            value = codepoint + 32
+        elif 'a' <= ch <= 'z' or ch.isspace():
+            value = codepoint
+        else:
+            value = None
+        self[codepoint] = value
+        return value
+
+LETTER_FILTER = LetterFilter()
+
+WHITESPACE_PATTERN = re.compile(r"[ \t\n]+")
+
+def normalize_text(text):
+    """
+    Collapse spaces, tabs and newlines, which the Keras tokenizer treats as
+    separators anyway (shared by the result cache keys and ingest dedup).
+    """
+    return WHITESPACE_PATTERN.sub(" ", text).strip()
+
+def clean_resume_text(text):
+    """Clean resume text by removing URLs, emails, special characters"""
+    if not isinstance(text, str):
+        return ""
+
+    # Remove URLs, then emails. These stay two ordered passes: a single
+    # alternation would match differently where they overlap
+    # (e.g. "user@www.site.com"). The cheap substring checks skip the
+    # regex entirely for texts that can't match.
+    if 'http' in text or 'www.' in text:
+        text = URL_PATTERN.sub('', text)
+    if '@' in text:
+        text = EMAIL_PATTERN.sub('', text)
+
+    # Drop non-letters and lowercase in one translate, then collapse whitespace
+    # (str.split() splits on exactly the characters regex \s matches)
+    return ' '.join(text.translate(LETTER_FILTER).split())
+
+def clean_resume_chunk(texts):
+    """Clean a list of texts (multiprocessing worker for clean_resume_texts)"""
+    return [clean_resume_text(text) for text in texts]
+
+def clean_resume_texts(texts, n_jobs=1, chunk_size=5000):
+    """
+    Bulk version of clean_resume_text for a list or pandas Series.
+    With n_jobs > 1 the texts are split into chunks and cleaned in a
+    multiprocessing pool. Returns a list in input order.
+    """
+    texts = list(texts)
+    if n_jobs is None or n_jobs < 0:
+        import os
+        n_jobs = os.cpu_count() or 1
+    if n_jobs <= 1 or len(texts) <= chunk_size:
+        return clean_resume_chunk(texts)
+
+    from multiprocessing import Pool
+
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    with Pool(processes=min(n_jobs, len(chunks))) as pool:
+        cleaned = []
+        for part in pool.imap(clean_resume_chunk, chunks):
+            cleaned.extend(part)
+    return cleaned
+
+def lemma_pos_string(doc):
+    """Join a spaCy doc into the lemma_POS token string the LSTM was trained on"""
+    return ' '.join([
+        f"{token.lemma_}_{token.pos_}" for token in doc
+        if not token.is_stop and not token.is_punct and not token.is_space
+    ])
+
+def preprocess_resume_texts(resume_texts, nlp, batch_size=64):
+    """
+    Serving-side preprocessing, identical to training:
+    clean_resume_text followed by spaCy lemma_POS tokens.
+    All texts go through one nlp.pipe call in the current process.
+    """
+    cleaned = [clean_resume_text(text) for text in resume_texts]
+    return lemma_pos_strings(cleaned, nlp, batch_size=batch_size)
+
+def lemma_pos_strings(cleaned_texts, nlp, batch_size=64):
+    """The spaCy half of preprocess_resume_texts, for texts already cleaned"""
+    return [lemma_pos_string(doc) for doc in nlp.pipe(cleaned_texts, batch_size=batch_size)]
+
+def load_inference_model(model_path, num_threads=None):
+    """Load a Keras model, or a TFLite export if the path ends in .tflite"""
+    if model_path.endswith(".tflite"):
+        from model_export import TFLiteModel
+        return TFLiteModel(model_path, num_threads=num_threads)
+
+    from tensorflow.keras.models import load_model
+    return load_model(model_path)
+
+def load_tokenizer_and_encoder(tokenizer_path='tokenizer.pickle',
+                               encoder_path='label_encoder.pickle',
+                               vocab_path=None):
+    """
+    Load the tokenizer and label encoder (no TensorFlow model).
+    If vocab_path points to an exported frozen vocabulary (see fast_tokenizer.py)
+    it is used instead of the pickled Keras tokenizer.
+    """
+    import os
+    from fast_tokenizer import load_tokenizer
+
+    # Load tokenizer
+    if vocab_path and os.path.exists(vocab_path):
+        tokenizer_path = vocab_path
+    tokenizer = load_tokenizer(tokenizer_path)
+    print(f"Tokenizer loaded from {tokenizer_path}")
+
+    # Load encoder
+    with open(encoder_path, 'rb') as handle:
+        encoder = pickle.load(handle)
+    print(f"Label encoder loaded from {encoder_path}")
+
+    return tokenizer, encoder
+
+def load_model_artifacts(model_path='resume_classifier_model.keras',
+                        tokenizer_path='tokenizer.pickle',
+                        encoder_path='label_encoder.pickle',
+                        vocab_path=None,
+                        num_threads=None):
+    """
+    Load model, tokenizer, and encoder.
+    A .tflite model_path is served through TFLite (see model_export.py) with
+    num_threads threads; vocab_path is as in load_tokenizer_and_encoder.
+    """
+    # Load model
+    model = load_inference_model(model_path, num_threads=num_threads)
+    print(f"Model loaded from {model_path}")
+
+    tokenizer, encoder = load_tokenizer_and_encoder(tokenizer_path, encoder_path, vocab_path=vocab_path)
+
+    return model, tokenizer, encoder
+
+def encode_texts(tokenizer, texts, max_length=500):
+    """Token ids for texts as a post-padded int32 array, via the fast path when available"""
+    if hasattr(tokenizer, "encode_batch"):
+        return tokenizer.encode_batch(texts, max_length)
+    return pad_post(tokenizer.texts_to_sequences(texts), max_length)
+
+def decode_category(encoder, predicted_class):
+    """Map a class index back to its category name, tolerating encoder/model mismatches"""
+    try:
+        # ده الطبيعي لو الـ encoder متوافق مع الموديل
+        return encoder.inverse_transform([predicted_class])[0]
+    except ValueError:
+        # هنا بنقع لو الموديل بيطلع index أكبر من عدد الكلاسات اللي جوه الـ encoder
+        # نحاول نرجّع اسم من classes_ لو الـ index جوه الرينج
+        if hasattr(encoder, "classes_") and predicted_class < len(encoder.classes_):
+            return encoder.classes_[predicted_class]
+        # لو برضه مش نافع، نرجع اسم generic
+        return f"Class #{predicted_class}"
+
+def predict_resume_categories(resume_texts, model, tokenizer, encoder, max_length=500):
+    """
+    Batched version of predict_resume_category.
+    Tokenizes and pads all texts together and runs a single forward pass,
+    returning a list of (category, confidence) tuples in input order.
+    """
+    if len(resume_texts) == 0:
+        return []
+
+    padded = encode_texts(tokenizer, list(resume_texts), max_length)
+    return predict_categories_from_ids(padded, model, encoder)
+
+def predict_categories_from_ids(padded, model, encoder):
+    """The model half of predict_resume_categories, for already padded token ids"""
+    # predict_on_batch skips the per-call data-adapter setup of model.predict
+    probs = np.asarray(model.predict_on_batch(padded))   # shape: (n, num_classes)
+
+    predicted_classes = probs.argmax(axis=1)
+    confidences = probs.max(axis=1)
+
+    return [
+        (decode_category(encoder, int(idx)), float(conf))
+        for idx, conf in zip(predicted_classes, confidences)
+    ]
+
+def iter_resume_category_batches(resume_texts, model, tokenizer, encoder, max_length=500, batch_size=256,
+                                 preprocess_fn=None):
+    """
+    Score an iterable of texts in fixed-size batches.
+    Yields (start_index, [(category, confidence), ...]) as each batch completes,
+    so callers can stream results without holding the whole corpus in memory.
+    preprocess_fn, if given, maps each batch of raw texts to model-ready texts.
+    """
+    def score(batch):
+        if preprocess_fn is not None:
+            batch = preprocess_fn(batch)
+        return predict_resume_categories(batch, model, tokenizer, encoder, max_length=max_length)
+
+    batch = []
+    start = 0
+    for text in resume_texts:
+        batch.append(text if isinstance(text, str) else "")
+        if len(batch) == batch_size:
+            yield start, score(batch)
+            start += len(batch)
+            batch = []
+
+    if batch:
+        yield start, score(batch)
+
+def predict_resume_category(resume_text, model, tokenizer, encoder, max_length=500):
+    """
+    تاخد نص الـ CV وترجّع:
+      - category: اسم الكاتيجوري (string)
+      - confidence: أعلى probability
+    """
+    return predict_resume_categories(
+        [resume_text], model, tokenizer, encoder, max_length=max_length
+    )[0]
+
+def extract_text_from_pdf_ocr(pdf_bytes, poppler_path=None, dpi=300, grayscale=True,
+                              max_workers=None, max_pages=20, timeout=60.0):
+    """
+    Extract text from PDF bytes using OCR (Tesseract).
+    Pages are rasterized one at a time inside a bounded pool of OCR worker
+    processes (see pdf_extraction.ocr_pages) and reassembled in page order.
+    poppler_path is no longer needed (PyMuPDF does the rendering) and is ignored.
+    """
+    import fitz
+    from pdf_extraction import OCR_WORKERS, ocr_pages
+
+    try:
+        with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+            page_count = min(doc.page_count, max_pages)
+
+        results = ocr_pages(
+            pdf_bytes, list(range(page_count)),
+            dpi=dpi, grayscale=grayscale,
+            max_workers=max_workers or OCR_WORKERS, timeout=timeout
+        )
+
+        parts = [
+            f"\n--- Page {i+1} ---\n{results[i][0]}"
+            for i in range(page_count)
+        ]
+        return "".join(parts).strip()
+    except Exception as e:
+        print(f"Error in OCR extraction: {e}")
+        return ""
+
+def load_job_model(model_path='models/job_recommender.h5', num_threads=None):
+    """Load the job recommender model (Keras .h5 or a .tflite export)"""
+    try:
+        model = load_inference_model(model_path, num_threads=num_threads)
+        print(f"Job Recommender Model loaded from {model_path}")
+        return model
+    except Exception as e:
+        print(f"Failed to load job model: {e}")
+        return None
+
+def decode_job_roles(probs, encoder, top_n=3):
+    """Turn one row of job-model probabilities into the top N {"role", "confidence"} dicts"""
+    top_indices = probs.argsort()[-top_n:][::-1]
+
+    predictions = []
+    for idx in top_indices:
+        conf = float(probs[idx])
+        try:
+            if hasattr(encoder, "classes_") and idx < len(encoder.classes_):
+                role = encoder.classes_[idx]
+            else:
+                role = encoder.inverse_transform([idx])[0]
+        except:
+            role = f"Class #{idx}"
+
+        predictions.append({"role": role, "confidence": conf})
+
+    return predictions
+
+def predict_job_role(resume_text, model, tokenizer, encoder, max_length=500, top_n=3):
+    """
+    Predict job role from resume text.
+    Returns a list of top predictions to ensure dynamic output.
+    """
+    if model is None:
+        return [{"role": "Model not loaded", "confidence": 0.0}]
+
+    # 1) Preprocess
+    padded = encode_texts(tokenizer, [resume_text], max_length)
+
+    # 2) + 3) Predict and get top N predictions
+    return predict_job_roles_from_ids(padded, model, encoder, top_n=top_n)
+
+def predict_job_roles_from_ids(padded, model, encoder, top_n=3):
+    """The model half of predict_job_role, for one row of padded token ids"""
+    if model is None:
+        return [{"role": "Model not loaded", "confidence": 0.0}]
+
+    probs = np.asarray(model.predict_on_batch(padded))[0]
+    return decode_job_roles(probs, encoder, top_n=top_n)
+
+def build_fused_model(resume_model, job_model, max_length=500):
+    """
+    Wrap the resume classifier and the job recommender in one multi-output model
+    so a single padded batch goes through both in one graph execution.
+    max_length=None builds a variable-length input (for bucketed inference).
+    Returns None if the two models can't share an input.
+    """
+    if resume_model is None or job_model is None:
+        return None
+
+    from tensorflow.keras import Input
+    from tensorflow.keras.models import Model
+
+    try:
+        inputs = Input(shape=(max_length,), dtype="int32", name="tokens")
+        fused = Model(
+            inputs=inputs,
+            outputs=[resume_model(inputs), job_model(inputs)],
+            name="resume_and_job_model"
+        )
+        print("Fused resume/job model built")
+        return fused
+    except Exception as e:
+        print(f"Failed to build fused model: {e}")
+        return None
+
+def predict_category_and_job_roles(resume_text, fused_model, tokenizer, encoder, max_length=500, top_n=3):
+    """
+    Tokenize and pad the resume once, run the fused model once, and return
+    (category, confidence, job_role_predictions).
+    """
+    padded = encode_texts(tokenizer, [resume_text], max_length)
+    return predict_category_and_job_roles_from_ids(padded, fused_model, encoder, top_n=top_n)
+
+def predict_category_and_job_roles_from_ids(padded, fused_model, encoder, top_n=3):
+    """The model half of predict_category_and_job_roles, for one row of padded token ids"""
+    category_probs, job_probs = fused_model.predict_on_batch(padded)
+    category_probs = np.asarray(category_probs)[0]
+    job_probs = np.asarray(job_probs)[0]
+
+    predicted_class = int(np.argmax(category_probs))
+    category = decode_category(encoder, predicted_class)
+    confidence = float(category_probs[predicted_class])
+
+    return category, confidence, decode_job_roles(job_probs, encoder, top_n=top_n)
@@ -7,34 +7,47 @@ Original file is located at
     https://colab.research.google.com/drive/1I-RUFKmgSZVNTpQdRuEM8VwvPnWa_6N9
 """
 
-import pandas as pd
 import numpy as np
-import re
 import pickle
 import warnings
-from pathlib import Path
-import pytesseract
-from pdf2image import convert_from_path, convert_from_bytes
-from PIL import Image
-import io
-
-import spacy
-from pandarallel import pandarallel
-from tqdm.auto import tqdm
-
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder
-from sklearn.metrics import confusion_matrix, classification_report
 
-from tensorflow.keras.preprocessing.text import Tokenizer
-from tensorflow.keras.preprocessing.sequence import pad_sequences
-from tensorflow.keras.models import Sequential, load_model
-from tensorflow.keras.layers import Dense, Dropout, Embedding, LSTM
-from tensorflow.keras.utils import to_categorical
-from tensorflow.keras.callbacks import EarlyStopping
+from tqdm.auto import tqdm
 
-import matplotlib.pyplot as plt
-import seaborn as sns
+# Serving code lives in cv_inference; re-exported here so notebooks and
+# `from cv_lstm_functions import *` keep working unchanged.
+from cv_inference import (
+    pad_post,
+    load_spacy_model,
+    INFERENCE_EXCLUDED_PIPES,
+    load_inference_spacy_model,
+    clean_resume_text,
+    clean_resume_texts,
+    normalize_text,
+    lemma_pos_string,
+    preprocess_resume_texts,
+    lemma_pos_strings,
+    load_inference_model,
+    load_tokenizer_and_encoder,
+    load_model_artifacts,
+    encode_texts,
+    decode_category,
+    predict_resume_categories,
+    predict_categories_from_ids,
+    iter_resume_category_batches,
+    predict_resume_category,
+    extract_text_from_pdf_ocr,
+    load_job_model,
+    decode_job_roles,
+    predict_job_role,
+    predict_job_roles_from_ids,
+    build_fused_model,
+    predict_category_and_job_roles,
+    predict_category_and_job_roles_from_ids,
+)
+
+# pandas, pandarallel, scikit-learn, matplotlib/seaborn and the Keras training
+# API are imported inside the functions that use them, so importing this
+# module stays cheap for anything that only needs a few helpers.
 
 warnings.filterwarnings('ignore')
 
@@ -43,24 +56,15 @@ warnings.filterwarnings('ignore')
 
 def setup_environment():
     """Initialize pandarallel and download required models"""
+    from pandarallel import pandarallel
+
     pandarallel.initialize(progress_bar=True)
     print("Environment setup completed!")
 
-def load_spacy_model(model_name='en_core_web_sm'):
-    """Load spaCy model for NLP processing"""
-    try:
-        nlp = spacy.load(model_name)
-        print(f"spaCy model '{model_name}' loaded successfully")
-        return nlp
-    except OSError:
-        print(f"Downloading spaCy model '{model_name}'...")
-        import os
-        os.system(f"python -m spacy download {model_name}")
-        nlp = spacy.load(model_name)
-        return nlp
-
 def load_kaggle_datasets(resume_dataset_path, cvscsv_path, curriculum_vitae_path, resume_analysis_path):
     """Load all Kaggle datasets and return list of dataframes"""
+    import pandas as pd
+
     df1 = pd.read_csv(f'{resume_dataset_path}/UpdatedResumeDataSet.csv')
     df2 = pd.read_csv(f'{cvscsv_path}/cvs.csv')
     df3 = pd.read_csv(f'{curriculum_vitae_path}/Curriculum Vitae.csv')
@@ -77,6 +81,8 @@ def load_kaggle_datasets(resume_dataset_path, cvscsv_path, curriculum_vitae_path
 
 def load_huggingface_datasets():
     """Load all HuggingFace datasets and return list of dataframes"""
+    import pandas as pd
+
     df10 = pd.read_csv("hf://datasets/AzharAli05/Resume-Screening-Dataset/dataset.csv")
     df10 = df10.drop(['Decision', 'Reason_for_decision', 'Job_Description'], axis=1)
 
@@ -113,6 +119,8 @@ def standardize_column_names(dataframes):
 
 def merge_datasets(dataframes):
     """Merge all datasets and remove duplicates"""
+    import pandas as pd
+
     df = pd.concat(dataframes, ignore_index=True)
 
     df.drop_duplicates(inplace=True)
@@ -124,46 +132,38 @@ def merge_datasets(dataframes):
 
     return df
 
-def clean_resume_text(text):
-    """Clean resume text by removing URLs, emails, special characters"""
-    if not isinstance(text, str):
-        return ""
-
-    # Remove URLs
-    text = re.sub(r'http\S+|www\.\S+', '', text)
-
-    # Remove emails
-    text = re.sub(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', '', text)
-
-    # Remove non-alphabetic characters
-    text = re.sub(r'[^a-zA-Z\s]', '', text)
-
-    # Remove extra whitespace
-    text = re.sub(r'\s+', ' ', text).strip()
-
-    return text.lower()
-
-def apply_text_cleaning(df):
+def apply_text_cleaning(df, n_jobs=-1):
     """Apply text cleaning to Resume column"""
     print("Cleaning resume text...")
-    df['Resume'] = df['Resume'].parallel_apply(clean_resume_text)
+    df['Resume'] = clean_resume_texts(df['Resume'].tolist(), n_jobs=n_jobs)
     print("Text cleaning completed")
     return df
 
-def process_with_spacy(df, nlp):
-    """Process text with spaCy for lemmatization and POS tagging"""
+def process_with_spacy(df, nlp, n_workers=None, model_name='en_core_web_sm'):
+    """
+    Process text with spaCy for lemmatization and POS tagging.
+    With n_workers the texts are length-sharded across a ParallelLemmatizer
+    pool (spacy_parallel.py) that builds the lemma_POS strings in the workers;
+    each worker loads model_name (the package name or path nlp came from).
+    """
     print("Processing text with spaCy (lemmatization & POS tagging)...")
 
     texts = df['Resume'].tolist()
+
+    if n_workers:
+        from spacy_parallel import ParallelLemmatizer
+
+        with ParallelLemmatizer(model_name, n_workers=n_workers) as engine:
+            df['Resume_POS_text'] = engine.process(texts)
+        print("spaCy processing with POS tags completed.")
+        return df
+
     processed_texts = []
 
     docs = nlp.pipe(texts, disable=["parser", "ner"], batch_size=50, n_process=-1)
 
     for doc in tqdm(docs, total=len(texts), desc="Processing Resumes"):
-        processed_texts.append(' '.join([
-            f"{token.lemma_}_{token.pos_}" for token in doc
-            if not token.is_stop and not token.is_punct and not token.is_space
-        ]))
+        processed_texts.append(lemma_pos_string(doc))
 
     df['Resume_POS_text'] = processed_texts
 
@@ -172,76 +172,17 @@ def process_with_spacy(df, nlp):
 
 def normalize_job_titles(df):
     """Normalize job title variations to standard categories"""
-    role_variations = {
-        'software_developer': ['software engineer', 'software dev', 'programmer',
-                              'application developer', 'software engineering', 'technology'],
-        'java_developer': ['java engineer', 'java programmer'],
-        'python_developer': ['python engineer', 'python programmer'],
-        'web_developer': ['web dev', 'website developer'],
-        'frontend_developer': ['front end', 'front-end', 'ui developer'],
-        'backend_developer': ['back end', 'back-end'],
-        'fullstack_developer': ['full stack', 'full-stack'],
-        'data_scientist': ['data science'],
-        'data_analyst': ['data analysis'],
-        'data_engineer': ['data engineering'],
-        'network_administrator': ['network admin', 'network engineer'],
-        'system_administrator': ['sysadmin', 'systems administrator'],
-        'devops_engineer': ['devops', 'dev ops'],
-        'project_manager': ['program manager', 'technical project manager'],
-        'qa_engineer': ['quality assurance', 'test engineer', 'tester'],
-        'mobile_developer': ['android developer', 'ios developer'],
-        'database_administrator': ['dba', 'database engineer'],
-        'security_engineer': ['cybersecurity', 'information security'],
-    }
-
-    title_map = {}
-    for base, variations in role_variations.items():
-        title_map[base.replace('_', ' ')] = base
-        for var in variations:
-            title_map[var] = base
-
-    def normalize_category(cat):
-        if not isinstance(cat, str):
-            return cat
-
-        cat = cat.lower().strip()
-        cat = re.sub(r'[_\-/]', ' ', cat)
-
-        if cat in title_map:
-            return title_map[cat]
-
-        for key, value in title_map.items():
-            if key in cat:
-                return value
-
-        return re.sub(r'\s+', '_', re.sub(r'[^a-z0-9\s]', '', cat).strip())
-
-    df['Category'] = df['Category'].parallel_apply(normalize_category)
+    from category_matcher import DEFAULT_NORMALIZER, map_unique
+
+    # One Aho-Corasick pass per distinct title instead of a scan over every variation per row
+    df['Category'] = map_unique(df['Category'], DEFAULT_NORMALIZER)
     return df
 
 def consolidate_multi_labels(df):
     """Consolidate multiple labels into single best label"""
-    priority_roles = [
-        'java_developer', 'python_developer', 'web_developer',
-        'frontend_developer', 'backend_developer', 'fullstack_developer',
-        'mobile_developer', 'data_scientist', 'data_engineer', 'data_analyst',
-        'devops_engineer', 'qa_engineer', 'security_engineer',
-        'database_administrator', 'network_administrator', 'system_administrator',
-        'project_manager', 'software_developer'
-    ]
-    def pick_best_label(cat):
-        if not isinstance(cat, str) or ',' not in cat:
-            return cat
-
-        labels = [l.strip() for l in cat.split(',')]
-
-        for priority_role in priority_roles:
-            if priority_role in labels:
-                return priority_role
-
-        return labels[0]
-
-    df['Category'] = df['Category'].parallel_apply(pick_best_label)
+    from category_matcher import pick_best_label
+
+    df['Category'] = df['Category'].apply(pick_best_label)
     return df
 
 def clean_categories(df, min_samples=10):
@@ -271,12 +212,16 @@ def apply_category_normalization(df, min_samples=10):
 
 def create_tokenizer(texts, vocab_size=10000):
     """Create and fit tokenizer on texts"""
+    from tensorflow.keras.preprocessing.text import Tokenizer
+
     tokenizer = Tokenizer(num_words=vocab_size, oov_token="<OOV>")
     tokenizer.fit_on_texts(texts)
     return tokenizer
 
 def texts_to_sequences(tokenizer, texts, max_length=500):
     """Convert texts to padded sequences"""
+    from tensorflow.keras.preprocessing.sequence import pad_sequences
+
     sequences = tokenizer.texts_to_sequences(texts)
     X_padded = pad_sequences(sequences, maxlen=max_length, padding='post', truncating='post')
 
@@ -293,20 +238,44 @@ def prepare_features(df, vocab_size=10000, max_length=500):
 
 def encode_labels(y):
     """Encode labels to categorical format"""
+    from sklearn.preprocessing import LabelEncoder
+    from tensorflow.keras.utils import to_categorical
+
     encoder = LabelEncoder()
     y_encoded = encoder.fit_transform(y)
     y_categorical = to_categorical(y_encoded)
 
     return y_categorical, encoder
 
-def split_data(X, y, test_size=0.2, random_state=42):
-    """Split data into training and testing sets"""
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y,
-        test_size=test_size,
-        random_state=random_state,
-        stratify=y
-    )
+def split_data(X, y, test_size=0.2, random_state=42, groups=None):
+    """
+    Split data into training and testing sets.
+    With groups (e.g. the dup_cluster ids of near_duplicates.py) every group
+    goes wholly to one side, still stratified by category as far as possible.
+    The grouped split holds out one fold of StratifiedGroupKFold, so test_size
+    is rounded to 1/n_splits (0.2 -> 5 folds, 0.3 -> 3 folds, i.e. 0.33) and
+    must be in (0, 0.5]; the fraction actually held out is printed.
+    """
+    from sklearn.model_selection import train_test_split, StratifiedGroupKFold
+
+    if groups is None:
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y,
+            test_size=test_size,
+            random_state=random_state,
+            stratify=y
+        )
+    else:
+        if not 0 < test_size <= 0.5:
+            raise ValueError(f"test_size must be in (0, 0.5] for a grouped split, got {test_size}")
+        n_splits = round(1 / test_size)
+        labels = np.argmax(y, axis=1) if np.ndim(y) == 2 else np.asarray(y)
+        splitter = StratifiedGroupKFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+        train_idx, test_idx = next(splitter.split(X, labels, groups=np.asarray(groups)))
+        X_train, X_test = X[train_idx], X[test_idx]
+        y_train, y_test = y[train_idx], y[test_idx]
+        print(f"Grouped split: 1 of {n_splits} folds held out "
+              f"({len(test_idx) / len(labels):.3f} of rows, test_size={test_size})")
 
     print(f"Data split into training and testing sets.")
     print(f"X_train shape: {X_train.shape}")
@@ -315,13 +284,22 @@ def split_data(X, y, test_size=0.2, random_state=42):
 
     return X_train, X_test, y_train, y_test
 
-def build_lstm_model(vocab_size, embedding_dim, max_length, num_classes, lstm_units=128, dropout=0.2):
-    """Build LSTM model for resume classification"""
+def build_lstm_model(vocab_size, embedding_dim, max_length, num_classes, lstm_units=128, dropout=0.2,
+                     mask_zero=False):
+    """
+    Build LSTM model for resume classification.
+    mask_zero=True makes the LSTM skip the post padding, which lets the API run
+    short resumes at a shorter sequence length (see bucketed_inference.py).
+    """
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.layers import Dense, Embedding, LSTM
+
     model = Sequential()
 
     model.add(Embedding(input_dim=vocab_size,
                         output_dim=embedding_dim,
-                        input_length=max_length))
+                        input_length=max_length,
+                        mask_zero=mask_zero))
 
     model.add(LSTM(lstm_units, dropout=dropout))
 
@@ -342,6 +320,8 @@ def build_lstm_model(vocab_size, embedding_dim, max_length, num_classes, lstm_un
 
 def train_model(model, X_train, y_train, X_test, y_test, epochs=20, batch_size=64, patience=2):
     """Train the LSTM model"""
+    from tensorflow.keras.callbacks import EarlyStopping
+
     early_stopping = EarlyStopping(monitor='val_loss', patience=patience, restore_best_weights=True)
 
     print("Starting model training...")
@@ -377,11 +357,17 @@ def generate_predictions(model, X_test):
 
 def print_classification_report(y_true, y_pred, encoder):
     """Print classification report"""
+    from sklearn.metrics import classification_report
+
     print("Classification Report:")
     print(classification_report(y_true, y_pred, target_names=encoder.classes_))
 
 def plot_confusion_matrix(y_true, y_pred, encoder, figsize=(15, 12)):
     """Plot confusion matrix"""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    from sklearn.metrics import confusion_matrix
+
     cm = confusion_matrix(y_true, y_pred)
     plt.figure(figsize=figsize)
     sns.heatmap(cm, annot=False, fmt='d', cmap='Blues',
@@ -393,6 +379,8 @@ def plot_confusion_matrix(y_true, y_pred, encoder, figsize=(15, 12)):
 
 def plot_training_history(history):
     """Plot training history"""
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=(12, 5))
 
     plt.subplot(1, 2, 1)
@@ -415,13 +403,18 @@ def plot_training_history(history):
     plt.show()
 
 def save_preprocessed_data(df, filepath='preprocessed_resumes.csv'):
-    """Save preprocessed dataframe to CSV"""
-    df.to_csv(filepath, index=False)
+    """Save preprocessed dataframe to CSV (or Parquet for a .parquet path)"""
+    if filepath.endswith('.parquet'):
+        df.to_parquet(filepath, index=False)
+    else:
+        df.to_csv(filepath, index=False)
     print(f"Preprocessed data saved to {filepath}")
 
 def load_preprocessed_data(filepath='preprocessed_resumes.csv'):
-    """Load preprocessed dataframe from CSV"""
-    df = pd.read_csv(filepath)
+    """Load preprocessed dataframe from CSV (or Parquet for a .parquet path)"""
+    import pandas as pd
+
+    df = pd.read_parquet(filepath) if filepath.endswith('.parquet') else pd.read_csv(filepath)
     print(f"Loaded preprocessed data from {filepath}")
     return df
 
@@ -442,129 +435,10 @@ def save_model_artifacts(model, tokenizer, encoder,
         pickle.dump(encoder, handle, protocol=pickle.HIGHEST_PROTOCOL)
     print(f"Label encoder saved to {encoder_path}")
 
-def load_model_artifacts(model_path='resume_classifier_model.keras',
-                        tokenizer_path='tokenizer.pickle',
-                        encoder_path='label_encoder.pickle'):
-    """Load model, tokenizer, and encoder"""
-    # Load model
-    model = load_model(model_path)
-    print(f"Model loaded from {model_path}")
-
-    # Load tokenizer
-    with open(tokenizer_path, 'rb') as handle:
-        tokenizer = pickle.load(handle)
-    print(f"Tokenizer loaded from {tokenizer_path}")
-
-    # Load encoder
-    with open(encoder_path, 'rb') as handle:
-        encoder = pickle.load(handle)
-    print(f"Label encoder loaded from {encoder_path}")
-
-    return model, tokenizer, encoder
-
-def predict_resume_category(resume_text, model, tokenizer, encoder, max_length=500):
-    """
-    تاخد نص الـ CV وترجّع:
-      - category: اسم الكاتيجوري (string)
-      - confidence: أعلى probability
-    """
-    # 1) preprocess + tokenize (نفس اللي كنت عامله في النوتبوك)
-    seq = tokenizer.texts_to_sequences([resume_text])
-    # padding حسب الـ max_length
-    padded = pad_sequences(
-        seq,
-        maxlen=max_length,
-        padding="post",
-        truncating="post"
-    )
-
-    # 2) model prediction
-    probs = model.predict(padded)[0]   # shape: (num_classes,)
-
-    # 3) class index
-    predicted_class = int(np.argmax(probs))
-    confidence = float(np.max(probs))
-
-    # 4) محاولة فكّ الكلاس بالـ encoder بشكل آمن
-    try:
-        # ده الطبيعي لو الـ encoder متوافق مع الموديل
-        category = encoder.inverse_transform([predicted_class])[0]
-    except ValueError:
-        # هنا بنقع لو الموديل بيطلع index أكبر من عدد الكلاسات اللي جوه الـ encoder
-        # نحاول نرجّع اسم من classes_ لو الـ index جوه الرينج
-        if hasattr(encoder, "classes_") and predicted_class < len(encoder.classes_):
-            category = encoder.classes_[predicted_class]
-        else:
-            # لو برضه مش نافع، نرجع اسم generic
-            category = f"Class #{predicted_class}"
-
-    return category, confidence
-
-def extract_text_from_pdf_ocr(pdf_bytes, poppler_path=None):
-    """
-    Extract text from PDF bytes using OCR (Tesseract).
-    Converts PDF pages to images first.
-    """
-    try:
-        # Convert PDF to images
-        images = convert_from_bytes(pdf_bytes, poppler_path=poppler_path)
-        
-        full_text = ""
-        for i, image in enumerate(images):
-            # Extract text from image
-            text = pytesseract.image_to_string(image)
-            full_text += f"\n--- Page {i+1} ---\n{text}"
-            
-        return full_text.strip()
-    except Exception as e:
-        print(f"Error in OCR extraction: {e}")
-        return ""
-
-def load_job_model(model_path='models/job_recommender.h5'):
-    """Load the job recommender model"""
-    try:
-        model = load_model(model_path)
-        print(f"Job Recommender Model loaded from {model_path}")
-        return model
-    except Exception as e:
-        print(f"Failed to load job model: {e}")
-        return None
-
-def predict_job_role(resume_text, model, tokenizer, encoder, max_length=500, top_n=3):
-    """
-    Predict job role from resume text.
-    Returns a list of top predictions to ensure dynamic output.
-    """
-    if model is None:
-        return [{"role": "Model not loaded", "confidence": 0.0}]
-
-    # 1) Preprocess
-    seq = tokenizer.texts_to_sequences([resume_text])
-    padded = pad_sequences(seq, maxlen=max_length, padding='post', truncating='post')
-
-    # 2) Predict
-    probs = model.predict(padded)[0]
-    
-    # 3) Get top N predictions
-    top_indices = probs.argsort()[-top_n:][::-1]
-    
-    predictions = []
-    for idx in top_indices:
-        conf = float(probs[idx])
-        try:
-            if hasattr(encoder, "classes_") and idx < len(encoder.classes_):
-                role = encoder.classes_[idx]
-            else:
-                role = encoder.inverse_transform([idx])[0]
-        except:
-            role = f"Class #{idx}"
-            
-        predictions.append({"role": role, "confidence": conf})
-        
-    return predictions
-
 def plot_category_distribution(df, top_n=20, figsize=(14, 6)):
     """Plot category distribution"""
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=figsize)
     df['Category'].value_counts().head(top_n).plot(kind='bar')
     plt.title(f'Top {top_n} Resume Categories Distribution')
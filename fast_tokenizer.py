@@ -0,0 +1,212 @@
+"""Frozen vocabulary and fast batch encoder for the resume tokenizer.
+
+The pickled Keras ``Tokenizer`` carries its full ``word_counts``/``word_docs``
+dictionaries and re-runs ``text_to_word_sequence`` word by word in pure
+Python. For serving we only need the ``word_index`` entries the model can
+actually see (ids below ``num_words``) plus the filter/lower/split settings,
+so the exporter writes just that to a small JSON file and ``FastTokenizer``
+encodes whole batches straight into a preallocated int32 padded array.
+
+    python fast_tokenizer.py export "models/tokenizer .pickle" -o models/tokenizer_vocab.json
+    python fast_tokenizer.py verify "models/tokenizer .pickle" models/tokenizer_vocab.json \\
+        --input preprocessed_resumes.csv --column Resume_POS_text
+"""
+
+import argparse
+import json
+import pickle
+import sys
+from itertools import repeat
+
+import numpy as np
+
+VOCAB_FORMAT_VERSION = 1
+
+
+class FastTokenizer:
+    """
+    Drop-in replacement for the serving use of a fitted Keras Tokenizer.
+    texts_to_sequences gives the same ids as Keras; encode_batch also pads
+    and truncates ('post', like pad_post) without building per-text lists.
+    """
+
+    def __init__(self, words, num_words=None, oov_token=None, filters='!"#$%&()*+,-./:;<=>?@[\\]^_`{|}~\t\n',
+                 lower=True, split=' ', char_level=False):
+        # words[i] has id i + 1, exactly as in the Keras word_index
+        self.words = list(words)
+        self.num_words = num_words
+        self.oov_token = oov_token
+        self.filters = filters
+        self.lower = lower
+        self.split = split
+        self.char_level = char_level
+
+        self.word_index = {word: i for i, word in enumerate(self.words, start=1)}
+        self.oov_index = self.word_index.get(oov_token) if oov_token is not None else None
+
+        # Empty strings come out of str.split when separators repeat; Keras
+        # drops them, so they map to None and are filtered with unknown words
+        self._lookup = dict(self.word_index)
+        self._lookup[''] = None
+        self._filter_table = str.maketrans({c: split for c in filters})
+
+    @classmethod
+    def from_keras(cls, tokenizer):
+        """Freeze a fitted Keras Tokenizer, keeping only the ids the model can see"""
+        num_words = tokenizer.num_words
+        ordered = sorted(tokenizer.word_index.items(), key=lambda item: item[1])
+        words = [word for word, idx in ordered if not num_words or idx < num_words]
+        if [idx for _, idx in ordered[:len(words)]] != list(range(1, len(words) + 1)):
+            raise ValueError("Tokenizer word_index is not a contiguous 1..N range")
+
+        oov_token = tokenizer.oov_token
+        if oov_token is not None and oov_token not in words:
+            # Keras always puts the OOV token at index 1, so this means num_words <= 1
+            raise ValueError("OOV token falls outside num_words; nothing would be encodable")
+
+        return cls(
+            words,
+            num_words=num_words,
+            oov_token=oov_token,
+            filters=tokenizer.filters,
+            lower=tokenizer.lower,
+            split=tokenizer.split,
+            char_level=tokenizer.char_level,
+        )
+
+    def to_dict(self):
+        return {
+            "format_version": VOCAB_FORMAT_VERSION,
+            "num_words": self.num_words,
+            "oov_token": self.oov_token,
+            "filters": self.filters,
+            "lower": self.lower,
+            "split": self.split,
+            "char_level": self.char_level,
+            "words": self.words,
+        }
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(self.to_dict(), handle, ensure_ascii=False, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as handle:
+            data = json.load(handle)
+        if data.get("format_version") != VOCAB_FORMAT_VERSION:
+            raise ValueError(f"Unsupported vocabulary format in {path}: {data.get('format_version')}")
+        data.pop("format_version")
+        return cls(**data)
+
+    def text_to_ids(self, text):
+        """Ids for one text, same as Keras texts_to_sequences([text])[0]"""
+        if self.lower:
+            text = text.lower()
+        if self.char_level:
+            tokens = text
+        else:
+            tokens = text.translate(self._filter_table).split(self.split)
+        return [i for i in map(self._lookup.get, tokens, repeat(self.oov_index)) if i is not None]
+
+    def texts_to_sequences(self, texts):
+        return [self.text_to_ids(text) for text in texts]
+
+    def encode_batch(self, texts, max_length, out=None):
+        """
+        Encode texts into an (n, max_length) int32 array, post-padded with 0 and
+        post-truncated. out, if given, is reused (it must have at least n rows
+        and exactly max_length columns); the returned array is a view of it.
+        """
+        n = len(texts)
+        if out is None:
+            out = np.zeros((n, max_length), dtype=np.int32)
+        else:
+            if out.shape[0] < n or out.shape[1] != max_length:
+                raise ValueError(f"out has shape {out.shape}, need at least ({n}, {max_length})")
+            out = out[:n]
+            out.fill(0)
+
+        for row, text in enumerate(texts):
+            ids = self.text_to_ids(text)[:max_length]
+            out[row, :len(ids)] = ids
+        return out
+
+
+def load_tokenizer(path):
+    """Load a frozen vocabulary (.json) or a pickled Keras Tokenizer"""
+    if path.endswith(".json"):
+        return FastTokenizer.load(path)
+    with open(path, "rb") as handle:
+        return pickle.load(handle)
+
+
+def export_vocab(tokenizer_path, output_path):
+    """Convert the pickled Keras tokenizer at tokenizer_path into a frozen vocabulary"""
+    with open(tokenizer_path, "rb") as handle:
+        keras_tokenizer = pickle.load(handle)
+    fast = FastTokenizer.from_keras(keras_tokenizer)
+    fast.save(output_path)
+    print(f"Exported {len(fast.words)} of {len(keras_tokenizer.word_index)} words "
+          f"(num_words={fast.num_words}, oov={fast.oov_token!r}) to {output_path}")
+    return fast
+
+
+def verify_vocab(tokenizer_path, vocab_path, texts, max_length=500):
+    """
+    Compare ids from the Keras tokenizer and the frozen vocabulary on texts.
+    Returns (number of texts checked, list of mismatching row indices).
+    """
+    from cv_inference import pad_post
+
+    with open(tokenizer_path, "rb") as handle:
+        keras_tokenizer = pickle.load(handle)
+    fast = FastTokenizer.load(vocab_path)
+
+    mismatches = []
+    checked = 0
+    for start in range(0, len(texts), 1000):
+        batch = texts[start:start + 1000]
+        expected_seq = keras_tokenizer.texts_to_sequences(batch)
+        actual_seq = fast.texts_to_sequences(batch)
+        expected_padded = pad_post(expected_seq, max_length)
+        actual_padded = fast.encode_batch(batch, max_length)
+        for offset, (a, b) in enumerate(zip(expected_seq, actual_seq)):
+            if a != b or not np.array_equal(expected_padded[offset], actual_padded[offset]):
+                mismatches.append(start + offset)
+        checked += len(batch)
+    return checked, mismatches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="write a frozen vocabulary from a pickled Keras tokenizer")
+    export.add_argument("tokenizer")
+    export.add_argument("-o", "--output", default="models/tokenizer_vocab.json")
+
+    verify = commands.add_parser("verify", help="check the frozen vocabulary gives the same ids as Keras")
+    verify.add_argument("tokenizer")
+    verify.add_argument("vocab")
+    verify.add_argument("--input", required=True, help="CSV with the training texts")
+    verify.add_argument("--column", default="Resume_POS_text")
+    verify.add_argument("--max-length", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        export_vocab(args.tokenizer, args.output)
+        return
+
+    import pandas as pd
+
+    texts = pd.read_csv(args.input, usecols=[args.column])[args.column].fillna("").astype(str).tolist()
+    checked, mismatches = verify_vocab(args.tokenizer, args.vocab, texts, max_length=args.max_length)
+    print(f"Checked {checked} texts: {len(mismatches)} mismatches")
+    if mismatches:
+        print(f"First mismatching rows: {mismatches[:10]}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""Dynamic micro-batching for model inference.
+
+Single requests are queued and a background thread groups them into one
+batch, flushing when the batch is full or when the oldest request has waited
+``max_wait_ms``. The whole batch goes through one call of ``batch_fn`` and
+each caller gets its own result back through a ``concurrent.futures.Future``.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from serving_executors import ExecutorBusy
+
+# Upper bounds of the batch-size histogram buckets reported by stats()
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+_STOP = object()
+
+
+class MicroBatcher:
+    """Queue single items and run them through ``batch_fn`` in batches.
+
+    ``batch_fn`` takes a list of items and must return a list of results of
+    the same length and in the same order. When ``max_queue_size`` is set,
+    ``submit`` raises ``ExecutorBusy`` once that many items are waiting.
+    """
+
+    def __init__(self, batch_fn, max_batch_size=64, max_wait_ms=5.0, name="batcher", max_queue_size=0):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.name = name
+        self.max_queue_size = max_queue_size
+
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+        self._batches_total = 0
+        self._items_total = 0
+        self._errors_total = 0
+        self._rejected_total = 0
+        self._max_queue_depth = 0
+        self._last_batch_size = 0
+        self._wait_seconds_total = 0.0
+        self._batch_seconds_total = 0.0
+        self._batch_size_counts = [0] * (len(BATCH_SIZE_BUCKETS) + 1)
+
+    def start(self):
+        """Start the background batching thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        """Stop the background thread once the queued items are processed"""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def submit(self, item):
+        """Queue one item and return a Future for its result"""
+        if self.max_queue_size and self._queue.qsize() >= self.max_queue_size:
+            with self._lock:
+                self._rejected_total += 1
+            raise ExecutorBusy(self.name)
+
+        future = Future()
+        self._queue.put((item, future, time.perf_counter()))
+
+        depth = self._queue.qsize()
+        if depth > self._max_queue_depth:
+            with self._lock:
+                self._max_queue_depth = max(self._max_queue_depth, depth)
+        return future
+
+    def predict(self, item, timeout=None):
+        """Queue one item and block until its result is ready"""
+        return self.submit(item).result(timeout)
+
+    def stats(self):
+        """Return queue-depth and batch-size metrics"""
+        with self._lock:
+            # Cumulative counts, like a Prometheus histogram
+            histogram = {}
+            running = 0
+            for bound, count in zip(BATCH_SIZE_BUCKETS, self._batch_size_counts):
+                running += count
+                histogram[f"le_{bound}"] = running
+            histogram["le_inf"] = running + self._batch_size_counts[-1]
+
+            batches = self._batches_total
+            items = self._items_total
+            return {
+                "name": self.name,
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000.0,
+                "queue_depth": self._queue.qsize(),
+                "max_queue_depth": self._max_queue_depth,
+                "batches_total": batches,
+                "items_total": items,
+                "errors_total": self._errors_total,
+                "rejected_total": self._rejected_total,
+                "last_batch_size": self._last_batch_size,
+                "avg_batch_size": items / batches if batches else 0.0,
+                "avg_queue_wait_ms": 1000.0 * self._wait_seconds_total / items if items else 0.0,
+                "avg_batch_latency_ms": 1000.0 * self._batch_seconds_total / batches if batches else 0.0,
+                "batch_size_histogram": histogram,
+            }
+
+    def _collect(self, first):
+        """Gather items after ``first`` until the batch is full or the deadline passes"""
+        batch = [first]
+        deadline = first[2] + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is _STOP:
+                # Put the sentinel back so the run loop exits after this batch
+                self._queue.put(_STOP)
+                break
+            batch.append(entry)
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+
+            # Skip requests whose caller gave up (e.g. a cancelled HTTP request)
+            batch = [entry for entry in self._collect(first)
+                     if entry[1].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            items = [entry[0] for entry in batch]
+            started = time.perf_counter()
+
+            try:
+                results = self.batch_fn(items)
+                if len(results) != len(items):
+                    raise RuntimeError(
+                        f"{self.name}: batch_fn returned {len(results)} results for {len(items)} items"
+                    )
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                with self._lock:
+                    self._errors_total += 1
+                continue
+
+            finished = time.perf_counter()
+            for (_, future, _), result in zip(batch, results):
+                future.set_result(result)
+
+            self._record(batch, started, finished)
+
+    def _record(self, batch, started, finished):
+        size = len(batch)
+        bucket = len(BATCH_SIZE_BUCKETS)
+        for i, bound in enumerate(BATCH_SIZE_BUCKETS):
+            if size <= bound:
+                bucket = i
+                break
+
+        with self._lock:
+            self._batches_total += 1
+            self._items_total += size
+            self._last_batch_size = size
+            self._batch_size_counts[bucket] += 1
+            self._batch_seconds_total += finished - started
+            self._wait_seconds_total += sum(started - entry[2] for entry in batch)
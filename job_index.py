@@ -0,0 +1,454 @@
+"""Precomputed job-posting index for the job recommender.
+
+The recommender in notebooks/04_job_recommender.ipynb fits two new
+TfidfVectorizers over the whole LinkedIn job table (~1.3M postings) for every
+resume: one over job titles, matched against the predicted category, and one
+over title (+ skills) matched against the resume text. Here both vectorizers
+are fitted once, offline, and the job matrices are saved next to the job
+metadata. A query only transforms the category and resume text and scores them
+against the stored matrices, keeping the notebook's ranking: the 1000 best
+title matches are blended 60% category / 40% resume similarity, each
+normalized by its maximum.
+
+TF-IDF rows are L2-normalized, so cosine similarity is a sparse dot product.
+pandas, scipy and scikit-learn are imported where an index is built or
+loaded, so importing this module stays cheap for the API.
+With an IVF index built next to it (ann_index.py), the category stage scans
+only the nearest clusters of SVD embeddings and re-scores those hits exactly,
+instead of scoring every posting. For the categories of the label encoder,
+which are the only ones the classifier predicts, the category stage is
+precomputed altogether: category_shards.npz keeps each class's best title
+matches and their scores, so a query only scores the resume against that shard.
+
+    python job_index.py build --postings linkedin_job_postings.csv --skills job_skills.csv -o models/job_index
+    python job_index.py build-ann models/job_index
+    python job_index.py build-shards models/job_index --encoder models/label_encoder_corrected.pkl
+    python job_index.py query models/job_index "Data Science" --resume resume.txt
+    python job_index.py recall models/job_index --resumes resumes.csv
+"""
+
+import argparse
+import json
+import os
+import pickle
+import time
+
+import numpy as np
+
+INDEX_FORMAT_VERSION = 1
+JOB_COLUMNS = ["job_link", "job_title", "company", "job_location"]
+
+ANN_FILE = "ann_ivf.npz"
+SHARDS_FILE = "category_shards.npz"
+
+CATEGORY_WEIGHT = 0.60
+RESUME_WEIGHT = 0.40
+
+
+def title_vectorizer():
+    """Vectorizer of tfidf_job_matching (category vs job title)"""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    return TfidfVectorizer(max_features=5000, stop_words="english", ngram_range=(1, 2), min_df=2)
+
+
+def resume_vectorizer():
+    """Vectorizer of resume_job_similarity (resume vs job title + skills)"""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    return TfidfVectorizer(max_features=1000, stop_words="english", ngram_range=(1, 2))
+
+
+def prepare_jobs(postings, skills=None):
+    """Unique postings with a title and company, as in the notebook, plus job_skills if given"""
+    jobs = postings.dropna(subset=["job_title", "company"])
+    jobs = jobs.drop_duplicates(subset=["job_link"]).reset_index(drop=True)
+    if skills is not None:
+        skills = skills.drop_duplicates(subset=["job_link"])[["job_link", "job_skills"]]
+        jobs = jobs.merge(skills, on="job_link", how="left")
+    return jobs
+
+
+def job_texts(jobs):
+    """(title texts, title + skills texts), lower-cased like the notebook"""
+    titles = jobs["job_title"].fillna("").str.lower()
+    if "job_skills" in jobs.columns:
+        full = (jobs["job_title"].fillna("") + " " + jobs["job_skills"].fillna("")).str.lower()
+    else:
+        full = titles
+    return titles.tolist(), full.tolist()
+
+
+def top_k(scores, k):
+    """
+    Indices of the k highest scores, best first, ties broken by lower index
+    (the order DataFrame.nlargest(keep="first") gives) without a full sort.
+    """
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.array([], dtype=np.int64)
+    if k < len(scores):
+        threshold = np.partition(scores, len(scores) - k)[len(scores) - k]
+        above = np.flatnonzero(scores > threshold)
+        ties = np.flatnonzero(scores == threshold)[: k - len(above)]
+        candidates = np.concatenate([above, ties])
+    else:
+        candidates = np.arange(len(scores))
+    # lexsort: last key is primary (score, descending), then index ascending
+    return candidates[np.lexsort((candidates, -scores[candidates]))]
+
+
+def normalize_by_max(scores):
+    peak = scores.max() if len(scores) else 0.0
+    return scores / peak if peak > 0 else np.zeros_like(scores)
+
+
+def shard_key(category):
+    """Categories giving the same title query share a shard (the vectorizer lower-cases)"""
+    return category.replace("_", " ").strip().lower()
+
+
+def build_index(jobs, out_dir):
+    """Fit both vectorizers on jobs and write the index to out_dir"""
+    from scipy import sparse
+
+    os.makedirs(out_dir, exist_ok=True)
+    titles, full = job_texts(jobs)
+
+    started = time.perf_counter()
+    title_vec = title_vectorizer()
+    title_matrix = title_vec.fit_transform(titles).astype(np.float32).tocsr()
+    resume_vec = resume_vectorizer()
+    resume_matrix = resume_vec.fit_transform(full).astype(np.float32).tocsr()
+    fit_s = time.perf_counter() - started
+
+    sparse.save_npz(os.path.join(out_dir, "title_matrix.npz"), title_matrix)
+    sparse.save_npz(os.path.join(out_dir, "resume_matrix.npz"), resume_matrix)
+    with open(os.path.join(out_dir, "vectorizers.pickle"), "wb") as handle:
+        pickle.dump({"title": title_vec, "resume": resume_vec}, handle, protocol=pickle.HIGHEST_PROTOCOL)
+    jobs[[c for c in JOB_COLUMNS if c in jobs.columns]].reset_index(drop=True).to_pickle(
+        os.path.join(out_dir, "jobs.pkl")
+    )
+
+    manifest = {
+        "format_version": INDEX_FORMAT_VERSION,
+        "jobs": len(jobs),
+        "with_skills": "job_skills" in jobs.columns,
+        "title_features": len(title_vec.vocabulary_),
+        "resume_features": len(resume_vec.vocabulary_),
+        "fit_s": round(fit_s, 1),
+    }
+    with open(os.path.join(out_dir, "manifest.json"), "w") as handle:
+        json.dump(manifest, handle, indent=2)
+    print(f"Job index written to {out_dir}: {manifest}")
+    return manifest
+
+
+class JobIndex:
+    """Read-only job index: transforms queries and scores them against the stored matrices"""
+
+    def __init__(self, jobs, title_vectorizer, resume_vectorizer, title_matrix, resume_matrix, manifest=None,
+                 ann=None, nprobe=64, oversample=2, shards=None):
+        self.jobs = jobs
+        self.title_vectorizer = title_vectorizer
+        self.resume_vectorizer = resume_vectorizer
+        self.title_matrix = title_matrix
+        self.resume_matrix = resume_matrix
+        self.manifest = manifest or {}
+
+        # Optional IVF index: probe nprobe lists, re-score oversample x candidates hits exactly
+        self.ann = ann
+        self.nprobe = nprobe
+        self.oversample = oversample
+
+        # Precomputed category stage: {shard_key: (rows, scores)}, best first
+        self.shards = shards or {}
+
+        # Plain arrays for building results without DataFrame indexing per request
+        # (missing values become None so results stay JSON-serializable)
+        self._columns = {
+            column: jobs[column].astype(object).where(jobs[column].notna(), None).to_numpy()
+            for column in jobs.columns
+        }
+
+    @classmethod
+    def load(cls, index_dir, use_ann=True, nprobe=64, oversample=2, use_shards=True):
+        import pandas as pd
+        from scipy import sparse
+        from ann_index import IVFIndex
+
+        with open(os.path.join(index_dir, "manifest.json")) as handle:
+            manifest = json.load(handle)
+        if manifest.get("format_version") != INDEX_FORMAT_VERSION:
+            raise ValueError(f"Unsupported job index format: {manifest.get('format_version')!r}")
+        with open(os.path.join(index_dir, "vectorizers.pickle"), "rb") as handle:
+            vectorizers = pickle.load(handle)
+        ann_path = os.path.join(index_dir, ANN_FILE)
+        ann = IVFIndex.load(ann_path) if use_ann and os.path.exists(ann_path) else None
+        shards_path = os.path.join(index_dir, SHARDS_FILE)
+        shards = load_shards(shards_path) if use_shards and os.path.exists(shards_path) else None
+        return cls(
+            jobs=pd.read_pickle(os.path.join(index_dir, "jobs.pkl")),
+            title_vectorizer=vectorizers["title"],
+            resume_vectorizer=vectorizers["resume"],
+            title_matrix=sparse.load_npz(os.path.join(index_dir, "title_matrix.npz")).tocsr(),
+            resume_matrix=sparse.load_npz(os.path.join(index_dir, "resume_matrix.npz")).tocsr(),
+            manifest=manifest,
+            ann=ann,
+            nprobe=nprobe,
+            oversample=oversample,
+            shards=shards,
+        )
+
+    def __len__(self):
+        return self.title_matrix.shape[0]
+
+    def category_query(self, predicted_category):
+        return self.title_vectorizer.transform([predicted_category.replace("_", " ")])
+
+    def category_scores(self, predicted_category):
+        """Cosine similarity of every job title with the category name"""
+        return np.asarray((self.title_matrix @ self.category_query(predicted_category).T).todense()).ravel()
+
+    def category_candidates(self, predicted_category, candidates, exact=False):
+        """
+        (rows, exact scores) of the best title matches: the category's shard
+        when it holds enough candidates, else IVF hits re-scored exactly, else
+        a full scan (always a full scan when exact).
+        """
+        shard = self.shards.get(shard_key(predicted_category))
+        if shard is not None and not exact and candidates <= len(shard[0]):
+            rows, scores = shard
+            return rows[:candidates], scores[:candidates]
+
+        if self.ann is None or exact:
+            scores = self.category_scores(predicted_category)
+            rows = top_k(scores, candidates)
+            return rows, scores[rows]
+
+        query = self.category_query(predicted_category)
+        # Sorted, so ties still go to the lower row like the full scan
+        hits = np.sort(self.ann.search(query, candidates * self.oversample, self.nprobe))
+        scores = np.asarray((self.title_matrix[hits] @ query.T).todense()).ravel()
+        best = top_k(scores, candidates)
+        return hits[best], scores[best]
+
+    def resume_scores(self, resume_text, rows):
+        """Cosine similarity of the resume with the jobs in rows"""
+        query = self.resume_vectorizer.transform([resume_text.lower()])
+        return np.asarray((self.resume_matrix[rows] @ query.T).todense()).ravel()
+
+    def recommend(self, predicted_category, resume_text=None, top_n=20, candidates=1000, exact=False):
+        """
+        Top top_n jobs as dicts (rank, job fields, match_score): the candidates
+        best title matches for the category (from the IVF index unless exact),
+        re-ranked 60/40 with the resume similarity when resume_text is given.
+        """
+        rows, scores = self.category_candidates(predicted_category, candidates, exact)
+        category_norm = normalize_by_max(scores)
+        if resume_text:
+            final = CATEGORY_WEIGHT * category_norm + RESUME_WEIGHT * normalize_by_max(self.resume_scores(resume_text, rows))
+        else:
+            final = category_norm
+
+        order = top_k(final, top_n)
+        return [
+            {
+                "rank": rank,
+                **{column: values[rows[i]] for column, values in self._columns.items()},
+                "match_score": float(final[i]),
+            }
+            for rank, i in enumerate(order, start=1)
+        ]
+
+
+def load_job_index(index_dir, use_ann=True, nprobe=64, oversample=2):
+    """JobIndex from index_dir, or None (with a message) when it hasn't been built"""
+    if not os.path.exists(os.path.join(index_dir, "manifest.json")):
+        print(f"Job index not found at {index_dir}; build it with `python job_index.py build`")
+        return None
+    started = time.perf_counter()
+    index = JobIndex.load(index_dir, use_ann=use_ann, nprobe=nprobe, oversample=oversample)
+    retrieval = f"IVF ({index.ann.nlist} lists, nprobe={nprobe})" if index.ann is not None else "exact scan"
+    print(f"Job index loaded: {len(index):,} jobs, {len(index.shards)} category shards, {retrieval}, "
+          f"in {time.perf_counter() - started:.1f}s")
+    return index
+
+
+def build_shards(index, categories, shard_size=1000):
+    """{shard_key: (rows, scores)} with the exact shard_size best title matches of each category"""
+    shards = {}
+    for category in categories:
+        key = shard_key(category)
+        if key not in shards:
+            rows, scores = index.category_candidates(category, shard_size, exact=True)
+            shards[key] = (rows.astype(np.int64), scores)
+    return shards
+
+
+def save_shards(shards, path):
+    """All shards in one .npz: keys, and rows/scores concatenated with offsets"""
+    keys = list(shards)
+    lengths = [len(shards[key][0]) for key in keys]
+    np.savez(
+        path,
+        keys=np.array(keys),
+        offsets=np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64),
+        rows=np.concatenate([shards[key][0] for key in keys]) if keys else np.array([], dtype=np.int64),
+        scores=np.concatenate([shards[key][1] for key in keys]) if keys else np.array([], dtype=np.float64),
+    )
+
+
+def load_shards(path):
+    with np.load(path) as data:
+        keys, offsets, rows, scores = data["keys"], data["offsets"], data["rows"], data["scores"]
+    return {
+        str(key): (rows[offsets[i]:offsets[i + 1]], scores[offsets[i]:offsets[i + 1]])
+        for i, key in enumerate(keys)
+    }
+
+
+def build_ann(index_dir, dims=64, nlist=None):
+    """Build the IVF index for an existing job index and store it next to it"""
+    from scipy import sparse
+    from ann_index import IVFIndex
+
+    title_matrix = sparse.load_npz(os.path.join(index_dir, "title_matrix.npz")).tocsr()
+    ann = IVFIndex.build(title_matrix, dims=dims, nlist=nlist)
+    ann.save(os.path.join(index_dir, ANN_FILE))
+    return ann
+
+
+def recall_report(index, categories, resume_texts=(), candidates=1000, top_n=20):
+    """
+    Compare IVF retrieval with the exact scan for each category (and each
+    resume text paired with every category). recall@candidates counts the
+    exact candidates with a non-zero score that the IVF path also returns
+    (zero-score rows are arbitrary ties); recall@top_n compares the final
+    recommendations.
+    """
+    candidate_recall, final_recall, exact_ms, ann_ms = [], [], [], []
+    for category in categories:
+        exact_rows, exact_scores = index.category_candidates(category, candidates, exact=True)
+        ann_rows, _ = index.category_candidates(category, candidates)
+        relevant = set(exact_rows[exact_scores > 0].tolist())
+        if relevant:
+            candidate_recall.append(len(relevant & set(ann_rows.tolist())) / len(relevant))
+
+        for resume_text in list(resume_texts) or [None]:
+            started = time.perf_counter()
+            exact = index.recommend(category, resume_text, top_n=top_n, candidates=candidates, exact=True)
+            exact_ms.append((time.perf_counter() - started) * 1000)
+            started = time.perf_counter()
+            approx = index.recommend(category, resume_text, top_n=top_n, candidates=candidates)
+            ann_ms.append((time.perf_counter() - started) * 1000)
+
+            expected = {job["job_link"] for job in exact if job["match_score"] > 0}
+            if expected:
+                final_recall.append(len(expected & {job["job_link"] for job in approx}) / len(expected))
+
+    def mean(values):
+        return round(float(np.mean(values)), 4) if values else None
+
+    return {
+        "queries": len(exact_ms),
+        f"recall@{candidates}": mean(candidate_recall),
+        f"recall@{top_n}": mean(final_recall),
+        "exact_ms_p50": round(float(np.median(exact_ms)), 2) if exact_ms else None,
+        "ann_ms_p50": round(float(np.median(ann_ms)), 2) if ann_ms else None,
+    }
+
+
+def encoder_categories(encoder_path):
+    with open(encoder_path, "rb") as handle:
+        return [str(category) for category in pickle.load(handle).classes_]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="fit the vectorizers and write the job index")
+    build.add_argument("--postings", required=True, help="linkedin_job_postings.csv")
+    build.add_argument("--skills", help="job_skills.csv (job_link, job_skills); titles only if omitted")
+    build.add_argument("-o", "--output", default="models/job_index")
+
+    ann = commands.add_parser("build-ann", help="add an IVF index to a built job index")
+    ann.add_argument("index")
+    ann.add_argument("--dims", type=int, default=64)
+    ann.add_argument("--nlist", type=int, help="number of clusters (default 4 * sqrt(jobs))")
+
+    shards = commands.add_parser("build-shards", help="precompute the best title matches of every encoder class")
+    shards.add_argument("index")
+    shards.add_argument("--encoder", default="models/label_encoder_corrected.pkl")
+    shards.add_argument("--shard-size", type=int, default=1000)
+
+    recall = commands.add_parser("recall", help="recall and latency of the IVF index against the exact scan")
+    recall.add_argument("index")
+    recall.add_argument("--categories", help="text file with one category per line (default: encoder classes)")
+    recall.add_argument("--encoder", default="models/label_encoder_corrected.pkl")
+    recall.add_argument("--resumes", help="CSV of resume texts to pair with each category")
+    recall.add_argument("--resume-column", default="Resume")
+    recall.add_argument("--max-resumes", type=int, default=20)
+    recall.add_argument("--nprobe", type=int, default=64)
+    recall.add_argument("--oversample", type=int, default=2)
+    recall.add_argument("--candidates", type=int, default=1000)
+    recall.add_argument("--top-n", type=int, default=20)
+
+    query = commands.add_parser("query", help="recommend jobs from a built index")
+    query.add_argument("index")
+    query.add_argument("category")
+    query.add_argument("--resume", help="text file with the resume")
+    query.add_argument("--top-n", type=int, default=10)
+    query.add_argument("--exact", action="store_true", help="scan every job instead of the IVF index")
+
+    args = parser.parse_args(argv)
+
+    import pandas as pd
+
+    if args.command == "build":
+        postings = pd.read_csv(args.postings, usecols=JOB_COLUMNS)
+        skills = pd.read_csv(args.skills, usecols=["job_link", "job_skills"]) if args.skills else None
+        jobs = prepare_jobs(postings, skills)
+        print(f"Final dataset: {len(jobs):,} unique jobs")
+        build_index(jobs, args.output)
+    elif args.command == "build-ann":
+        build_ann(args.index, dims=args.dims, nlist=args.nlist)
+    elif args.command == "build-shards":
+        index = JobIndex.load(args.index, use_ann=False, use_shards=False)
+        categories = encoder_categories(args.encoder)
+        started = time.perf_counter()
+        shards = build_shards(index, categories, args.shard_size)
+        save_shards(shards, os.path.join(args.index, SHARDS_FILE))
+        print(f"{len(shards)} category shards of up to {args.shard_size} jobs in {time.perf_counter() - started:.1f}s")
+    elif args.command == "recall":
+        # Shards are exact, so they're left out to measure the IVF index itself
+        index = JobIndex.load(args.index, nprobe=args.nprobe, oversample=args.oversample, use_shards=False)
+        if index.ann is None:
+            parser.error(f"no IVF index in {args.index}; run build-ann first")
+        if args.categories:
+            with open(args.categories, encoding="utf-8") as handle:
+                categories = [line.strip() for line in handle if line.strip()]
+        else:
+            categories = encoder_categories(args.encoder)
+        resume_texts = []
+        if args.resumes:
+            resume_texts = pd.read_csv(args.resumes, usecols=[args.resume_column], nrows=args.max_resumes)[
+                args.resume_column].fillna("").tolist()
+        report = recall_report(index, categories, resume_texts, candidates=args.candidates, top_n=args.top_n)
+        print(json.dumps(report, indent=2))
+    else:
+        index = JobIndex.load(args.index)
+        resume_text = None
+        if args.resume:
+            with open(args.resume, encoding="utf-8") as handle:
+                resume_text = handle.read()
+        started = time.perf_counter()
+        recommendations = index.recommend(args.category, resume_text, top_n=args.top_n, exact=args.exact)
+        print(f"{len(recommendations)} recommendations in {(time.perf_counter() - started) * 1000:.1f} ms")
+        for job in recommendations:
+            print(f"{job['rank']:>3}. {job['match_score']:.4f}  {job['job_title']} | {job['company']} | {job.get('job_location')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,49 @@
-from fastapi import FastAPI, UploadFile, File
+import asyncio
+import io
+import json
+import os
+import signal
+import threading
+import time
+import zipfile
+from contextlib import asynccontextmanager, closing
+from typing import List, Literal, Optional
+
+from fastapi import FastAPI, HTTPException, UploadFile, File, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-import fitz  # PyMuPDF
 
-import cv_lstm_functions as cvf  # من مشروعك
+import config
+import cv_inference as cvf  # inference-only surface of cv_lstm_functions
+import metrics
+from bucketed_inference import BucketedModel, bucketize
+from inference_batcher import MicroBatcher
+from pdf_extraction import iter_pdf_extraction, shutdown_ocr_pool
+from result_cache import ResultCache, artifact_fingerprint, hash_bytes, hash_text
+from serving_executors import BoundedExecutor, ExecutorBusy
+from warmup import WARMUP_TEXT, require_artifacts, warm_up
+from worker_registry import WorkerRegistry
 
 # ===================== 1) إعداد FastAPI =====================
 
+@asynccontextmanager
+async def lifespan(app):
+    # Models load per worker rather than at import so that, under serve.py,
+    # they are created inside each forked worker (see section 2). Loading and
+    # warm-up run in the background: /health/live answers at once and
+    # /health/ready turns 200 when they finish.
+    worker_registry.attach(worker_registry.slot)
+    require_artifacts(model_artifact_paths())
+    loader = threading.Thread(target=start_worker, name="worker_startup", daemon=True)
+    loader.start()
+    yield
+    worker_registry.set_state("stopped")
+    loader.join(timeout=30)
+    shutdown_worker_artifacts()
+
 app = FastAPI(
+    lifespan=lifespan,
     title="Resume LSTM API",
     description="API لتصنيف الـ CV باستخدام موديل الـ LSTM من المشروع",
     version="1.0.0"
@@ -22,20 +59,284 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Until the models are loaded and warm, everything but health checks, metrics and docs gets a 503
+NOT_READY_EXEMPT = ("/health/", "/metrics", "/docs", "/redoc", "/openapi.json")
+
+@app.middleware("http")
+async def reject_until_ready(request, call_next):
+    if worker_registry.state() != "ready" and not request.url.path.startswith(NOT_READY_EXEMPT):
+        return JSONResponse(
+            status_code=503,
+            content={"detail": f"Worker is {worker_registry.state()}, please retry later"},
+            headers={"Retry-After": str(config.RETRY_AFTER_S)}
+        )
+    return await call_next(request)
+
+# Latency by route template (not raw path) so /metrics stays low-cardinality.
+# The clock stops when the last body chunk is sent, so streaming endpoints
+# are timed to the end of the stream, not to their headers.
+@app.middleware("http")
+async def record_request_metrics(request, call_next):
+    if not metrics.REGISTRY.enabled:
+        return await call_next(request)
+
+    started = time.perf_counter()
+
+    def finish(status):
+        metrics.IN_FLIGHT.dec()
+        route = request.scope.get("route")
+        path = getattr(route, "path", "unmatched")
+        metrics.REQUEST_SECONDS.labels(path, status).observe(time.perf_counter() - started)
+
+    metrics.IN_FLIGHT.inc()
+    try:
+        response = await call_next(request)
+    except BaseException:
+        finish(500)
+        raise
+
+    body = response.body_iterator
+
+    async def timed_body():
+        try:
+            async for chunk in body:
+                yield chunk
+        finally:
+            finish(response.status_code)
+
+    response.body_iterator = timed_body()
+    return response
+
+# Full queues are reported as 429 so clients back off instead of piling up
+@app.exception_handler(ExecutorBusy)
+async def executor_busy_handler(request, exc):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": f"Server busy ({exc.name}), please retry later"},
+        headers={"Retry-After": str(config.RETRY_AFTER_S)}
+    )
+
 # ===================== 2) تحميل الموديل والـ tokenizer والـ encoder و spaCy =====================
 
-print("Loading model artifacts...")
-resume_model, tokenizer, encoder = cvf.load_model_artifacts(
-    model_path="models/resume_classifier_model.h5",
-    tokenizer_path="models/tokenizer .pickle",   # بخلي الـ space لو انت مصرّ عليه
-    encoder_path="models/label_encoder_corrected.pkl",
+# MODEL_RUNTIME=tflite serves the TFLite exports (model_export.py) instead of the .h5 models
+use_tflite = config.MODEL_RUNTIME == "tflite"
+num_threads = config.TFLITE_NUM_THREADS or None
+
+# Tokenizer, encoder and spaCy are plain Python/numpy objects, so they load at
+# import: serve.py imports this module once in the parent and its forked
+# workers share them copy-on-write
+def tokenizer_artifact_path():
+    return config.TOKENIZER_VOCAB_PATH if os.path.exists(config.TOKENIZER_VOCAB_PATH) else config.TOKENIZER_PATH
+
+def model_artifact_paths():
+    if use_tflite:
+        return [config.TFLITE_MODEL_PATH, config.TFLITE_JOB_MODEL_PATH]
+    return [config.MODEL_PATH, config.JOB_MODEL_PATH]
+
+# Missing files fail the import (and so the deploy) right away, not the first request
+require_artifacts([tokenizer_artifact_path(), config.ENCODER_PATH])
+
+print("Loading tokenizer, encoder and spaCy...")
+tokenizer, encoder = cvf.load_tokenizer_and_encoder(
+    tokenizer_path=config.TOKENIZER_PATH,   # بخلي الـ space لو انت مصرّ عليه
+    encoder_path=config.ENCODER_PATH,
+    vocab_path=config.TOKENIZER_VOCAB_PATH,
 )
 
-# Load Job Recommender Model
-job_model = cvf.load_job_model("models/job_recommender.h5")
+# Lightweight pipeline: parser/ner/senter are excluded at load, not just skipped per call.
+# A missing spaCy model raises here; it is never downloaded at runtime.
+nlp = cvf.load_inference_spacy_model(config.SPACY_MODEL)  # en_core_web_sm
+
+# Models, batcher threads, executors and the SQLite cache don't survive fork,
+# so every worker builds its own in load_worker_artifacts() at startup
+resume_model = job_model = fused_model = None
+preprocess_batcher = category_batcher = None
+result_cache = None
+job_index = None
+extraction_executor = inference_executor = None
+warmup_report = {}
+
+# serve.py swaps this for a registry shared by all its workers
+worker_registry = WorkerRegistry(1)
+
+def load_models():
+    """Resume model, job model and (Keras only) the fused model, bucketed if enabled"""
+    require_artifacts(model_artifact_paths())
+
+    model_path = config.TFLITE_MODEL_PATH if use_tflite else config.MODEL_PATH
+    resume = cvf.load_inference_model(model_path, num_threads=num_threads)
+    print(f"Model loaded from {model_path}")
+
+    # Load Job Recommender Model
+    job = cvf.load_job_model(config.TFLITE_JOB_MODEL_PATH if use_tflite else config.JOB_MODEL_PATH,
+                             num_threads=num_threads)
+
+    # Both models read the same padded tokens, so they're served as one multi-output graph
+    # (Keras only; with TFLite the two models run back to back)
+    fused = None
+    if not use_tflite:
+        fused = cvf.build_fused_model(resume, job, max_length=config.MAX_LENGTH)
+
+    # Models that mask padding run each length bucket at its own sequence length
+    # instead of always stepping through MAX_LENGTH timesteps
+    if config.BUCKETED_INFERENCE != "off" and not use_tflite:
+        bucket_args = dict(mode=config.BUCKETED_INFERENCE, buckets=config.INFERENCE_BUCKETS, max_length=config.MAX_LENGTH)
+        bucketed_resume = bucketize(resume, **bucket_args)
+        bucketed_job = bucketize(job, **bucket_args)
+        if isinstance(bucketed_resume, BucketedModel) and isinstance(bucketed_job, BucketedModel):
+            fused_variable = cvf.build_fused_model(bucketed_resume.model, bucketed_job.model, max_length=None)
+            if fused_variable is not None:
+                fused = BucketedModel(fused_variable, buckets=config.INFERENCE_BUCKETS, max_length=config.MAX_LENGTH)
+        resume, job = bucketed_resume, bucketed_job
+
+    return resume, job, fused
+
+def load_worker_artifacts():
+    """Load the models and start the batchers, cache and executors of this worker"""
+    global resume_model, job_model, fused_model, preprocess_batcher, category_batcher
+    global result_cache, extraction_executor, inference_executor, warmup_report, job_index
+
+    print("Loading model artifacts...")
+    resume_model, job_model, fused_model = load_models()
+
+    # Precomputed TF-IDF job index; imported here so the API only pulls in
+    # pandas/scipy/scikit-learn when the recommender is configured
+    if config.JOB_INDEX_DIR:
+        from job_index import load_job_index
+        job_index = load_job_index(config.JOB_INDEX_DIR, use_ann=config.JOB_ANN_ENABLED,
+                                   nprobe=config.JOB_ANN_NPROBE, oversample=config.JOB_ANN_OVERSAMPLE)
+
+    # All spaCy work goes through one thread, batching texts from concurrent requests
+    preprocess_batcher = MicroBatcher(
+        batch_fn=preprocess_batch,
+        max_batch_size=config.SPACY_BATCH_SIZE,
+        max_wait_ms=config.SPACY_MAX_WAIT_MS,
+        name="spacy_preprocess_batcher",
+    ).start()
+
+    # Requests to /predict/resume_text are grouped into batches and share one forward pass
+    category_batcher = MicroBatcher(
+        batch_fn=lambda texts: predict_categories(preprocess_texts(texts)),
+        max_batch_size=config.BATCH_MAX_SIZE,
+        max_wait_ms=config.BATCH_MAX_WAIT_MS,
+        name="resume_category_batcher",
+        max_queue_size=config.BATCH_MAX_QUEUE,
+    ).start()
+
+    # Results are cached by content hash and invalidated when any artifact changes
+    if config.CACHE_ENABLED:
+        result_cache = ResultCache(
+            fingerprint=artifact_fingerprint(
+                [config.TFLITE_MODEL_PATH if use_tflite else config.MODEL_PATH,
+                 config.TFLITE_JOB_MODEL_PATH if use_tflite else config.JOB_MODEL_PATH,
+                 config.TOKENIZER_PATH, config.TOKENIZER_VOCAB_PATH, config.ENCODER_PATH],
+                extra=f"max_length={config.MAX_LENGTH};spacy={config.SPACY_MODEL};preprocess=lemma_pos"
+                      f";runtime={config.MODEL_RUNTIME}"
+            ),
+            max_entries=config.CACHE_MAX_ENTRIES,
+            ttl_s=config.CACHE_TTL_S,
+            disk_path=config.CACHE_DISK_PATH or None,
+            disk_max_entries=config.CACHE_DISK_MAX_ENTRIES
+        )
 
-nlp = cvf.load_spacy_model()  # en_core_web_sm
-print("Artifacts loaded successfully!")
+    # Blocking work of /pipeline/analyze_resume runs off the event loop, on two
+    # separate pools so OCR-heavy uploads can't starve model inference
+    extraction_executor = BoundedExecutor(
+        max_workers=config.EXTRACTION_WORKERS,
+        max_pending=config.EXTRACTION_MAX_PENDING,
+        name="extraction"
+    )
+    inference_executor = BoundedExecutor(
+        max_workers=config.INFERENCE_WORKERS,
+        max_pending=config.INFERENCE_MAX_PENDING,
+        name="inference"
+    )
+
+    # Queue depths are read at scrape time
+    for name, batcher in (("spacy_preprocess", preprocess_batcher), ("resume_category", category_batcher)):
+        metrics.QUEUE_DEPTH.labels(name).set_function(lambda b=batcher: b.stats()["queue_depth"])
+    for name, executor in (("extraction", extraction_executor), ("inference", inference_executor)):
+        metrics.QUEUE_DEPTH.labels(name).set_function(lambda e=executor: e.stats()["pending"])
+
+    print("Artifacts loaded successfully!")
+
+    # Trace every model at each batch size/bucket before taking traffic, on
+    # each inference thread since TFLite interpreters are per thread
+    if config.WARMUP_ENABLED:
+        warmup_report = warm_up(
+            {"resume": resume_model, "job": job_model, "fused": fused_model},
+            nlp=nlp,
+            preprocess_fn=lambda texts, nlp: cvf.preprocess_resume_texts(texts, nlp, batch_size=config.SPACY_BATCH_SIZE),
+            batch_sizes=config.warmup_batch_sizes(),
+            max_length=config.MAX_LENGTH,
+            executor=inference_executor,
+            threads=config.INFERENCE_WORKERS
+        )
+        # /predict/resume_text runs the resume model on the batcher's own thread
+        started = time.perf_counter()
+        category_batcher.submit(WARMUP_TEXT).result()
+        warmup_report["resume_category_batcher"] = round(time.perf_counter() - started, 3)
+
+def start_worker():
+    """Background startup: load and warm up, then mark this worker ready (or stop it)"""
+    try:
+        load_worker_artifacts()
+    except Exception as e:
+        print(f"Worker startup failed: {e}")
+        worker_registry.set_state("failed")
+        # Exit instead of idling unready, so the supervisor/orchestrator restarts us
+        os.kill(os.getpid(), signal.SIGTERM)
+        return
+    worker_registry.set_state("ready")
+
+def shutdown_worker_artifacts():
+    for batcher in (category_batcher, preprocess_batcher):
+        if batcher is not None:
+            batcher.stop()
+    for executor in (extraction_executor, inference_executor):
+        if executor is not None:
+            executor.shutdown()
+    shutdown_ocr_pool()
+    if result_cache is not None:
+        result_cache.close()
+
+def preprocess_batch(texts):
+    """Batcher body: clean + lemma_POS, timed as two stages"""
+    with metrics.stage("clean"):
+        cleaned = [cvf.clean_resume_text(text) for text in texts]
+    with metrics.stage("spacy"):
+        return cvf.lemma_pos_strings(cleaned, nlp, batch_size=config.SPACY_BATCH_SIZE)
+
+def encode(texts):
+    with metrics.stage("tokenize"):
+        return cvf.encode_texts(tokenizer, texts, config.MAX_LENGTH)
+
+def predict_categories(processed_texts):
+    """Blocking: [(category, confidence)] for already preprocessed texts"""
+    if len(processed_texts) == 0:
+        return []
+    padded = encode(processed_texts)
+    with metrics.stage("predict_resume"):
+        return cvf.predict_categories_from_ids(padded, resume_model, encoder)
+
+def preprocess_texts(texts):
+    """Blocking: clean + lemma_POS the texts, same as the training preprocessing"""
+    futures = [preprocess_batcher.submit(text) for text in texts]
+    return [future.result() for future in futures]
+
+async def cache_get(namespace, key):
+    """Memory tier inline, SQLite on the cache's disk thread so the event loop never waits on disk"""
+    cached = result_cache.get_memory(namespace, key)
+    if cached is None and result_cache.disk_enabled:
+        cached = await asyncio.wrap_future(result_cache.submit_disk(result_cache.get_disk, namespace, key))
+    metrics.CACHE_LOOKUPS.labels(namespace, "miss" if cached is None else "hit").inc()
+    return cached
+
+def cache_put(namespace, key, value):
+    """Memory tier inline; the SQLite write is queued on the disk thread, not awaited"""
+    created_at = result_cache.put_memory(namespace, key, value)
+    if result_cache.disk_enabled:
+        result_cache.submit_disk(result_cache.put_disk, namespace, key, value, created_at)
 
 # ===================== 3) Schemas =====================
 
@@ -46,74 +347,516 @@ class TextPredictionResponse(BaseModel):
     predicted_category: str
     confidence: float
 
+class BatchTextRequest(BaseModel):
+    texts: List[str]
+    batch_size: Optional[int] = None
+
 class PipelineResponse(BaseModel):
-    extracted_text: str
+    extracted_text: Optional[str]   # None when the client asked to omit it
     predicted_category: str
     confidence: float
     job_role_predictions: list
     summary: str
+    extraction_pages: list = []
+    extracted_text_truncated: bool = False
+
+class RecommendRequest(BaseModel):
+    resume_text: Optional[str] = None
+    predicted_category: Optional[str] = None   # predicted from resume_text when missing
+    top_n: int = config.RECOMMEND_TOP_N
+
+class RecommendResponse(BaseModel):
+    predicted_category: str
+    confidence: Optional[float]
+    method: str
+    total_recommendations: int
+    recommendations: list
 
 # ===================== 4) Prediction من نص عادي =====================
 
 @app.post("/predict/resume_text", response_model=TextPredictionResponse)
-def predict_resume_text(req: TextRequest):
-    category, conf = cvf.predict_resume_category(
-        resume_text=req.text,
-        model=resume_model,
-        tokenizer=tokenizer,
-        encoder=encoder,
-        max_length=500   # نفس الديفولت في الفنكشن بتاعتك
-    )
+async def predict_resume_text(req: TextRequest):
+    cache_key = hash_text(req.text) if result_cache is not None else None
+    if cache_key is not None:
+        cached = await cache_get("text", cache_key)
+        if cached is not None:
+            return TextPredictionResponse(**cached)
+
+    # The batcher runs the forward pass on its own thread, so awaiting here
+    # lets many requests queue up and land in the same batch
+    category, conf = await asyncio.wrap_future(category_batcher.submit(req.text))
+
+    if cache_key is not None:
+        cache_put("text", cache_key, {"predicted_category": str(category), "confidence": conf})
 
     return TextPredictionResponse(
         predicted_category=category,
         confidence=conf
     )
 
+@app.get("/stats/batcher")
+def batcher_stats():
+    return category_batcher.stats()
+
+@app.get("/stats/executors")
+def executor_stats():
+    return {
+        "extraction": extraction_executor.stats(),
+        "inference": inference_executor.stats(),
+    }
+
+@app.get("/stats/buckets")
+def bucket_stats():
+    return {
+        name: model.stats()
+        for name, model in (("resume", resume_model), ("job", job_model), ("fused", fused_model))
+        if isinstance(model, BucketedModel)
+    }
+
+@app.get("/health/live")
+def health_live():
+    """The process is up and serving HTTP (models may still be loading)"""
+    return {"status": "alive", "pid": os.getpid()}
+
+@app.get("/health/ready")
+def health_ready():
+    """200 once this worker's models are loaded and warmed up, 503 before that"""
+    state = worker_registry.state()
+    body = {"status": state, "pid": os.getpid(), "warmup_s": warmup_report}
+    return JSONResponse(status_code=200 if state == "ready" else 503, content=body)
+
+@app.get("/health/workers")
+def worker_health():
+    """Per-worker state, warm-up time and RSS/PSS (PSS counts shared pages once across workers)"""
+    workers = worker_registry.snapshot()
+    return {
+        "ready": worker_registry.all_ready(),
+        "serving_pid": os.getpid(),
+        "total_pss_mb": round(sum(w.get("pss_mb") or 0 for w in workers), 1),
+        "workers": workers,
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics_endpoint():
+    """Prometheus text exposition of this worker's metrics"""
+    if not metrics.REGISTRY.enabled:
+        raise HTTPException(status_code=404, detail="Metrics are disabled (METRICS_ENABLED=0)")
+    return PlainTextResponse(metrics.render(worker=worker_registry.slot), media_type="text/plain; version=0.0.4")
+
+@app.get("/stats/cache")
+def cache_stats():
+    if result_cache is None:
+        return {"enabled": False}
+    return result_cache.stats()
+
 # ===================== 5) Pipeline من PDF =====================
 
+def iter_resume_extraction(content):
+    """Blocking: extraction events from iter_pdf_extraction, recorded in the metrics"""
+    started = time.perf_counter()
+    for event, payload in iter_pdf_extraction(
+        content,
+        min_chars=config.TEXT_LAYER_MIN_CHARS,
+        min_alpha_ratio=config.TEXT_LAYER_MIN_ALPHA_RATIO,
+        ocr_dpi=config.OCR_DPI,
+        ocr_grayscale=config.OCR_GRAYSCALE,
+        ocr_workers=config.OCR_WORKERS,
+        ocr_max_pages=config.OCR_MAX_PAGES,
+        ocr_timeout=config.OCR_TIMEOUT_S
+    ):
+        if event == "page":
+            metrics.PDF_PAGES.labels(payload["method"]).inc()
+            metrics.PAGE_SECONDS.labels(payload["method"]).observe(payload["seconds"])
+        else:
+            metrics.STAGE_SECONDS.labels("extraction").observe(time.perf_counter() - started)
+            full_text, extraction_pages = payload
+            if not full_text:
+                metrics.FALLBACKS.labels("no_text_extracted").inc()
+                full_text = "No text extracted from PDF."
+            payload = (full_text, extraction_pages)
+        yield event, payload
+
+def extract_resume_text(content):
+    """Blocking: text layer first, OCR only for pages that need it"""
+    for event, payload in iter_resume_extraction(content):
+        if event == "done":
+            return payload
+
+def prepare_model_input(full_text):
+    """Blocking: preprocess and tokenize one extracted text"""
+    processed_text = preprocess_texts([full_text])[0]
+    return encode([processed_text])
+
+def predict_fused(padded):
+    with metrics.stage("predict_fused"):
+        return cvf.predict_category_and_job_roles_from_ids(padded, fused_model, encoder)
+
+def predict_category(padded):
+    with metrics.stage("predict_resume"):
+        return cvf.predict_categories_from_ids(padded, resume_model, encoder)[0]
+
+def predict_job_roles(padded):
+    with metrics.stage("predict_job"):
+        return cvf.predict_job_roles_from_ids(padded, job_model, encoder)
+
+def predict_category_and_roles(full_text):
+    """Blocking: category + job roles for the extracted text"""
+    padded = prepare_model_input(full_text)
+
+    if fused_model is not None:
+        # Tokenize once and run both models in a single forward pass
+        return predict_fused(padded)
+
+    metrics.FALLBACKS.labels("unfused_models").inc()
+    category, conf = predict_category(padded)
+    return category, conf, predict_job_roles(padded)
+
+def summarize(category, conf):
+    return f"Predicted resume category: {category} (confidence = {conf:.2f})."
+
+def shape_extracted_text(text, include_text=True, max_text_chars=None):
+    """(text to send, truncated?) for the include_text / max_text_chars options"""
+    if not include_text:
+        return None, True
+    if max_text_chars is not None and len(text) > max_text_chars:
+        return text[:max_text_chars], True
+    return text, False
+
+def shape_response(encoded, include_text=True, max_text_chars=None):
+    """Apply the extracted_text options to a full, encoded PipelineResponse"""
+    if include_text and max_text_chars is None:
+        return encoded
+    text, truncated = shape_extracted_text(encoded["extracted_text"] or "", include_text, max_text_chars)
+    return {**encoded, "extracted_text": text, "extracted_text_truncated": truncated}
+
 @app.post("/pipeline/analyze_resume", response_model=PipelineResponse)
-async def analyze_resume(file: UploadFile = File(...)):
-    # 1) قراءة الـ PDF using OCR
-    content = await file.read()
-    
-    # Try OCR first
-    full_text = cvf.extract_text_from_pdf_ocr(content)
-    
-    # Fallback to normal extraction if OCR returns empty (or you can combine both)
-    if not full_text.strip():
-        print("OCR returned empty, trying standard extraction...")
-        with fitz.open(stream=content, filetype="pdf") as doc:
-            pages_text = [page.get_text() for page in doc]
-        full_text = "\n".join(pages_text).strip()
-
-    if not full_text:
-        full_text = "No text extracted from PDF."
-
-    # 2) Prediction Category
-    category, conf = cvf.predict_resume_category(
-        resume_text=full_text,
-        model=resume_model,
-        tokenizer=tokenizer,
-        encoder=encoder,
-        max_length=500
-    )
-    
-    # 3) Predict Job Role (Dynamic)
-    job_predictions = cvf.predict_job_role(
-        resume_text=full_text,
-        model=job_model,
-        tokenizer=tokenizer,
-        encoder=encoder,
-        max_length=500
-    )
+async def analyze_resume(
+    file: UploadFile = File(...),
+    include_text: bool = True,
+    max_text_chars: Optional[int] = Query(None, ge=0),
+):
+    """Full analysis in one response; include_text=false or max_text_chars shrink extracted_text"""
+    # 1) قراءة الـ PDF
+    with metrics.stage("upload_read"):
+        content = await file.read()
+
+    # Re-uploads of the same CV skip OCR and inference entirely
+    cache_key = hash_bytes(content) if result_cache is not None else None
+    if cache_key is not None:
+        cached = await cache_get("pdf", cache_key)
+        if cached is not None:
+            return JSONResponse(content=shape_response(cached, include_text, max_text_chars))
+
+    full_text, extraction_pages = await extraction_executor.run(extract_resume_text, content)
+
+    # 2) + 3) Category and job roles
+    category, conf, job_predictions = await inference_executor.run(predict_category_and_roles, full_text)
+
+    summary = summarize(category, conf)
+
+    with metrics.stage("serialize"):
+        response = PipelineResponse(
+            extracted_text=full_text,
+            predicted_category=category,
+            confidence=conf,
+            job_role_predictions=job_predictions,
+            summary=summary,
+            extraction_pages=extraction_pages
+        )
+        encoded = jsonable_encoder(response)
+
+    if cache_key is not None:
+        cache_put("pdf", cache_key, encoded)
+
+    # Already encoded, so FastAPI doesn't validate and encode the model a second time
+    return JSONResponse(content=shape_response(encoded, include_text, max_text_chars))
+
+STREAM_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "sse": "text/event-stream"}
+
+def format_event(stream_format, event, data):
+    """One NDJSON line ({"event": ..., **data}) or one Server-Sent Event"""
+    if stream_format == "sse":
+        return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+    return json.dumps({"event": event, **data}) + "\n"
+
+@app.post("/pipeline/analyze_resume/stream")
+async def analyze_resume_stream(
+    file: UploadFile = File(...),
+    stream_format: Literal["ndjson", "sse"] = Query("ndjson", alias="format"),
+    include_text: bool = True,
+    max_text_chars: Optional[int] = Query(None, ge=0),
+):
+    """
+    Streaming variant of /pipeline/analyze_resume. Emits, in order:
+      page       once per page as its text is final (OCR pages as they finish)
+      extracted  page count, text length and (optionally) the extracted text
+      category   predicted_category + confidence
+      job_roles  job_role_predictions
+      done       summary, and whether the result came from the cache
+    or a single error event if extraction fails.
+    """
+    with metrics.stage("upload_read"):
+        content = await file.read()
+
+    def emit(event, data):
+        return format_event(stream_format, event, data)
+
+    def extracted_event(full_text, pages):
+        text, truncated = shape_extracted_text(full_text, include_text, max_text_chars)
+        return emit("extracted", {
+            "pages": len(pages),
+            "chars": len(full_text),
+            "extracted_text": text,
+            "extracted_text_truncated": truncated,
+        })
+
+    cache_key = hash_bytes(content) if result_cache is not None else None
+    cached = await cache_get("pdf", cache_key) if cache_key is not None else None
+
+    if cached is not None:
+        async def replay():
+            for page in cached["extraction_pages"]:
+                yield emit("page", page)
+            yield extracted_event(cached["extracted_text"], cached["extraction_pages"])
+            yield emit("category", {"predicted_category": cached["predicted_category"], "confidence": cached["confidence"]})
+            yield emit("job_roles", {"job_role_predictions": cached["job_role_predictions"]})
+            yield emit("done", {"summary": cached["summary"], "cached": True})
+
+        return StreamingResponse(replay(), media_type=STREAM_MEDIA_TYPES[stream_format])
+
+    # Extraction runs on the extraction pool and hands events to the stream
+    # through an asyncio queue; a disconnect stops it between pages
+    loop = asyncio.get_running_loop()
+    events = asyncio.Queue()
+    cancelled = threading.Event()
+
+    def extract_into_queue():
+        try:
+            # closing() so an early return also cancels the pending OCR pages
+            with closing(iter_resume_extraction(content)) as extraction:
+                for item in extraction:
+                    if cancelled.is_set():
+                        return
+                    loop.call_soon_threadsafe(events.put_nowait, item)
+        except Exception as e:
+            loop.call_soon_threadsafe(events.put_nowait, ("error", str(e)))
+
+    # Submitted before streaming starts, so a full pool still answers 429
+    extraction_executor.submit(extract_into_queue)
+
+    async def stream():
+        try:
+            while True:
+                event, payload = await events.get()
+                if event == "page":
+                    yield emit("page", payload)
+                elif event == "error":
+                    yield emit("error", {"detail": payload})
+                    return
+                else:
+                    full_text, extraction_pages = payload
+                    break
+
+            yield extracted_event(full_text, extraction_pages)
 
-    summary = f"Predicted resume category: {category} (confidence = {conf:.2f})."
+            padded = await inference_executor.run(prepare_model_input, full_text)
+            if fused_model is not None:
+                category, conf, job_predictions = await inference_executor.run(predict_fused, padded)
+                yield emit("category", {"predicted_category": str(category), "confidence": conf})
+            else:
+                metrics.FALLBACKS.labels("unfused_models").inc()
+                category, conf = await inference_executor.run(predict_category, padded)
+                yield emit("category", {"predicted_category": str(category), "confidence": conf})
+                job_predictions = await inference_executor.run(predict_job_roles, padded)
+            yield emit("job_roles", {"job_role_predictions": jsonable_encoder(job_predictions)})
 
-    return PipelineResponse(
-        extracted_text=full_text,
+            summary = summarize(category, conf)
+            if cache_key is not None:
+                cache_put("pdf", cache_key, jsonable_encoder(PipelineResponse(
+                    extracted_text=full_text,
+                    predicted_category=category,
+                    confidence=conf,
+                    job_role_predictions=job_predictions,
+                    summary=summary,
+                    extraction_pages=extraction_pages
+                )))
+            yield emit("done", {"summary": summary, "cached": False})
+        except ExecutorBusy as e:
+            yield emit("error", {"detail": f"Server busy ({e.name}), please retry later"})
+        finally:
+            cancelled.set()
+
+    return StreamingResponse(stream(), media_type=STREAM_MEDIA_TYPES[stream_format])
+
+# ===================== 5b) Job recommendations =====================
+
+@app.post("/recommend/jobs", response_model=RecommendResponse)
+async def recommend_jobs(req: RecommendRequest):
+    """Jobs from the precomputed index: category title match, re-ranked 60/40 with the resume"""
+    if job_index is None:
+        raise HTTPException(status_code=503, detail=f"Job index not built or disabled (JOB_INDEX_DIR={config.JOB_INDEX_DIR!r})")
+    if not req.predicted_category and not req.resume_text:
+        raise HTTPException(status_code=422, detail="Provide resume_text, predicted_category or both")
+    if req.top_n < 1:
+        raise HTTPException(status_code=422, detail="top_n must be at least 1")
+
+    category, conf = req.predicted_category, None
+    if not category:
+        category, conf = await asyncio.wrap_future(category_batcher.submit(req.resume_text))
+
+    def recommend():
+        with metrics.stage("recommend"):
+            return job_index.recommend(str(category), req.resume_text, top_n=req.top_n,
+                                       candidates=config.JOB_INDEX_CANDIDATES)
+
+    recommendations = await inference_executor.run(recommend)
+
+    return RecommendResponse(
         predicted_category=category,
         confidence=conf,
-        job_role_predictions=job_predictions,
-        summary=summary
+        method="TF-IDF Title + Resume" if req.resume_text else "TF-IDF Title",
+        total_recommendations=len(recommendations),
+        recommendations=recommendations
     )
+
+# ===================== 6) Bulk scoring =====================
+
+def score_batch_lines(start, texts, names=None):
+    """Blocking: one forward pass over texts, returned as NDJSON lines"""
+    results = predict_categories(preprocess_texts(texts))
+
+    lines = []
+    for offset, (category, conf) in enumerate(results):
+        record = {"index": start + offset, "predicted_category": str(category), "confidence": conf}
+        if names is not None:
+            record["filename"] = names[offset]
+        lines.append(json.dumps(record) + "\n")
+    return "".join(lines)
+
+def resolve_batch_size(requested):
+    if not requested or requested < 1:
+        return config.PREDICT_BATCH_SIZE
+    return min(requested, config.PREDICT_BATCH_SIZE)
+
+def busy_line(exc, **fields):
+    """NDJSON error line for a pool that filled up after the stream started"""
+    return json.dumps({**fields, "error": f"Server busy ({exc.name}), please retry later"}) + "\n"
+
+@app.post("/predict/resume_batch")
+async def predict_resume_batch(req: BatchTextRequest):
+    if len(req.texts) > config.BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {config.BULK_MAX_ITEMS} texts per request")
+
+    batch_size = resolve_batch_size(req.batch_size)
+
+    # The first batch is submitted before the 200 goes out, so a full pool
+    # still answers 429 + Retry-After instead of an empty stream
+    first = inference_executor.submit(score_batch_lines, 0, req.texts[:batch_size])
+
+    async def stream():
+        # Each batch is scored on the inference pool and flushed as soon as it's done
+        yield await asyncio.wrap_future(first)
+        for start in range(batch_size, len(req.texts), batch_size):
+            try:
+                yield await inference_executor.run(score_batch_lines, start, req.texts[start:start + batch_size])
+            except ExecutorBusy as e:
+                # Too late for a 429: report where scoring stopped so the client can resume from there
+                yield busy_line(e, index=start)
+                return
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+def expand_uploads(uploads, max_items=None, max_bytes=None):
+    """
+    Turn (filename, bytes) uploads into a flat list of PDFs, unpacking any zip
+    archives. Member counts and sizes are checked against max_items/max_bytes
+    from the archive directory before anything is decompressed, and reads are
+    capped in case the declared sizes lie. Raises HTTPException(413) past either limit.
+    """
+    def too_large(detail):
+        return HTTPException(status_code=413, detail=detail)
+
+    documents = []
+    total = 0
+    for filename, content in uploads:
+        if not zipfile.is_zipfile(io.BytesIO(content)):
+            documents.append((filename, content))
+            total += len(content)
+            continue
+
+        with zipfile.ZipFile(io.BytesIO(content)) as archive:
+            members = [m for m in archive.infolist() if not m.is_dir() and m.filename.lower().endswith(".pdf")]
+            if max_items is not None and len(documents) + len(members) > max_items:
+                raise too_large(f"At most {max_items} documents per request")
+            if max_bytes is not None and total + sum(m.file_size for m in members) > max_bytes:
+                raise too_large(f"Uploads may total at most {max_bytes // (1 << 20)} MB uncompressed")
+
+            for member in members:
+                limit = None if max_bytes is None else max_bytes - total
+                with archive.open(member) as handle:
+                    data = handle.read() if limit is None else handle.read(limit + 1)
+                if limit is not None and len(data) > limit:
+                    raise too_large(f"Uploads may total at most {max_bytes // (1 << 20)} MB uncompressed")
+                documents.append((f"{filename}/{member.filename}", data))
+                total += len(data)
+
+        if max_items is not None and len(documents) > max_items:
+            raise too_large(f"At most {max_items} documents per request")
+    return documents
+
+@app.post("/predict/resume_batch/files")
+async def predict_resume_batch_files(files: List[UploadFile] = File(...), batch_size: Optional[int] = None):
+    max_bytes = config.BULK_MAX_UPLOAD_MB << 20
+    uploads = []
+    received = 0
+    for file in files:
+        content = await file.read()
+        received += len(content)
+        if received > max_bytes:
+            raise HTTPException(status_code=413, detail=f"Uploads may total at most {config.BULK_MAX_UPLOAD_MB} MB")
+        uploads.append((file.filename, content))
+
+    # Unzipping is blocking work, so it runs on the extraction pool like the PDFs themselves
+    documents = await extraction_executor.run(expand_uploads, uploads, config.BULK_MAX_ITEMS, max_bytes)
+    if len(documents) > config.BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {config.BULK_MAX_ITEMS} documents per request")
+
+    batch_size = resolve_batch_size(batch_size)
+    window = config.EXTRACTION_WORKERS
+
+    def submit_window(start):
+        # Extract a window of PDFs in parallel without overflowing the extraction pool
+        chunk = documents[start:start + window]
+        return chunk, [extraction_executor.submit(extract_resume_text, content) for _, content in chunk]
+
+    # The first window is submitted before the 200 goes out, so a full pool still answers 429
+    first_window = submit_window(0)
+
+    async def stream():
+        pending = []
+        scored = 0
+        for i in range(0, len(documents), window):
+            try:
+                chunk, futures = first_window if i == 0 else submit_window(i)
+            except ExecutorBusy as e:
+                yield busy_line(e, filename=documents[i][0])
+                return
+            extracted = await asyncio.gather(*[asyncio.wrap_future(f) for f in futures], return_exceptions=True)
+            for (name, _), result in zip(chunk, extracted):
+                if isinstance(result, Exception):
+                    yield json.dumps({"filename": name, "error": str(result)}) + "\n"
+                else:
+                    pending.append((name, result[0]))
+
+            while len(pending) >= batch_size or (pending and i + window >= len(documents)):
+                batch, pending = pending[:batch_size], pending[batch_size:]
+                try:
+                    yield await inference_executor.run(
+                        score_batch_lines, scored, [t for _, t in batch], [n for n, _ in batch]
+                    )
+                except ExecutorBusy as e:
+                    yield busy_line(e, index=scored, filename=batch[0][0])
+                    return
+                scored += len(batch)
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
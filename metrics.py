@@ -0,0 +1,305 @@
+"""Prometheus-style metrics for the Resume API, without extra dependencies.
+
+Counters, gauges and histograms with labels, rendered in the Prometheus text
+exposition format by render() for the /metrics endpoint. When metrics are
+disabled (METRICS_ENABLED=0) every metric is a shared no-op object, so
+instrumented code costs one attribute lookup and an empty call.
+
+Values are per process: under serve.py each worker keeps its own, and every
+sample carries a `worker` label with the worker's slot index (not its pid, so
+a restarted worker reuses its label set instead of adding a new one).
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+import config
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """Base class: a named family of samples keyed by label values"""
+
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        """The child metric for these label values (created on first use)"""
+        values = tuple(str(value) for value in values)
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _default(self):
+        return self.labels() if not self.labelnames else None
+
+    def render(self, extra_labels=()):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in sorted(self._children.items()):
+            lines.extend(child.samples(self.name, self.labelnames, values, extra_labels))
+        return lines
+
+
+class CounterChild:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1.0):
+        with self._lock:
+            self.value += amount
+
+    def samples(self, name, labelnames, values, extra):
+        return [f"{name}_total{format_labels(labelnames, values, extra)} {format_value(self.value)}"]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return CounterChild()
+
+    def inc(self, amount=1.0):
+        self._default().inc(amount)
+
+
+class GaugeChild:
+    def __init__(self):
+        self.value = 0.0
+        self.function = None
+        self._lock = threading.Lock()
+
+    def set(self, value):
+        self.value = value
+
+    def inc(self, amount=1.0):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount=1.0):
+        self.inc(-amount)
+
+    def set_function(self, function):
+        """Read the value from function() at scrape time"""
+        self.function = function
+
+    @contextmanager
+    def track_inprogress(self):
+        self.inc()
+        try:
+            yield
+        finally:
+            self.dec()
+
+    def samples(self, name, labelnames, values, extra):
+        value = self.value
+        if self.function is not None:
+            try:
+                value = self.function()
+            except Exception:
+                value = float("nan")
+        return [f"{name}{format_labels(labelnames, values, extra)} {format_value(value)}"]
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def _new_child(self):
+        return GaugeChild()
+
+    def set(self, value):
+        self._default().set(value)
+
+    def inc(self, amount=1.0):
+        self._default().inc(amount)
+
+    def dec(self, amount=1.0):
+        self._default().dec(amount)
+
+    def set_function(self, function):
+        self._default().set_function(function)
+
+    def track_inprogress(self):
+        return self._default().track_inprogress()
+
+
+class HistogramChild:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    @contextmanager
+    def time(self):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+    def samples(self, name, labelnames, values, extra):
+        with self._lock:
+            counts, total = list(self.counts), self.sum
+        lines = []
+        cumulative = 0
+        for bound, count in zip(list(self.buckets) + [float("inf")], counts):
+            cumulative += count
+            le = (("le", format_value(bound)),)
+            lines.append(f"{name}_bucket{format_labels(labelnames, values, tuple(extra) + le)} {cumulative}")
+        labels = format_labels(labelnames, values, extra)
+        lines.append(f"{name}_sum{labels} {format_value(total)}")
+        lines.append(f"{name}_count{labels} {cumulative}")
+        return lines
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return HistogramChild(self.buckets)
+
+    def observe(self, value):
+        self._default().observe(value)
+
+    def time(self):
+        return self._default().time()
+
+
+class NoopMetric:
+    """Stands in for any metric (and any of its children) when metrics are disabled"""
+
+    def labels(self, *values):
+        return self
+
+    def inc(self, amount=1.0):
+        pass
+
+    def dec(self, amount=1.0):
+        pass
+
+    def set(self, value):
+        pass
+
+    def set_function(self, function):
+        pass
+
+    def observe(self, value):
+        pass
+
+    def time(self):
+        return self
+
+    def track_inprogress(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+NOOP = NoopMetric()
+
+
+class Registry:
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._metrics = []
+
+    def _register(self, metric):
+        if not self.enabled:
+            return NOOP
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self, extra_labels=()):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render(extra_labels))
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry(enabled=config.METRICS_ENABLED)
+
+# ===================== Resume API metrics =====================
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "resume_api_stage_seconds", "Time spent in each pipeline stage", ["stage"]
+)
+REQUEST_SECONDS = REGISTRY.histogram(
+    "resume_api_request_seconds", "End-to-end request latency", ["path", "status"]
+)
+IN_FLIGHT = REGISTRY.gauge(
+    "resume_api_in_flight_requests", "Requests currently being handled"
+)
+QUEUE_DEPTH = REGISTRY.gauge(
+    "resume_api_queue_depth", "Items waiting in each batcher/executor queue", ["queue"]
+)
+PDF_PAGES = REGISTRY.counter(
+    "resume_api_pdf_pages", "PDF pages by extraction method", ["method"]
+)
+PAGE_SECONDS = REGISTRY.histogram(
+    "resume_api_pdf_page_seconds", "Extraction time per PDF page", ["method"]
+)
+CACHE_LOOKUPS = REGISTRY.counter(
+    "resume_api_cache_lookups", "Result cache lookups", ["namespace", "result"]
+)
+FALLBACKS = REGISTRY.counter(
+    "resume_api_fallbacks", "Fallback paths taken", ["kind"]
+)
+
+
+def stage(name):
+    """Context manager timing one pipeline stage into resume_api_stage_seconds"""
+    return STAGE_SECONDS.labels(name).time()
+
+
+def render(worker=0):
+    """All metrics in the Prometheus text format, labelled with the worker slot"""
+    return REGISTRY.render(extra_labels=(("worker", worker),))
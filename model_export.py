@@ -0,0 +1,279 @@
+"""Export the Keras models to TFLite and serve them without the Keras runtime.
+
+TensorFlow's per-call overhead dominates single-resume latency on CPU, so the
+resume classifier and the job recommender can be converted once to TFLite
+(optionally with float16 or int8 weight quantization) and served through a
+TFLite interpreter, which main.py picks with MODEL_RUNTIME=tflite.
+
+    python model_export.py export models/resume_classifier_model.h5 -o models/resume_classifier_model.tflite
+    python model_export.py export models/job_recommender.h5 -o models/job_recommender.tflite --quantize float16
+    python model_export.py report models/resume_classifier_model.h5 models/resume_classifier_model.tflite \\
+        --input preprocessed_resumes.csv
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+import numpy as np
+
+QUANTIZATION_MODES = ("none", "float16", "int8")
+
+
+def convert_to_tflite(model, quantize="none"):
+    """
+    Convert a Keras model to a TFLite flatbuffer (bytes).
+    quantize: "none", "float16" (half-size weights) or "int8" (dynamic-range
+    int8 weights, float activations).
+    """
+    import tensorflow as tf
+
+    if quantize not in QUANTIZATION_MODES:
+        raise ValueError(f"quantize must be one of {QUANTIZATION_MODES}, got {quantize!r}")
+
+    def make_converter(select_tf_ops):
+        converter = tf.lite.TFLiteConverter.from_keras_model(model)
+        if quantize != "none":
+            converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        if quantize == "float16":
+            converter.target_spec.supported_types = [tf.float16]
+        if select_tf_ops:
+            converter.target_spec.supported_ops = [
+                tf.lite.OpsSet.TFLITE_BUILTINS,
+                tf.lite.OpsSet.SELECT_TF_OPS,
+            ]
+        return converter
+
+    try:
+        # Keras LSTMs normally lower to the fused TFLite LSTM op
+        return make_converter(select_tf_ops=False).convert()
+    except Exception as e:
+        print(f"Builtin-only conversion failed ({e}); retrying with TF select ops")
+        return make_converter(select_tf_ops=True).convert()
+
+
+def export_tflite(model_path, output_path, quantize="none"):
+    """Load the Keras model at model_path and write it as TFLite to output_path"""
+    from tensorflow.keras.models import load_model
+
+    model = load_model(model_path)
+    flatbuffer = convert_to_tflite(model, quantize=quantize)
+    with open(output_path, "wb") as handle:
+        handle.write(flatbuffer)
+    print(f"Exported {model_path} ({os.path.getsize(model_path) / 1e6:.1f} MB) to {output_path} "
+          f"({len(flatbuffer) / 1e6:.1f} MB, quantize={quantize})")
+
+
+def make_interpreter(model_path, num_threads=None):
+    """TFLite interpreter from tflite_runtime if installed, else from TensorFlow"""
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        from tensorflow.lite import Interpreter
+    return Interpreter(model_path=model_path, num_threads=num_threads)
+
+
+def padded_batch_size(rows):
+    """Batch size a TFLiteModel runs rows at: the next power of two"""
+    return 1 << max(int(rows) - 1, 0).bit_length()
+
+
+class TFLiteModel:
+    """
+    predict_on_batch/predict over a TFLite model, so it can stand in for the
+    Keras model in cv_inference. Interpreters aren't thread-safe, so each
+    thread gets its own (they all map the same file). Resizing an interpreter
+    reallocates all its tensors, so each thread keeps one interpreter per
+    input shape, with the batch padded up to a power of two (padded_batch_size)
+    to keep the number of shapes small.
+    """
+
+    def __init__(self, model_path, num_threads=None):
+        self.model_path = model_path
+        self.num_threads = num_threads
+        self.name = os.path.splitext(os.path.basename(model_path))[0]
+        self._local = threading.local()
+        # Load once up front so a bad file fails at startup, not on the first request
+        self._interpreter()
+
+    def _interpreter(self, shape=None):
+        """This thread's interpreter allocated for input shape (None: the shape in the file)"""
+        states = getattr(self._local, "states", None)
+        if states is None:
+            states = self._local.states = {}
+        state = states.get(shape)
+        if state is None:
+            interpreter = make_interpreter(self.model_path, num_threads=self.num_threads)
+            if shape is not None:
+                interpreter.resize_tensor_input(interpreter.get_input_details()[0]["index"], shape)
+            interpreter.allocate_tensors()
+            state = states[shape] = {
+                "interpreter": interpreter,
+                "input": interpreter.get_input_details()[0],
+                "outputs": interpreter.get_output_details(),
+            }
+        return state
+
+    @property
+    def input_shape(self):
+        return tuple(self._interpreter()["input"]["shape"])
+
+    def batch_sizes(self, max_batch_size):
+        """Every padded batch size up to max_batch_size's, for warm-up"""
+        sizes, size = [], 1
+        while size <= padded_batch_size(max_batch_size):
+            sizes.append(size)
+            size *= 2
+        return sizes
+
+    def predict_on_batch(self, x):
+        x = np.asarray(x)
+        rows = len(x)
+        batch_size = padded_batch_size(rows)
+        if batch_size != rows:
+            x = np.concatenate([x, np.zeros((batch_size - rows,) + x.shape[1:], dtype=x.dtype)])
+
+        state = self._interpreter(x.shape)
+        interpreter = state["interpreter"]
+        interpreter.set_tensor(state["input"]["index"], x.astype(state["input"]["dtype"], copy=False))
+        interpreter.invoke()
+        outputs = [interpreter.get_tensor(detail["index"])[:rows] for detail in state["outputs"]]
+        return outputs[0] if len(outputs) == 1 else outputs
+
+    def predict(self, x, **kwargs):
+        return self.predict_on_batch(x)
+
+
+def held_out_split(path, text_column="Resume_POS_text", label_column="Category", test_size=0.2, random_state=42,
+                   group_column=None):
+    """
+    The test rows of training's split_data: (texts, labels). split_data is run
+    on the row indices with the one-hot labels of encode_labels, exactly as in
+    training, so path must hold the rows the model was trained on, in the
+    same order (and group_column if training split with groups).
+    """
+    from cv_lstm_functions import encode_labels, load_preprocessed_data, split_data
+
+    df = load_preprocessed_data(path)
+    y, _ = encode_labels(df[label_column])
+    groups = df[group_column].to_numpy() if group_column else None
+    _, test_rows, _, _ = split_data(np.arange(len(df)), y, test_size=test_size, random_state=random_state,
+                                    groups=groups)
+
+    test = df.iloc[test_rows]
+    return test[text_column].fillna("").astype(str).tolist(), test[label_column].astype(str).tolist()
+
+
+def time_batches(model, padded, batch_size):
+    latencies = []
+    outputs = []
+    for i in range(0, len(padded), batch_size):
+        started = time.perf_counter()
+        outputs.append(np.asarray(model.predict_on_batch(padded[i:i + batch_size])))
+        latencies.append((time.perf_counter() - started) * 1000.0)
+    return np.concatenate(outputs), latencies
+
+
+def parity_report(keras_path, tflite_path, texts, labels=None, tokenizer_path=None, encoder_path=None,
+                  max_length=500, batch_size=64, num_threads=None, latency_samples=200):
+    """Print accuracy and latency of the Keras and TFLite models side by side"""
+    import config
+    from tensorflow.keras.models import load_model
+    from cv_inference import encode_texts
+    from fast_tokenizer import load_tokenizer
+
+    tokenizer_path = tokenizer_path or (
+        config.TOKENIZER_VOCAB_PATH if os.path.exists(config.TOKENIZER_VOCAB_PATH) else config.TOKENIZER_PATH
+    )
+    tokenizer = load_tokenizer(tokenizer_path)
+    padded = encode_texts(tokenizer, texts, max_length)
+
+    keras_model = load_model(keras_path)
+    tflite_model = TFLiteModel(tflite_path, num_threads=num_threads)
+
+    # Warm up both
+    keras_model.predict_on_batch(padded[:batch_size])
+    tflite_model.predict_on_batch(padded[:batch_size])
+
+    rows = []
+    outputs = {}
+    for name, model in (("keras", keras_model), ("tflite", tflite_model)):
+        probs, batch_latencies = time_batches(model, padded, batch_size)
+        _, single_latencies = time_batches(model, padded[:latency_samples], 1)
+        outputs[name] = probs
+        p95 = sorted(single_latencies)[int(0.95 * (len(single_latencies) - 1))]
+        rows.append((name, statistics.median(single_latencies), p95, len(padded) / (sum(batch_latencies) / 1000.0)))
+
+    print(f"{len(texts)} held-out texts, max_length={max_length}\n")
+    print(f"{'runtime':<10}{'size MB':>10}{'p50 ms':>10}{'p95 ms':>10}{f'rows/s @{batch_size}':>16}")
+    for (name, p50, p95, throughput), path in zip(rows, (keras_path, tflite_path)):
+        print(f"{name:<10}{os.path.getsize(path) / 1e6:>10.1f}{p50:>10.2f}{p95:>10.2f}{throughput:>16.1f}")
+
+    expected, actual = outputs["keras"], outputs["tflite"]
+    agreement = float((expected.argmax(axis=1) == actual.argmax(axis=1)).mean())
+    print(f"\nmax |dp| = {float(np.abs(expected - actual).max()):.2e}, top-1 agreement = {agreement * 100:.2f}%")
+
+    if labels is not None and encoder_path:
+        import pickle
+
+        with open(encoder_path, "rb") as handle:
+            encoder = pickle.load(handle)
+        classes = list(encoder.classes_)
+        known = np.array([label in classes for label in labels])
+        if known.any():
+            y = np.array([classes.index(label) for label, ok in zip(labels, known) if ok])
+            for name in ("keras", "tflite"):
+                accuracy = float((outputs[name][known].argmax(axis=1) == y).mean())
+                print(f"{name} accuracy: {accuracy * 100:.2f}% on {int(known.sum())} labelled rows")
+    return agreement
+
+
+def main(argv=None):
+    import config
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="convert a Keras .h5 model to TFLite")
+    export.add_argument("model")
+    export.add_argument("-o", "--output", required=True)
+    export.add_argument("--quantize", choices=QUANTIZATION_MODES, default="none")
+
+    report = commands.add_parser("report", help="compare a TFLite export with the Keras model")
+    report.add_argument("keras_model")
+    report.add_argument("tflite_model")
+    report.add_argument("--input", required=True,
+                        help="the preprocessed CSV/Parquet the model was trained on; its split_data test rows are used")
+    report.add_argument("--text-column", default="Resume_POS_text")
+    report.add_argument("--label-column", default="Category")
+    report.add_argument("--group-column", help="dup_cluster column, if training split with groups")
+    report.add_argument("--encoder", default=config.ENCODER_PATH, help="label encoder for accuracy (resume model)")
+    report.add_argument("--no-accuracy", action="store_true", help="skip accuracy (e.g. for the job model)")
+    report.add_argument("--batch-size", type=int, default=64)
+    report.add_argument("--max-length", type=int, default=config.MAX_LENGTH)
+    report.add_argument("--threads", type=int, default=config.TFLITE_NUM_THREADS or None)
+    report.add_argument("--min-agreement", type=float, default=0.99)
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        export_tflite(args.model, args.output, quantize=args.quantize)
+        return
+
+    texts, labels = held_out_split(args.input, args.text_column, args.label_column,
+                                   group_column=args.group_column)
+    agreement = parity_report(
+        args.keras_model, args.tflite_model, texts,
+        labels=None if args.no_accuracy else labels,
+        encoder_path=None if args.no_accuracy else args.encoder,
+        max_length=args.max_length, batch_size=args.batch_size, num_threads=args.threads
+    )
+    if agreement < args.min_agreement:
+        print(f"FAIL: top-1 agreement below {args.min_agreement * 100:.1f}%")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""Near-duplicate resume detection with MinHash + LSH.
+
+merge_datasets only drops exact duplicate rows, but the merged corpus holds
+many resumes that differ only in a contact line or a few words once cleaned
+(clean_resume_text already removes case, whitespace, URL and e-mail
+differences). Those inflate training time and leak between the train and test
+sets of split_data.
+
+Each cleaned resume becomes a set of word shingles and a MinHash signature of
+num_perm values. LSH splits the signature into bands; resumes sharing any
+band land in the same bucket, and a bucket member is merged into the
+bucket's first resume (union-find) when their estimated Jaccard similarity
+reaches the threshold. Everything is one pass over the texts plus one over
+the bands, so it runs in roughly linear time.
+
+find_near_duplicates returns a cluster id per row: keep one representative
+per cluster with drop_near_duplicates, or pass the ids to
+split_data(..., groups=...) so no cluster straddles train and test.
+
+    python near_duplicates.py preprocessed_resumes.parquet -o deduped_resumes.parquet --report
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+SHINGLE_PRIME = np.uint64(1000003)
+
+
+def lsh_bands(num_perm, threshold):
+    """
+    (bands, rows) with bands * rows == num_perm whose S-curve threshold
+    (1 / bands) ** (1 / rows) is closest to threshold
+    """
+    options = [(b, num_perm // b) for b in range(1, num_perm + 1) if num_perm % b == 0]
+    return min(options, key=lambda option: abs((1.0 / option[0]) ** (1.0 / option[1]) - threshold))
+
+
+class MinHasher:
+    """MinHash signatures of word-shingle sets (seeded, so stable across runs)"""
+
+    def __init__(self, num_perm=128, shingle_size=3, seed=42):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        self.a = rng.randint(1, np.iinfo(np.int32).max, size=num_perm, dtype=np.int64).astype(np.uint64)
+        self.b = rng.randint(0, np.iinfo(np.int32).max, size=num_perm, dtype=np.int64).astype(np.uint64)
+        self.vocab = {}
+
+    def shingle_hashes(self, text):
+        """32-bit hashes of the text's word shingles (the whole text for shorter ones)"""
+        ids = np.fromiter((self.vocab.setdefault(word, len(self.vocab)) for word in text.split()), dtype=np.uint64)
+        if len(ids) == 0:
+            return ids
+        size = min(self.shingle_size, len(ids))
+        hashes = np.zeros(len(ids) - size + 1, dtype=np.uint64)
+        for offset in range(size):
+            hashes = hashes * SHINGLE_PRIME + ids[offset:len(ids) - size + 1 + offset]
+        return np.unique(hashes & MAX_HASH)
+
+    def signature(self, text):
+        hashes = self.shingle_hashes(text)
+        if len(hashes) == 0:
+            return np.full(self.num_perm, MAX_HASH, dtype=np.uint32)
+        permuted = (np.outer(hashes, self.a) + self.b) % MERSENNE_PRIME & MAX_HASH
+        return permuted.min(axis=0).astype(np.uint32)
+
+    def signatures(self, texts):
+        """(len(texts), num_perm) signature matrix"""
+        out = np.empty((len(texts), self.num_perm), dtype=np.uint32)
+        for i, text in enumerate(texts):
+            out[i] = self.signature(text if isinstance(text, str) else "")
+        return out
+
+
+class UnionFind:
+    def __init__(self, size):
+        self.parent = np.arange(size)
+
+    def find(self, item):
+        root = item
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[item] != root:
+            self.parent[item], item = root, self.parent[item]
+        return root
+
+    def union(self, a, b):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            # The lower index stays the root, so it is the cluster's representative
+            self.parent[max(root_a, root_b)] = min(root_a, root_b)
+
+
+def find_near_duplicates(texts, threshold=0.8, num_perm=128, shingle_size=3, seed=42):
+    """
+    Cluster id for each text: the index of its cluster's first text (texts
+    with no near-duplicate are their own cluster).
+    """
+    started = time.perf_counter()
+    signatures = MinHasher(num_perm, shingle_size, seed).signatures(list(texts))
+    bands, rows = lsh_bands(num_perm, threshold)
+    clusters = UnionFind(len(signatures))
+
+    candidates = merged = 0
+    for band in range(bands):
+        buckets = {}
+        band_values = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+        for i in range(len(band_values)):
+            first = buckets.setdefault(band_values[i].tobytes(), i)
+            if first == i:
+                continue
+            candidates += 1
+            if clusters.find(i) == clusters.find(first):
+                continue
+            # Verify the candidate with the full signature to drop LSH false positives
+            if np.mean(signatures[i] == signatures[first]) >= threshold:
+                clusters.union(i, first)
+                merged += 1
+
+    cluster_ids = np.array([clusters.find(i) for i in range(len(signatures))])
+    print(f"Near-duplicates: {len(signatures):,} texts, {bands} bands x {rows} rows, "
+          f"{candidates:,} candidate pairs, {merged:,} merged, {len(np.unique(cluster_ids)):,} clusters "
+          f"in {time.perf_counter() - started:.1f}s")
+    return cluster_ids
+
+
+def add_duplicate_clusters(df, column="Resume", threshold=0.8, **kwargs):
+    """Add a dup_cluster column (near-duplicate cluster ids of df[column])"""
+    df = df.reset_index(drop=True)
+    df["dup_cluster"] = find_near_duplicates(df[column].tolist(), threshold=threshold, **kwargs)
+    return df
+
+
+def drop_near_duplicates(df, column="Resume", threshold=0.8, **kwargs):
+    """Keep the first resume of every near-duplicate cluster"""
+    df = add_duplicate_clusters(df, column, threshold, **kwargs)
+    kept = df[df["dup_cluster"] == df.index].drop(columns="dup_cluster").reset_index(drop=True)
+    print(f"Dropped {len(df) - len(kept):,} near-duplicate resumes, {len(kept):,} left")
+    return kept
+
+
+def cluster_report(df, top=10):
+    """Largest clusters with their size and categories, for a look at what gets merged"""
+    sizes = df["dup_cluster"].value_counts()
+    multi = sizes[sizes > 1]
+    print(f"{len(multi):,} clusters with duplicates, covering {int(multi.sum()):,} resumes")
+    for cluster, size in multi.head(top).items():
+        members = df[df["dup_cluster"] == cluster]
+        categories = ", ".join(sorted(members["Category"].astype(str).unique())) if "Category" in df else ""
+        print(f"  cluster {cluster}: {size} resumes [{categories}] {str(members.iloc[0]['Resume'])[:80]!r}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="preprocessed CSV or Parquet (cleaned Resume column)")
+    parser.add_argument("-o", "--output", help="write the deduplicated data here")
+    parser.add_argument("--column", default="Resume")
+    parser.add_argument("--threshold", type=float, default=0.8)
+    parser.add_argument("--num-perm", type=int, default=128)
+    parser.add_argument("--shingle-size", type=int, default=3)
+    parser.add_argument("--keep-all", action="store_true",
+                        help="keep every row and write the dup_cluster column (for split_data groups)")
+    parser.add_argument("--report", action="store_true")
+    args = parser.parse_args(argv)
+
+    from cv_lstm_functions import load_preprocessed_data, save_preprocessed_data
+
+    df = add_duplicate_clusters(load_preprocessed_data(args.input), args.column, args.threshold,
+                                num_perm=args.num_perm, shingle_size=args.shingle_size)
+    if args.report:
+        cluster_report(df)
+    if args.output:
+        if not args.keep_all:
+            df = df[df["dup_cluster"] == df.index].drop(columns="dup_cluster").reset_index(drop=True)
+            print(f"{len(df):,} resumes after dropping near-duplicates")
+        save_preprocessed_data(df, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""PDF text extraction for uploaded resumes.
+
+Born-digital PDFs already carry a text layer, so each page's embedded text is
+read first with PyMuPDF and only pages whose text layer is empty or looks
+garbled are rasterized and sent to Tesseract. OCR runs in a bounded pool of
+worker processes; each worker gets a one-page PDF holding just the page it
+has to rasterize, and Tesseract is killed when the document's OCR deadline
+passes, so a runaway page can't hold a pool slot past the timeout.
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+import fitz  # PyMuPDF
+
+# Defaults for deciding whether a page's text layer is good enough
+MIN_PAGE_CHARS = 40
+MIN_ALPHA_RATIO = 0.5
+OCR_DPI = 300
+
+# Defaults for the OCR worker pool
+OCR_WORKERS = min(4, os.cpu_count() or 1)
+OCR_MAX_PAGES = 20
+OCR_TIMEOUT = 60.0
+
+_ocr_pool = None
+_ocr_pool_lock = threading.Lock()
+
+
+def text_layer_is_usable(text, min_chars=MIN_PAGE_CHARS, min_alpha_ratio=MIN_ALPHA_RATIO):
+    """
+    Check whether an embedded text layer is worth keeping.
+    Pages with fewer than min_chars non-space characters, or where letters make
+    up less than min_alpha_ratio of them (broken font encodings), need OCR.
+    """
+    compact = "".join(text.split())
+    if len(compact) < min_chars:
+        return False
+    letters = sum(1 for ch in compact if ch.isalpha())
+    return letters / len(compact) >= min_alpha_ratio
+
+
+def render_page(page, dpi=OCR_DPI, grayscale=True):
+    """Rasterize a single PyMuPDF page into a PIL image"""
+    from PIL import Image
+
+    colorspace = fitz.csGRAY if grayscale else fitz.csRGB
+    pix = page.get_pixmap(dpi=dpi, colorspace=colorspace, alpha=False)
+    mode = "L" if pix.n == 1 else "RGB"
+    return Image.frombytes(mode, (pix.width, pix.height), pix.samples)
+
+
+def ocr_page(page, dpi=OCR_DPI, grayscale=True, timeout=0):
+    """Rasterize a single PyMuPDF page and run Tesseract on it (killed after timeout seconds, 0 = no limit)"""
+    import pytesseract
+
+    return pytesseract.image_to_string(render_page(page, dpi=dpi, grayscale=grayscale), timeout=timeout)
+
+
+def page_pdf_bytes(doc, page_index):
+    """A one-page PDF holding only page_index of doc, so OCR tasks don't ship the whole document"""
+    with fitz.open() as single:
+        single.insert_pdf(doc, from_page=page_index, to_page=page_index)
+        return single.tobytes()
+
+
+def ocr_page_from_bytes(pdf_bytes, page_index, dpi=OCR_DPI, grayscale=True, deadline=None):
+    """
+    Worker-process entry point: open the PDF, rasterize only page_index and OCR it.
+    deadline is a time.time() value; Tesseract is killed when it passes and
+    pages picked up after it are skipped. Returns (text, seconds, status).
+    """
+    started = time.perf_counter()
+    timeout = 0
+    if deadline is not None:
+        timeout = deadline - time.time()
+        if timeout <= 0:
+            return "", 0.0, "ocr_timeout"
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        try:
+            text = ocr_page(doc.load_page(page_index), dpi=dpi, grayscale=grayscale, timeout=timeout)
+        except RuntimeError as e:
+            # pytesseract reports a killed Tesseract as RuntimeError("Tesseract process timeout")
+            if "timeout" not in str(e).lower():
+                raise
+            return "", time.perf_counter() - started, "ocr_timeout"
+    return text, time.perf_counter() - started, "ocr"
+
+
+def get_ocr_pool(max_workers=OCR_WORKERS):
+    """Return the shared OCR process pool, creating it on first use"""
+    global _ocr_pool
+    with _ocr_pool_lock:
+        if _ocr_pool is None:
+            # spawn keeps TensorFlow/uvicorn state of the parent out of the workers
+            _ocr_pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _ocr_pool
+
+
+def shutdown_ocr_pool():
+    """Shut down the shared OCR process pool, if any"""
+    global _ocr_pool
+    with _ocr_pool_lock:
+        if _ocr_pool is not None:
+            _ocr_pool.shutdown(wait=False, cancel_futures=True)
+            _ocr_pool = None
+
+
+def iter_ocr_pages(pdf_bytes, page_indices, dpi=OCR_DPI, grayscale=True, max_workers=OCR_WORKERS,
+                   timeout=OCR_TIMEOUT):
+    """
+    OCR the given 0-based page indices in the worker pool, yielding
+    (page_index, (text, seconds, status)) as each page finishes, with status
+    one of "ocr", "ocr_failed" or "ocr_timeout". The per-document timeout is
+    enforced in the workers too: Tesseract is killed and queued pages are
+    skipped once it expires, so the pool slots free up.
+    """
+    if not page_indices:
+        return
+
+    deadline = time.time() + timeout if timeout else None
+
+    if max_workers <= 1:
+        # No pool: OCR inline, one page at a time
+        for index in page_indices:
+            try:
+                yield index, ocr_page_from_bytes(pdf_bytes, index, dpi, grayscale, deadline)
+            except Exception as e:
+                print(f"OCR failed on page {index + 1}: {e}")
+                yield index, ("", 0.0, "ocr_failed")
+        return
+
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        page_pdfs = {index: page_pdf_bytes(doc, index) for index in page_indices}
+
+    def submit_all(pool):
+        return {
+            pool.submit(ocr_page_from_bytes, page_pdfs[index], 0, dpi, grayscale, deadline): index
+            for index in page_indices
+        }
+
+    pool = get_ocr_pool(max_workers)
+    try:
+        futures = submit_all(pool)
+    except BrokenProcessPool:
+        shutdown_ocr_pool()
+        futures = submit_all(get_ocr_pool(max_workers))
+
+    pending = set(futures)
+    pool_broken = False
+    try:
+        for future in as_completed(futures, timeout=timeout or None):
+            pending.discard(future)
+            index = futures[future]
+            try:
+                yield index, future.result()
+            except BrokenProcessPool as e:
+                print(f"OCR worker died on page {index + 1}: {e}")
+                pool_broken = True
+                yield index, ("", 0.0, "ocr_failed")
+            except Exception as e:
+                print(f"OCR failed on page {index + 1}: {e}")
+                yield index, ("", 0.0, "ocr_failed")
+    except FuturesTimeout:
+        for future in pending:
+            future.cancel()
+            yield futures[future], ("", 0.0, "ocr_timeout")
+    finally:
+        # Also runs when the caller stops iterating early (e.g. a client disconnected)
+        for future in pending:
+            future.cancel()
+        if pool_broken:
+            # A crashed worker poisons the whole pool; the next call starts a fresh one
+            shutdown_ocr_pool()
+
+
+def ocr_pages(pdf_bytes, page_indices, dpi=OCR_DPI, grayscale=True, max_workers=OCR_WORKERS, timeout=OCR_TIMEOUT):
+    """
+    OCR the given 0-based page indices in the worker pool.
+
+    Returns {page_index: (text, seconds, status)} with status one of
+    "ocr", "ocr_failed" or "ocr_timeout" (see iter_ocr_pages).
+    """
+    return dict(iter_ocr_pages(pdf_bytes, page_indices, dpi=dpi, grayscale=grayscale,
+                               max_workers=max_workers, timeout=timeout))
+
+
+def iter_pdf_extraction(pdf_bytes, min_chars=MIN_PAGE_CHARS, min_alpha_ratio=MIN_ALPHA_RATIO, ocr_dpi=OCR_DPI,
+                        ocr_grayscale=True, ocr_workers=OCR_WORKERS, ocr_max_pages=OCR_MAX_PAGES,
+                        ocr_timeout=OCR_TIMEOUT):
+    """
+    Streaming form of extract_pdf_text. Yields ("page", report) as each page's
+    text is final (text-layer pages while scanning, OCR'd pages as they
+    finish, so not necessarily in page order), then ("done", (full_text, pages)).
+    """
+    pages_text = []
+    pages = []
+    needs_ocr = []
+
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        for page in doc:
+            started = time.perf_counter()
+            text = page.get_text()
+            method = "text_layer"
+
+            if not text_layer_is_usable(text, min_chars, min_alpha_ratio):
+                if len(needs_ocr) < ocr_max_pages:
+                    needs_ocr.append(page.number)
+                    method = "ocr"
+                else:
+                    method = "ocr_skipped"
+
+            pages_text.append(text.strip())
+            pages.append({
+                "page": page.number + 1,
+                "method": method,
+                "chars": len(pages_text[-1]),
+                "seconds": time.perf_counter() - started,
+            })
+            if method != "ocr":
+                pages[-1]["seconds"] = round(pages[-1]["seconds"], 4)
+                yield "page", dict(pages[-1])
+
+    for index, (ocr_text, seconds, status) in iter_ocr_pages(
+        pdf_bytes, needs_ocr,
+        dpi=ocr_dpi, grayscale=ocr_grayscale,
+        max_workers=ocr_workers, timeout=ocr_timeout
+    ):
+        ocr_text = ocr_text.strip()
+        # Keep whichever of the two actually produced more text
+        if len(ocr_text) >= len(pages_text[index]):
+            pages_text[index] = ocr_text
+        pages[index]["method"] = status
+        pages[index]["chars"] = len(pages_text[index])
+        pages[index]["seconds"] = round(pages[index]["seconds"] + seconds, 4)
+        yield "page", dict(pages[index])
+
+    full_text = "\n".join(t for t in pages_text if t).strip()
+    yield "done", (full_text, pages)
+
+
+def extract_pdf_text(pdf_bytes, min_chars=MIN_PAGE_CHARS, min_alpha_ratio=MIN_ALPHA_RATIO, ocr_dpi=OCR_DPI,
+                     ocr_grayscale=True, ocr_workers=OCR_WORKERS, ocr_max_pages=OCR_MAX_PAGES,
+                     ocr_timeout=OCR_TIMEOUT):
+    """
+    Extract text from PDF bytes, page by page.
+
+    Returns (full_text, pages) where pages holds one report per page:
+      {"page": 1, "method": "text_layer" | "ocr" | "ocr_failed" | "ocr_timeout" | "ocr_skipped",
+       "chars": 1234, "seconds": 0.01}
+    At most ocr_max_pages pages per document are OCR'd; the rest keep their text layer.
+    """
+    for event, payload in iter_pdf_extraction(
+        pdf_bytes, min_chars=min_chars, min_alpha_ratio=min_alpha_ratio, ocr_dpi=ocr_dpi,
+        ocr_grayscale=ocr_grayscale, ocr_workers=ocr_workers, ocr_max_pages=ocr_max_pages,
+        ocr_timeout=ocr_timeout
+    ):
+        if event == "done":
+            return payload
@@ -0,0 +1,282 @@
+"""Incremental preprocessing of the training corpus with a Parquet cache per stage.
+
+The training flow (load_kaggle_datasets -> merge_datasets -> apply_text_cleaning
+-> process_with_spacy -> save_preprocessed_data) recomputes everything from the
+raw CSVs on every run. Here each expensive stage keeps its results in a
+content-addressed cache:
+
+    <cache_dir>/<stage>/<fingerprint>/part-<hash>.parquet   (key, value)
+
+key is the hash of the stage input text and fingerprint hashes the stage's
+code and settings (the cleaning functions' source; the spaCy version, model
+and lemma_POS code). A run only computes inputs that have no cached value,
+in shards of shard_size texts, writing each shard as it finishes, so:
+
+- adding a dataset only processes its new resumes,
+- changing the cleaning code invalidates the clean stage, but spaCy only
+  reruns for texts whose cleaned output actually changed,
+- an interrupted run resumes from the last finished shard.
+
+Once a stage has finished, caches of its other fingerprints (older code or
+settings) are deleted, so the cache directory doesn't keep every version
+(--keep-stale-caches keeps them, e.g. to switch back and forth).
+
+The sources are read and deduplicated by streaming_ingest.py; the output
+columns are the same as the notebook's, so the result drops into the training
+code unchanged.
+
+    python preprocess_pipeline.py --kaggle RESUME_DATASET CVSCSV CURRICULUM_VITAE RESUME_ANALYSIS \\
+        -o preprocessed_resumes.parquet
+"""
+
+import argparse
+import hashlib
+import inspect
+import os
+import shutil
+import time
+
+PIPELINE_VERSION = 1
+CACHE_DIR = "cache/preprocess"
+
+
+def text_key(text):
+    """Cache key of a stage input"""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def fingerprint(*parts):
+    """Short hash of a stage's code and settings"""
+    digest = hashlib.sha256(f"pipeline={PIPELINE_VERSION}".encode("utf-8"))
+    for part in parts:
+        digest.update(b"\0" + (part if isinstance(part, str) else inspect.getsource(part)).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def clean_fingerprint():
+    import cv_inference
+
+    return fingerprint(
+        "clean",
+        cv_inference.clean_resume_text,
+        cv_inference.LetterFilter,
+        cv_inference.URL_PATTERN.pattern,
+        cv_inference.EMAIL_PATTERN.pattern,
+    )
+
+
+def spacy_fingerprint(nlp):
+    import spacy
+    import cv_inference
+
+    # parser/ner/senter don't affect lemma_POS, so full and lightweight pipelines share a cache
+    pipes = [pipe for pipe in nlp.pipe_names if pipe not in cv_inference.INFERENCE_EXCLUDED_PIPES]
+    return fingerprint(
+        "spacy",
+        f"spacy={spacy.__version__};model={nlp.meta.get('name')}-{nlp.meta.get('version')};"
+        f"pipes={','.join(pipes)}",
+        cv_inference.lemma_pos_string,
+    )
+
+
+class StageCache:
+    """key -> value store of one stage version, as Parquet part files"""
+
+    def __init__(self, cache_dir, stage, stage_fingerprint):
+        self.path = os.path.join(cache_dir, stage, stage_fingerprint)
+        os.makedirs(self.path, exist_ok=True)
+
+    def parts(self):
+        return sorted(name for name in os.listdir(self.path) if name.endswith(".parquet"))
+
+    def load(self):
+        import pandas as pd
+
+        values = {}
+        for name in self.parts():
+            part = pd.read_parquet(os.path.join(self.path, name))
+            values.update(zip(part["key"], part["value"]))
+        return values
+
+    def write_part(self, keys, values):
+        """Write one shard; the name hashes its keys, so rewriting a shard is idempotent"""
+        import pandas as pd
+
+        name = "part-" + hashlib.sha256("".join(keys).encode("utf-8")).hexdigest()[:16] + ".parquet"
+        tmp_path = os.path.join(self.path, name + ".tmp")
+        pd.DataFrame({"key": keys, "value": values}).to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, os.path.join(self.path, name))
+
+    def prune_stale(self):
+        """
+        Delete the caches of this stage's other fingerprints and any part left
+        half-written by an interrupted run. Returns the number of caches removed.
+        """
+        stage_dir = os.path.dirname(self.path)
+        removed = 0
+        for name in os.listdir(stage_dir):
+            path = os.path.join(stage_dir, name)
+            if os.path.isdir(path) and not os.path.samefile(path, self.path):
+                shutil.rmtree(path)
+                removed += 1
+        for name in os.listdir(self.path):
+            if name.endswith(".tmp"):
+                os.remove(os.path.join(self.path, name))
+        return removed
+
+
+def run_stage(name, cache, texts, compute, shard_size=5000):
+    """
+    compute(list of texts) -> list of outputs, run only over the unique texts
+    missing from cache, shard_size at a time. Returns the outputs for texts,
+    in order.
+    """
+    started = time.perf_counter()
+    keys = [text_key(text) for text in texts]
+    cached = cache.load()
+
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key not in cached and key not in missing:
+            missing[key] = text
+    print(f"[{name}] {len(texts):,} texts, {len(set(keys)):,} unique, "
+          f"{len(missing):,} to compute ({len(cache.parts())} cached shards)")
+
+    pending = list(missing.items())
+    for start in range(0, len(pending), shard_size):
+        shard = pending[start:start + shard_size]
+        shard_keys = [key for key, _ in shard]
+        outputs = compute([text for _, text in shard])
+        cache.write_part(shard_keys, outputs)
+        cached.update(zip(shard_keys, outputs))
+        print(f"[{name}] shard {start // shard_size + 1}/{-(-len(pending) // shard_size)} done")
+
+    print(f"[{name}] finished in {time.perf_counter() - started:.1f}s")
+    return [cached[key] for key in keys]
+
+
+def spacy_compute(nlp, batch_size=50):
+    """In-process compute function for the spaCy stage (same pipeline settings as process_with_spacy)"""
+    from cv_inference import lemma_pos_string
+
+    def compute(texts):
+        docs = nlp.pipe(texts, disable=["parser", "ner"], batch_size=batch_size)
+        return [lemma_pos_string(doc) for doc in docs]
+
+    return compute
+
+
+def prune_stage(name, cache):
+    removed = cache.prune_stale()
+    if removed:
+        print(f"[{name}] removed {removed} stale cache version(s)")
+
+
+def preprocess_corpus(df, nlp, cache_dir=CACHE_DIR, shard_size=5000, n_jobs=-1, spacy_batch_size=50,
+                      spacy_processes=1, near_duplicates="keep", near_duplicate_threshold=0.8, prune=True,
+                      spacy_model="en_core_web_sm"):
+    """
+    apply_text_cleaning + process_with_spacy through the stage caches:
+    Resume is replaced by the cleaned text and Resume_POS_text is added.
+    near_duplicates ("mark" adds dup_cluster ids, "drop" keeps one resume per
+    cluster) runs on the cleaned text, before the spaCy stage, so dropped
+    resumes never reach spaCy. spacy_processes other than 1 runs spaCy on a
+    ParallelLemmatizer pool (0 or less: one worker per core) that loads
+    spacy_model, the package name or path nlp was loaded from. prune deletes
+    stale cache versions once each stage has finished.
+    """
+    from cv_inference import clean_resume_texts
+    from spacy_parallel import ParallelLemmatizer
+
+    clean_cache = StageCache(cache_dir, "clean", clean_fingerprint())
+    df["Resume"] = run_stage(
+        # clean_resume_text maps non-strings to "", so they can share the "" key
+        "clean", clean_cache, [text if isinstance(text, str) else "" for text in df["Resume"]],
+        lambda texts: clean_resume_texts(texts, n_jobs=n_jobs), shard_size
+    )
+    if prune:
+        prune_stage("clean", clean_cache)
+
+    # On the cleaned text, so case, whitespace, URL and e-mail differences are already gone
+    if near_duplicates != "keep":
+        from near_duplicates import add_duplicate_clusters, drop_near_duplicates
+
+        dedupe = drop_near_duplicates if near_duplicates == "drop" else add_duplicate_clusters
+        df = dedupe(df, "Resume", near_duplicate_threshold)
+
+    spacy_cache = StageCache(cache_dir, "spacy", spacy_fingerprint(nlp))
+    if spacy_processes == 1:
+        df["Resume_POS_text"] = run_stage(
+            "spacy", spacy_cache, df["Resume"].tolist(), spacy_compute(nlp, batch_size=spacy_batch_size), shard_size
+        )
+    else:
+        # The pool gets every pending text at once, so it can sort them all by
+        # length; each finished shard is checkpointed to spacy_cache
+        with ParallelLemmatizer(spacy_model, n_workers=spacy_processes if spacy_processes > 0 else None,
+                                batch_size=spacy_batch_size) as engine:
+            df["Resume_POS_text"] = engine.process(df["Resume"].tolist(), checkpoint=spacy_cache)
+    if prune:
+        prune_stage("spacy", spacy_cache)
+    return df
+
+
+def load_sources(kaggle_paths=None, inputs=(), normalize=True):
+    """
+    Raw datasets merged into one deduplicated DataFrame (Category, Resume),
+    streamed chunk by chunk (see streaming_ingest.py): the Kaggle and
+    HuggingFace datasets of the notebook when kaggle_paths is given, plus any
+    extra CSVs in inputs.
+    """
+    from streaming_ingest import Source, huggingface_sources, ingest, kaggle_sources
+
+    sources = kaggle_sources(*kaggle_paths) + huggingface_sources() if kaggle_paths else []
+    sources += [Source(os.path.basename(path), path) for path in inputs]
+    if not sources:
+        raise ValueError("No input datasets given")
+    return ingest(sources, normalize=normalize)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--kaggle", nargs=4, metavar=("RESUME_DATASET", "CVSCSV", "CURRICULUM_VITAE", "RESUME_ANALYSIS"),
+                        help="kagglehub download paths, as passed to load_kaggle_datasets (the HuggingFace "
+                             "datasets are loaded with them)")
+    parser.add_argument("--input", nargs="*", default=[], help="extra CSVs with Resume and Category columns")
+    parser.add_argument("--exact-dedup", action="store_true",
+                        help="dedupe on exact (Category, Resume) pairs (default also ignores whitespace)")
+    parser.add_argument("-o", "--output", default="preprocessed_resumes.parquet",
+                        help=".parquet, or .csv for the old format")
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--shard-size", type=int, default=5000)
+    parser.add_argument("--n-jobs", type=int, default=-1, help="processes for text cleaning")
+    parser.add_argument("--spacy-model", default="en_core_web_sm", help="spaCy package name or model path")
+    parser.add_argument("--spacy-batch-size", type=int, default=50)
+    parser.add_argument("--spacy-processes", type=int, default=1,
+                        help="spaCy worker processes (0: one per core; see spacy_parallel.py)")
+    parser.add_argument("--near-duplicates", choices=("keep", "mark", "drop"), default="keep",
+                        help="mark: add dup_cluster ids (for split_data groups); drop: keep one resume per cluster")
+    parser.add_argument("--near-duplicate-threshold", type=float, default=0.8)
+    parser.add_argument("--keep-stale-caches", action="store_true",
+                        help="keep cache versions from older code or settings instead of deleting them")
+    parser.add_argument("--normalize-categories", action="store_true",
+                        help="also run apply_category_normalization")
+    args = parser.parse_args(argv)
+
+    import cv_lstm_functions as cvf
+
+    df = load_sources(args.kaggle, args.input, normalize=not args.exact_dedup)
+    nlp = cvf.load_spacy_model(args.spacy_model)
+    df = preprocess_corpus(df, nlp, args.cache_dir, args.shard_size, args.n_jobs,
+                           args.spacy_batch_size, args.spacy_processes,
+                           near_duplicates=args.near_duplicates,
+                           near_duplicate_threshold=args.near_duplicate_threshold,
+                           prune=not args.keep_stale_caches, spacy_model=args.spacy_model)
+
+    if args.normalize_categories:
+        df = cvf.apply_category_normalization(df)
+
+    cvf.save_preprocessed_data(df, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""Content-addressed cache for resume analysis results.
+
+Entries are keyed by a hash of the uploaded PDF bytes (or of the normalized
+text for plain-text predictions). Lookups go through an in-process LRU first
+and then through an optional SQLite file shared by all workers on the host.
+Every entry is tagged with a fingerprint of the model artifacts, so swapping
+a model, tokenizer or encoder invalidates everything cached before it.
+
+The two tiers have separate locks and can be used separately: the API looks
+up the memory tier inline and runs SQLite reads and writes on the cache's
+single disk thread (submit_disk), so disk I/O never blocks the event loop.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from cv_inference import normalize_text
+
+
+def hash_bytes(data):
+    """sha256 hex digest of raw bytes"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_text(text):
+    """sha256 hex digest of the normalized text (trivially reformatted texts share one entry)"""
+    return hash_bytes(normalize_text(text).encode("utf-8"))
+
+
+def artifact_fingerprint(paths, extra=""):
+    """Hash the contents of the given artifact files (missing files are skipped)"""
+    digest = hashlib.sha256(extra.encode("utf-8"))
+    for path in paths:
+        if not path or not os.path.exists(path):
+            continue
+        digest.update(path.encode("utf-8"))
+        with open(path, "rb") as handle:
+            for chunk in iter(lambda: handle.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+class ResultCache:
+    """Two-tier (memory LRU + optional SQLite) cache with TTL and size limits"""
+
+    def __init__(self, fingerprint, max_entries=1024, ttl_s=24 * 3600,
+                 disk_path=None, disk_max_entries=100000):
+        self.fingerprint = fingerprint
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.disk_path = disk_path
+        self.disk_max_entries = disk_max_entries
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._disk_puts = 0
+
+        self._db = None
+        self._disk_lock = threading.Lock()
+        self._disk_executor = None
+        if disk_path:
+            self._open_disk(disk_path)
+
+    @property
+    def disk_enabled(self):
+        return self._db is not None
+
+    def get(self, namespace, key):
+        """Return the cached value for (namespace, key) or None"""
+        value = self.get_memory(namespace, key)
+        if value is None and self._db is not None:
+            value = self.get_disk(namespace, key)
+        return value
+
+    def get_memory(self, namespace, key):
+        """Memory tier only; never touches the disk"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get((namespace, key))
+            if entry is not None:
+                created_at, value = entry
+                if now - created_at <= self.ttl_s:
+                    self._memory.move_to_end((namespace, key))
+                    self._count(namespace, "memory_hits")
+                    return value
+                del self._memory[(namespace, key)]
+                self._count(namespace, "expired")
+            if self._db is None:
+                self._count(namespace, "misses")
+            return None
+
+    def get_disk(self, namespace, key):
+        """Blocking SQLite lookup; a hit is promoted to the memory tier"""
+        now = time.time()
+        with self._disk_lock:
+            row = self._db.execute(
+                "SELECT created_at, value FROM results "
+                "WHERE namespace = ? AND key = ? AND fingerprint = ?",
+                (namespace, key, self.fingerprint)
+            ).fetchone()
+            expired = row is not None and now - row[0] > self.ttl_s
+            if expired:
+                self._db.execute(
+                    "DELETE FROM results WHERE namespace = ? AND key = ?", (namespace, key)
+                )
+                self._db.commit()
+
+        with self._lock:
+            if row is not None and not expired:
+                created_at, raw = row
+                value = json.loads(raw)
+                self._remember(namespace, key, created_at, value)
+                self._count(namespace, "disk_hits")
+                return value
+            if expired:
+                self._count(namespace, "expired")
+            self._count(namespace, "misses")
+            return None
+
+    def put(self, namespace, key, value):
+        """Store a JSON-serializable value under (namespace, key)"""
+        created_at = self.put_memory(namespace, key, value)
+        if self._db is not None:
+            self.put_disk(namespace, key, value, created_at)
+
+    def put_memory(self, namespace, key, value):
+        """Memory tier only; returns the entry's created_at for put_disk"""
+        now = time.time()
+        with self._lock:
+            self._remember(namespace, key, now, value)
+        return now
+
+    def put_disk(self, namespace, key, value, created_at=None):
+        """Blocking SQLite write (with a periodic trim)"""
+        created_at = time.time() if created_at is None else created_at
+        raw = json.dumps(value)
+        with self._disk_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO results (namespace, key, fingerprint, created_at, value) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (namespace, key, self.fingerprint, created_at, raw)
+            )
+            self._db.commit()
+            self._disk_puts += 1
+            # Trimming needs a COUNT(*), so only do it every so often
+            if self._disk_puts % 100 == 0:
+                self._trim_disk()
+
+    def submit_disk(self, fn, *args):
+        """Run a blocking disk-tier call (get_disk/put_disk) on the cache's disk thread"""
+        return self._disk_executor.submit(fn, *args)
+
+    def close(self):
+        """Finish queued disk writes and close the SQLite connection"""
+        if self._disk_executor is not None:
+            self._disk_executor.shutdown(wait=True)
+            self._disk_executor = None
+        with self._disk_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def clear(self):
+        """Drop every entry from both tiers"""
+        with self._lock:
+            self._memory.clear()
+        if self._db is not None:
+            with self._disk_lock:
+                self._db.execute("DELETE FROM results")
+                self._db.commit()
+
+    def stats(self):
+        """Return hit/miss/eviction counters per namespace plus tier sizes"""
+        with self._lock:
+            stats = {
+                "fingerprint": self.fingerprint,
+                "memory_entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "ttl_s": self.ttl_s,
+                "disk_enabled": self._db is not None,
+                "namespaces": {ns: dict(counts) for ns, counts in self._counters.items()},
+            }
+        if self._db is not None:
+            with self._disk_lock:
+                stats["disk_entries"] = self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        return stats
+
+    def _open_disk(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " namespace TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " fingerprint TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " value TEXT NOT NULL,"
+            " PRIMARY KEY (namespace, key))"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS results_created_at ON results (created_at)")
+
+        # Anything written by a different set of model artifacts is stale
+        removed = self._db.execute(
+            "DELETE FROM results WHERE fingerprint != ?", (self.fingerprint,)
+        ).rowcount
+        self._db.commit()
+        if removed:
+            print(f"Result cache: dropped {removed} entries from older model artifacts")
+
+        # One thread, so SQLite calls stay serialized and writes land in order
+        self._disk_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="result_cache_disk")
+
+    def _remember(self, namespace, key, created_at, value):
+        self._memory[(namespace, key)] = (created_at, value)
+        self._memory.move_to_end((namespace, key))
+        while len(self._memory) > self.max_entries:
+            (old_namespace, _), _ = self._memory.popitem(last=False)
+            self._count(old_namespace, "evictions")
+
+    def _trim_disk(self):
+        self._db.execute("DELETE FROM results WHERE created_at < ?", (time.time() - self.ttl_s,))
+        count = self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        if count > self.disk_max_entries:
+            self._db.execute(
+                "DELETE FROM results WHERE rowid IN "
+                "(SELECT rowid FROM results ORDER BY created_at LIMIT ?)",
+                (count - self.disk_max_entries,)
+            )
+        self._db.commit()
+
+    def _count(self, namespace, name):
+        counts = self._counters.setdefault(
+            namespace, {"memory_hits": 0, "disk_hits": 0, "misses": 0, "expired": 0, "evictions": 0}
+        )
+        counts[name] += 1
@@ -0,0 +1,126 @@
+"""Prefork server: load shared artifacts once, then fork API workers.
+
+`uvicorn main:app --workers N` starts N independent interpreters, each loading
+its own tokenizer, encoder and spaCy pipeline. Here the parent imports main
+(which loads those at import), freezes the GC so collections in the workers
+don't write to the shared objects, binds the listening socket and forks N
+workers. The workers inherit the artifacts copy-on-write and only load their
+own models, batchers and executors in main's lifespan startup. With
+MODEL_RUNTIME=tflite the model files are memory-mapped by the interpreter, so
+their pages are shared through the page cache as well.
+
+Crashed workers are restarted; SIGINT/SIGTERM stop all of them.
+/health/workers shows each worker's state and RSS/PSS.
+
+    python serve.py --workers 4 --port 8000
+"""
+
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+
+import config
+
+
+def bind_socket(host, port, backlog=2048):
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(app_module, slot, sock, log_level):
+    """Body of a forked worker: serve app_module.app on the shared socket until stopped"""
+    import uvicorn
+
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    app_module.worker_registry.slot = slot
+
+    server = uvicorn.Server(uvicorn.Config(app_module.app, log_level=log_level, lifespan="on"))
+    server.run(sockets=[sock])
+
+
+def fork_worker(app_module, slot, sock, log_level):
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            run_worker(app_module, slot, sock, log_level)
+        except BaseException as e:
+            print(f"[worker {slot}] exited with error: {e}", file=sys.stderr)
+            code = 1
+        finally:
+            os._exit(code)
+    print(f"Started worker {slot} (pid {pid})")
+    return pid
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=config.SERVE_HOST)
+    parser.add_argument("--port", type=int, default=config.SERVE_PORT)
+    parser.add_argument("--workers", type=int, default=config.SERVE_WORKERS)
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args(argv)
+
+    if not hasattr(os, "fork"):
+        sys.exit("serve.py needs os.fork; use `uvicorn main:app` on this platform")
+
+    # Loads tokenizer, encoder and spaCy in the parent (models wait for the workers)
+    import main as app_module
+    from worker_registry import WorkerRegistry
+
+    # Models load in the workers; check their files here so a bad deploy
+    # fails once instead of crash-looping every worker
+    app_module.require_artifacts(app_module.model_artifact_paths())
+
+    app_module.worker_registry = WorkerRegistry(args.workers)
+    sock = bind_socket(args.host, args.port)
+    print(f"Listening on {args.host}:{args.port} with {args.workers} workers")
+
+    # Everything allocated so far is moved out of the collector's reach, so GC
+    # passes in the workers don't dirty (and un-share) those pages
+    gc.collect()
+    gc.freeze()
+
+    workers = {fork_worker(app_module, slot, sock, args.log_level): slot for slot in range(args.workers)}
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        slot = workers.pop(pid, None)
+        if slot is None or stopping:
+            continue
+        print(f"Worker {slot} (pid {pid}) exited with status {status}; restarting")
+        time.sleep(config.SERVE_RESTART_DELAY_S)
+        workers[fork_worker(app_module, slot, sock, args.log_level)] = slot
+
+    sock.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Bounded thread pools for running blocking work off the event loop.
+
+Each executor accepts at most ``max_pending`` tasks (running plus queued).
+Beyond that ``submit`` raises ``ExecutorBusy`` right away instead of letting
+the backlog grow, so the API can answer 429 and the client can retry later.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ExecutorBusy(Exception):
+    """Raised when a BoundedExecutor already holds max_pending tasks"""
+
+    def __init__(self, name):
+        super().__init__(f"{name} is at capacity")
+        self.name = name
+
+
+class BoundedExecutor:
+    """ThreadPoolExecutor with a hard cap on running + queued tasks"""
+
+    def __init__(self, max_workers, max_pending, name="executor"):
+        if max_pending < max_workers:
+            raise ValueError("max_pending must be at least max_workers")
+        self.name = name
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._submitted_total = 0
+        self._rejected_total = 0
+
+    def submit(self, fn, *args, **kwargs):
+        """Submit fn(*args, **kwargs) or raise ExecutorBusy if the executor is full"""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected_total += 1
+            raise ExecutorBusy(self.name)
+
+        with self._lock:
+            self._pending += 1
+            self._submitted_total += 1
+
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except Exception:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    async def run(self, fn, *args, **kwargs):
+        """Await fn(*args, **kwargs) running on this executor"""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def stats(self):
+        """Return capacity and load counters"""
+        with self._lock:
+            return {
+                "name": self.name,
+                "max_workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "pending": self._pending,
+                "submitted_total": self._submitted_total,
+                "rejected_total": self._rejected_total,
+            }
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _release(self, _future):
+        with self._lock:
+            self._pending -= 1
+        self._slots.release()
@@ -0,0 +1,162 @@
+"""Multi-core lemma_POS preprocessing that scales with the number of cores.
+
+process_with_spacy runs nlp.pipe(..., n_process=-1): spaCy's workers send
+whole serialized Docs back to the parent, which then builds every lemma_POS
+string token by token, so the parent becomes the bottleneck and the workers
+wait on it. Long resumes in a batch of short ones also leave workers idle.
+
+ParallelLemmatizer instead:
+
+- sorts the texts by length and cuts them into shards of similar length
+  (bounded in characters), longest shards first so the slowest work starts
+  early and the pool drains evenly,
+- loads the spaCy pipeline once per worker process (without parser/ner),
+- filters tokens and builds the lemma_POS string inside the worker, sending
+  back only the final strings,
+- optionally checkpoints every finished shard to a Parquet stage cache
+  (preprocess_pipeline.StageCache), so an interrupted run resumes where it
+  stopped and texts already processed are never sent to spaCy again.
+
+benchmarks/bench_spacy_scaling.py reports docs/sec from 1 to N workers.
+"""
+
+import multiprocessing
+import os
+import time
+
+import numpy as np
+
+from cv_inference import lemma_pos_string, load_inference_spacy_model
+
+_worker_nlp = None
+_worker_model = None
+_worker_batch_size = 64
+
+
+def init_worker(model_name, batch_size):
+    """Pool initializer: load the spaCy pipeline once in each worker"""
+    global _worker_nlp, _worker_model, _worker_batch_size
+    _worker_nlp = load_inference_spacy_model(model_name)
+    _worker_model = model_name
+    _worker_batch_size = batch_size
+
+
+def lemmatize_shard(shard):
+    """Worker body: (shard id, texts) -> (shard id, lemma_POS strings)"""
+    shard_id, texts = shard
+    docs = _worker_nlp.pipe(texts, batch_size=_worker_batch_size)
+    return shard_id, [lemma_pos_string(doc) for doc in docs]
+
+
+def length_shards(lengths, shard_chars=500000, max_shard_docs=1000):
+    """
+    Index lists of similar-length texts, longest first, each holding at most
+    shard_chars characters (a longer text gets a shard of its own) and
+    max_shard_docs texts.
+    """
+    order = np.argsort(-np.asarray(lengths), kind="stable")
+    shards, current, chars = [], [], 0
+    for index in order:
+        if current and (chars + lengths[index] > shard_chars or len(current) >= max_shard_docs):
+            shards.append(current)
+            current, chars = [], 0
+        current.append(int(index))
+        chars += lengths[index]
+    if current:
+        shards.append(current)
+    return shards
+
+
+class ParallelLemmatizer:
+    """Pool of spaCy workers returning lemma_POS strings; use as a context manager"""
+
+    def __init__(self, model_name="en_core_web_sm", n_workers=None, batch_size=64,
+                 shard_chars=500000, max_shard_docs=1000):
+        self.model_name = model_name
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.shard_chars = shard_chars
+        self.max_shard_docs = max_shard_docs
+        self._pool = None
+
+    def start(self):
+        if self.n_workers > 1 and self._pool is None:
+            # spawn, like the OCR pool: workers don't inherit the parent's threads
+            context = multiprocessing.get_context("spawn")
+            self._pool = context.Pool(self.n_workers, initializer=init_worker,
+                                      initargs=(self.model_name, self.batch_size))
+        elif self.n_workers <= 1 and _worker_model != self.model_name:
+            init_worker(self.model_name, self.batch_size)
+        return self
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    def iter_shards(self, texts):
+        """(text indices, lemma_POS strings) per shard as the shards finish"""
+        self.start()
+        shards = length_shards([len(text) for text in texts], self.shard_chars, self.max_shard_docs)
+        work = ((shard_id, [texts[i] for i in shard]) for shard_id, shard in enumerate(shards))
+        results = self._pool.imap_unordered(lemmatize_shard, work) if self._pool else map(lemmatize_shard, work)
+        for shard_id, strings in results:
+            yield shards[shard_id], strings
+
+    def process(self, texts, checkpoint=None, progress=True):
+        """
+        lemma_POS strings for texts, in order. With checkpoint (a StageCache)
+        cached texts are skipped and each finished shard is written to it.
+        """
+        from preprocess_pipeline import text_key
+
+        texts = list(texts)
+        started = time.perf_counter()
+        results = [None] * len(texts)
+
+        cached = checkpoint.load() if checkpoint is not None else {}
+        keys = [text_key(text) for text in texts] if checkpoint is not None else None
+        pending = {}
+        for i, text in enumerate(texts):
+            if keys is not None and keys[i] in cached:
+                results[i] = cached[keys[i]]
+            else:
+                pending.setdefault(text, []).append(i)
+
+        unique = list(pending)
+        done = 0
+        for indices, strings in self.iter_shards(unique):
+            for index, string in zip(indices, strings):
+                for i in pending[unique[index]]:
+                    results[i] = string
+            if checkpoint is not None:
+                checkpoint.write_part([text_key(unique[index]) for index in indices], strings)
+            done += len(indices)
+            if progress:
+                elapsed = time.perf_counter() - started
+                print(f"\rspaCy: {done:,}/{len(unique):,} texts, {done / max(elapsed, 1e-9):,.0f} docs/s", end="")
+        if progress and unique:
+            print()
+        return results
+
+
+def lemma_pos_parallel(texts, model_name="en_core_web_sm", n_workers=None, checkpoint_dir=None, **kwargs):
+    """
+    One-shot ParallelLemmatizer run. checkpoint_dir makes it resumable: shards
+    are cached under <checkpoint_dir>/spacy/<fingerprint>/ like preprocess_pipeline.
+    """
+    checkpoint = None
+    if checkpoint_dir:
+        from preprocess_pipeline import StageCache, spacy_fingerprint
+
+        checkpoint = StageCache(checkpoint_dir, "spacy", spacy_fingerprint(load_inference_spacy_model(model_name)))
+    with ParallelLemmatizer(model_name, n_workers, **kwargs) as engine:
+        return engine.process(texts, checkpoint=checkpoint)
@@ -0,0 +1,149 @@
+"""Streaming, chunked ingestion of the resume datasets with early deduplication.
+
+load_kaggle_datasets / load_huggingface_datasets read all twelve CSVs into
+memory (df4 is a second copy of cvs.csv), then merge_datasets concatenates
+them and runs drop_duplicates over every column. Here each source
+is read in chunks, renamed to (Category, Resume) the way
+standardize_column_names does, and every row is checked against a set of
+16-byte hashes of the rows already seen, so duplicates are dropped before
+they ever reach a DataFrame. Peak memory is one chunk plus the hash set
+instead of every raw table at once; benchmarks/bench_ingest_memory.py
+measures it against the old approach.
+
+Rows missing a Category or Resume are dropped, and a row is a duplicate
+when its (Category, Resume) pair has been seen before; the first occurrence
+is kept, in source order. merge_datasets instead compares every column of
+the concatenated tables and drops rows with a missing value in any column,
+so with normalize=False the result matches it exactly when the standardized
+tables hold just Category and Resume (extra columns there make it keep rows
+that differ only in those, or drop rows over their missing values). With
+normalize=True (the default) resumes differing only in whitespace count as
+duplicates too; clean_resume_text collapses whitespace anyway, so they would
+have become identical training rows.
+
+    python streaming_ingest.py --kaggle RESUME_DATASET CVSCSV CURRICULUM_VITAE RESUME_ANALYSIS -o merged_resumes.parquet
+"""
+
+import argparse
+import hashlib
+import time
+
+from cv_inference import normalize_text
+
+COLUMNS = ["Category", "Resume"]
+
+
+class Source:
+    """One CSV and how its columns map onto (Category, Resume)"""
+
+    def __init__(self, name, path, rename=None):
+        self.name = name
+        self.path = path
+        self.rename = rename or {}
+
+
+def kaggle_sources(resume_dataset_path, cvscsv_path, curriculum_vitae_path, resume_analysis_path):
+    """The Kaggle files of load_kaggle_datasets (cvs.csv once) with the renames of standardize_column_names"""
+    analysis = resume_analysis_path
+    return [
+        Source("UpdatedResumeDataSet", f"{resume_dataset_path}/UpdatedResumeDataSet.csv"),
+        Source("cvs", f"{cvscsv_path}/cvs.csv"),
+        Source("Curriculum Vitae", f"{curriculum_vitae_path}/Curriculum Vitae.csv"),
+        Source("Jillani SofTech", f"{analysis}/Jillani SofTech Updated Resume Dataset.csv"),
+        Source("Jithin Jagadeesh", f"{analysis}/Jithin Jagadeesh gpt_dataset.csv"),
+        Source("Noor Saeed", f"{analysis}/Noor Saeed clean_resume_data.csv", {"Feature": "Resume"}),
+        Source("Snehaan Bhawal", f"{analysis}/Snehaan Bhawal Resume Dataset.csv", {"Resume_str": "Resume"}),
+        Source("Wahib Mzali", f"{analysis}/Wahib Mzali Resume data.csv", {"Label": "Category"}),
+    ]
+
+
+def huggingface_sources():
+    """The HuggingFace files of load_huggingface_datasets"""
+    return [
+        Source("Resume-Screening-Dataset", "hf://datasets/AzharAli05/Resume-Screening-Dataset/dataset.csv",
+               {"Role": "Category"}),
+        Source("resume-atlas", "hf://datasets/ahmedheakl/resume-atlas/train.csv", {"Text": "Resume"}),
+        Source("resume-domain-classifier", "hf://datasets/0xnbk/resume-domain-classifier-v1-en/validation.csv",
+               {"text": "Resume", "resume_domain": "Category"}),
+    ]
+
+
+def row_key(category, resume, normalize=True):
+    """Dedup key of one (Category, Resume) row"""
+    if normalize:
+        resume = normalize_text(resume)
+    return hashlib.blake2b(f"{category}\0{resume}".encode("utf-8"), digest_size=16).digest()
+
+
+def read_source_chunks(source, chunksize):
+    """(Category, Resume) chunks of one source, only those two columns read"""
+    import pandas as pd
+
+    wanted = set(COLUMNS) | set(source.rename)
+    for chunk in pd.read_csv(source.path, chunksize=chunksize, usecols=lambda column: column in wanted):
+        chunk = chunk.rename(columns=source.rename)
+        missing = [column for column in COLUMNS if column not in chunk.columns]
+        if missing:
+            raise ValueError(f"{source.name}: no column(s) {missing} in {source.path}")
+        yield chunk[COLUMNS]
+
+
+def iter_unique_chunks(sources, chunksize=1000, normalize=True, seen=None):
+    """
+    Yield DataFrame chunks of (Category, Resume) rows that are complete and
+    not seen before, source by source. Pass a set as seen to share it across
+    calls (e.g. to skip rows already ingested).
+    """
+    seen = set() if seen is None else seen
+    for source in sources:
+        kept = total = 0
+        for chunk in read_source_chunks(source, chunksize):
+            total += len(chunk)
+            chunk = chunk.dropna()
+            keep = []
+            for category, resume in zip(chunk["Category"], chunk["Resume"]):
+                key = row_key(category, resume, normalize)
+                keep.append(key not in seen)
+                seen.add(key)
+            chunk = chunk[keep]
+            kept += len(chunk)
+            if len(chunk):
+                yield chunk
+        print(f"{source.name}: {kept:,} new rows of {total:,}")
+
+
+def ingest(sources, chunksize=1000, normalize=True):
+    """All unique rows as one DataFrame, the streaming counterpart of merge_datasets (see the module docstring)"""
+    import pandas as pd
+
+    started = time.perf_counter()
+    chunks = list(iter_unique_chunks(sources, chunksize, normalize))
+    df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=COLUMNS)
+
+    print(f"Combined dataset shape: {df.shape} in {time.perf_counter() - started:.1f}s")
+    print(f"Unique categories: {df['Category'].nunique()}")
+    return df
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--kaggle", nargs=4, required=True,
+                        metavar=("RESUME_DATASET", "CVSCSV", "CURRICULUM_VITAE", "RESUME_ANALYSIS"))
+    parser.add_argument("--no-huggingface", action="store_true", help="only the Kaggle datasets")
+    parser.add_argument("--chunksize", type=int, default=1000)
+    parser.add_argument("--exact", action="store_true",
+                        help="dedupe on exact (Category, Resume) pairs instead of ignoring whitespace")
+    parser.add_argument("-o", "--output", default="merged_resumes.parquet")
+    args = parser.parse_args(argv)
+
+    sources = kaggle_sources(*args.kaggle)
+    if not args.no_huggingface:
+        sources += huggingface_sources()
+    df = ingest(sources, args.chunksize, normalize=not args.exact)
+
+    from cv_lstm_functions import save_preprocessed_data
+    save_preprocessed_data(df, args.output)
+
+
+if __name__ == "__main__":
+    main()
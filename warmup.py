@@ -0,0 +1,107 @@
+"""Startup checks and warm-up for the API workers.
+
+TensorFlow traces graphs and allocates buffers on the first predict call for
+each input shape, and spaCy loads its lookup tables lazily, so the first
+requests after a deploy used to be very slow. warm_up runs throwaway inputs
+through the spaCy pipeline and every model at each configured batch size and
+length bucket before a worker reports ready. TFLite interpreters are
+per thread (and per batch shape), so the models are warmed on every thread
+that will run them (warm_on_threads), not on the loader thread. require_artifacts fails startup
+straight away when a configured file is missing, instead of on the first
+request (or after a runtime `spacy download`).
+"""
+
+import os
+import threading
+import time
+
+import numpy as np
+
+from bucketed_inference import BucketedModel
+from model_export import TFLiteModel
+
+WARMUP_TEXT = (
+    "Senior software engineer with experience in Python, machine learning, "
+    "data analysis, cloud infrastructure and team leadership."
+)
+
+
+class MissingArtifactError(RuntimeError):
+    """A model, tokenizer or encoder file the configuration points at does not exist"""
+
+
+def require_artifacts(paths):
+    """Raise MissingArtifactError listing every path in paths that does not exist"""
+    missing = [path for path in paths if path and not os.path.exists(path)]
+    if missing:
+        raise MissingArtifactError("Missing artifact(s): " + ", ".join(repr(path) for path in missing))
+
+
+def warmup_inputs(batch_size, length, max_length):
+    """(batch_size, max_length) post-padded ids with `length` real tokens per row"""
+    padded = np.zeros((batch_size, max_length), dtype=np.int32)
+    padded[:, :length] = 1
+    return padded
+
+
+def warm_model(model, batch_sizes, max_length):
+    """
+    Run model once per batch size (and per length bucket for bucketed models).
+    A TFLiteModel is run at every padded batch size up to the largest, so
+    each of its per-shape interpreters is allocated.
+    """
+    lengths = model.buckets if isinstance(model, BucketedModel) else (max_length,)
+    if isinstance(model, TFLiteModel):
+        batch_sizes = model.batch_sizes(max(batch_sizes))
+    for batch_size in batch_sizes:
+        for length in lengths:
+            model.predict_on_batch(warmup_inputs(batch_size, length, max_length))
+
+
+def warm_on_threads(executor, fn, threads, timeout=300):
+    """
+    Run fn() once on each of `threads` distinct worker threads of executor.
+    Every task waits at a barrier until all have started, so no thread can
+    pick up a second one.
+    """
+    barrier = threading.Barrier(threads)
+
+    def task():
+        try:
+            fn()
+        finally:
+            barrier.wait(timeout=timeout)
+
+    futures = [executor.submit(task) for _ in range(threads)]
+    for future in futures:
+        future.result()
+
+
+def warm_up(models, nlp=None, preprocess_fn=None, batch_sizes=(1,), max_length=500, executor=None, threads=1):
+    """
+    Warm the spaCy pipeline and each model in models ({name: model}, None
+    entries skipped). With executor, the models are warmed on `threads` of its
+    worker threads (see warm_on_threads) instead of the calling thread.
+    Returns {stage: seconds} for /health/ready.
+    """
+    batch_sizes = sorted({int(size) for size in batch_sizes if int(size) > 0})
+    report = {}
+
+    if preprocess_fn is not None and nlp is not None:
+        started = time.perf_counter()
+        for batch_size in batch_sizes:
+            preprocess_fn([WARMUP_TEXT] * batch_size, nlp)
+        report["spacy"] = round(time.perf_counter() - started, 3)
+
+    for name, model in models.items():
+        if model is None:
+            continue
+        started = time.perf_counter()
+        if executor is None:
+            warm_model(model, batch_sizes, max_length)
+        else:
+            warm_on_threads(executor, lambda m=model: warm_model(m, batch_sizes, max_length), threads)
+        report[name] = round(time.perf_counter() - started, 3)
+
+    print(f"Warm-up done: {report}")
+    return report
@@ -0,0 +1,94 @@
+"""Shared state of the API worker processes, for /health/workers.
+
+serve.py creates one WorkerRegistry before forking, so every worker sees the
+same shared-memory arrays: each worker records its pid and whether its models
+are loaded and warm, and any worker can report on all of them. Memory figures
+are read from /proc for each pid; PSS (proportional set size) splits shared
+copy-on-write pages between the processes that map them, so it is the number
+to watch when checking that the workers really share the parent's artifacts.
+"""
+
+import multiprocessing
+import os
+import time
+
+STATES = ("empty", "loading", "ready", "failed", "stopped")
+
+
+def read_proc_kb(path, field):
+    """Value in kB of a "Field:   123 kB" line in a /proc file, or None"""
+    try:
+        with open(path) as handle:
+            for line in handle:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return None
+
+
+def process_memory(pid):
+    """RSS, PSS and shared/private memory of pid in MB (Linux only; None elsewhere)"""
+    rss = read_proc_kb(f"/proc/{pid}/status", "VmRSS")
+    rollup = f"/proc/{pid}/smaps_rollup"
+    pss = read_proc_kb(rollup, "Pss")
+    shared = sum(filter(None, (read_proc_kb(rollup, "Shared_Clean"), read_proc_kb(rollup, "Shared_Dirty"))))
+    private = sum(filter(None, (read_proc_kb(rollup, "Private_Clean"), read_proc_kb(rollup, "Private_Dirty"))))
+
+    def mb(kb):
+        return round(kb / 1024.0, 1) if kb is not None else None
+
+    return {
+        "rss_mb": mb(rss),
+        "pss_mb": mb(pss),
+        "shared_mb": mb(shared) if pss is not None else None,
+        "private_mb": mb(private) if pss is not None else None,
+    }
+
+
+class WorkerRegistry:
+    """Fixed-size table of worker slots in shared memory (pid, state, timestamps)"""
+
+    def __init__(self, num_workers=1):
+        self.num_workers = num_workers
+        self.slot = 0
+        self._pids = multiprocessing.Array("l", num_workers)
+        self._states = multiprocessing.Array("b", num_workers)
+        self._started = multiprocessing.Array("d", num_workers)
+        self._ready = multiprocessing.Array("d", num_workers)
+
+    def attach(self, slot):
+        """Claim slot for the current process (call in the worker, after fork)"""
+        self.slot = slot
+        self._pids[slot] = os.getpid()
+        self._started[slot] = time.time()
+        self._ready[slot] = 0.0
+        self.set_state("loading")
+
+    def set_state(self, state):
+        self._states[self.slot] = STATES.index(state)
+        if state == "ready":
+            self._ready[self.slot] = time.time()
+
+    def state(self, slot=None):
+        return STATES[self._states[self.slot if slot is None else slot]]
+
+    def all_ready(self):
+        return all(self.state(slot) == "ready" for slot in range(self.num_workers))
+
+    def snapshot(self):
+        """One dict per slot with state, warm-up time and memory"""
+        workers = []
+        for slot in range(self.num_workers):
+            pid = self._pids[slot]
+            started, ready = self._started[slot], self._ready[slot]
+            entry = {
+                "slot": slot,
+                "pid": pid or None,
+                "state": self.state(slot),
+                "warmup_s": round(ready - started, 2) if ready else None,
+            }
+            if pid:
+                entry.update(process_memory(pid))
+            workers.append(entry)
+        return workers